@@ -5,13 +5,46 @@ from abc import ABC, abstractmethod
 import os
 import sys
 
+# ===== 分析器开销等级（数值越大越慢） =====
+COST_LOW = 1
+COST_MEDIUM = 2
+COST_HIGH = 3
+
 
 class BaseAnalyzer(ABC):
-    """分析器基类"""
+    """
+    分析器基类
+
+    子类通过类属性声明适用范围，扫描器据此为每种扩展名构建分发表：
+        name: 注册名（结果字典中的键）
+        languages: 适用的语言名集合（取自 LANG_MAP），None 表示全部语言
+        extensions: 额外适用的扩展名集合（如不在 LANG_MAP 中的 '.proto'）
+        cost: 开销等级（COST_LOW / COST_MEDIUM / COST_HIGH）
+        version: 结果格式或检测规则变化时递增，使分析缓存中的旧结果失效
+        config_keys: 分析时读取的扫描配置键；并行扫描的工作进程只收到这些键，
+            并按其取值缓存分析器实例
+    """
+
+    name = None
+    languages = None
+    extensions = None
+    cost = COST_MEDIUM
+    version = 1
+    config_keys = ()
 
     def __init__(self, config=None):
         self.config = config or {}
 
+    @classmethod
+    def handles(cls, ext):
+        """判断是否需要对该扩展名的文件执行本分析器"""
+        from ..config import LANG_MAP
+        if cls.extensions and ext in cls.extensions:
+            return True
+        if cls.languages is None:
+            return not cls.extensions
+        return LANG_MAP.get(ext, 'Other') in cls.languages
+
     @abstractmethod
     def analyze(self, filepath, rel_path, content_lines):
         """
@@ -1,9 +1,8 @@
 # ============================================================================
 # sidecars/health_check/analyzers/dependencies.py
 # ============================================================================
-import re
-from .base import BaseAnalyzer
-from ..config import IMPORT_PATTERNS
+from .base import BaseAnalyzer, COST_LOW
+from .import_extractor import extract_imports, top_level_package
 import os
 import sys
 
@@ -11,6 +10,10 @@ import sys
 class DependencyAnalyzer(BaseAnalyzer):
     """依赖分析器：import 语句、模块依赖"""
 
+    name = 'dependencies'
+    languages = {'Python', 'JavaScript', 'TypeScript', 'React JS', 'React TS'}
+    cost = COST_LOW
+
     def analyze(self, filepath, rel_path, content_lines):
         result = {
             'imports': [],
@@ -19,30 +22,28 @@ class DependencyAnalyzer(BaseAnalyzer):
         }
 
         lang = self.get_language(filepath)
-        pattern = None
 
+        # kind 供依赖图选择解析规则
         if 'Python' in lang:
-            pattern = IMPORT_PATTERNS.get('python')
+            kind = 'python'
         elif 'Script' in lang or 'React' in lang:
-            pattern = IMPORT_PATTERNS.get('javascript')
-
-        if not pattern:
+            kind = 'javascript'
+        else:
             return result
 
-        for i, line in enumerate(content_lines, 1):
-            match = pattern.search(line)
-            if match:
-                imported = match.group(1)
-                result['imports'].append({
-                    'line': i,
-                    'module': imported
-                })
-
-                # 区分内外部依赖
-                if imported.startswith('.'):
-                    result['internal_deps'].add(imported)
-                else:
-                    result['external_deps'].add(imported.split('/')[0])
+        # 整个文件一次扫描（支持跨行语句），而不是逐行匹配
+        for i, imported, kind in extract_imports(''.join(content_lines), kind):
+            result['imports'].append({
+                'line': i,
+                'module': imported,
+                'kind': kind
+            })
+
+            # 区分内外部依赖
+            if imported.startswith('.'):
+                result['internal_deps'].add(imported)
+            else:
+                result['external_deps'].add(top_level_package(imported, kind))
 
         # 转为列表以便JSON序列化
         result['external_deps'] = list(result['external_deps'])
@@ -0,0 +1,113 @@
+# ============================================================================
+# sidecars/health_check/analyzers/keyword_scanner.py
+# ============================================================================
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+from ..config import COMPLEXITY_KEYWORDS, TODO_TAGS, TODO_PATTERN
+
+
+def _build_pattern():
+    """
+    把复杂度关键词、运算符与魔法数字合并为一个正则
+
+    单词关键词与数字共用一个单词边界前缀；运算符按长度降序排列，使 '??'、'?.' 优先于 '?'
+    """
+    words = sorted((k for k in COMPLEXITY_KEYWORDS if k.isidentifier()), key=len, reverse=True)
+    operators = sorted((k for k in COMPLEXITY_KEYWORDS if not k.isidentifier()), key=len, reverse=True)
+    return re.compile(
+        rf'\b(?:(?P<kw>{"|".join(words)})\b|(?P<num>\d{{2,}})\b)'
+        rf'|(?P<op>{"|".join(map(re.escape, operators))})'
+    )
+
+
+KEYWORD_PATTERN = _build_pattern()
+
+# TODO 标记在小写化后的文本上按字面量查找：忽略大小写的分支会让正则引擎逐字符尝试，
+# 字面量分支则可以快速跳过；命中的行再用 TODO_PATTERN 取出标记与说明
+_TAG_PATTERN = re.compile('|'.join(tag.lower() for tag in TODO_TAGS))
+
+
+class KeywordScan:
+    """
+    单个文件的关键词扫描结果（按行号稀疏存储，行号从 1 开始）
+
+    Attributes:
+        complexity: {行号: 该行出现的不同复杂度关键词/运算符个数}
+        numbers: {行号: [两位以上的数字, ...]}
+        todos: {行号: (标记, 说明)}，每行只取第一个标记（与 TODO_PATTERN.search 一致）
+    """
+
+    __slots__ = ('complexity', 'numbers', 'todos')
+
+    def __init__(self):
+        self.complexity = {}
+        self.numbers = {}
+        self.todos = {}
+
+
+def _scan(content_lines):
+    result = KeywordScan()
+    complexity = result.complexity
+    numbers = result.numbers
+    todos = result.todos
+
+    text = ''.join(content_lines)
+    # 每行的结束偏移，用于把匹配位置映射到行号
+    ends = list(accumulate(len(line) for line in content_lines))
+
+    # 行号 -> 该行出现过的关键词/运算符（同一行重复出现只计一次）
+    seen = {}
+    for match in KEYWORD_PATTERN.finditer(text):
+        line_no = bisect_right(ends, match.start()) + 1
+        if match.lastgroup == 'num':
+            numbers.setdefault(line_no, []).append(match.group('num'))
+        else:
+            seen.setdefault(line_no, set()).add(match.group())
+    for line_no, found in seen.items():
+        complexity[line_no] = len(found)
+
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        candidates = {bisect_right(ends, m.start()) for m in _TAG_PATTERN.finditer(lowered)}
+    else:
+        # 个别字符小写化后长度改变，偏移无法对应，逐行检查
+        candidates = range(len(content_lines))
+    for index in sorted(candidates):
+        match = TODO_PATTERN.search(content_lines[index])
+        if match:
+            todos[index + 1] = match.groups()
+
+    return result
+
+
+class FileLines(list):
+    """
+    传给分析器的单个文件的行列表，附带该文件的关键词扫描结果
+
+    扫描器为每个文件构建一次，同一文件的各分析器共用首次 scan_keywords 的结果；
+    结果随行列表一起释放，不在文件或线程之间共享
+    """
+
+    __slots__ = ('keywords',)
+
+    def __init__(self, lines=()):
+        super().__init__(lines)
+        self.keywords = None
+
+
+def scan_keywords(content_lines):
+    """
+    扫描文件中的复杂度关键词、魔法数字与 TODO 标记
+
+    content_lines 为 FileLines 时每个文件只扫描一次，结果保存在其 keywords 中
+
+    Returns:
+        KeywordScan
+    """
+    if not isinstance(content_lines, FileLines):
+        return _scan(content_lines)
+    if content_lines.keywords is None:
+        content_lines.keywords = _scan(content_lines)
+    return content_lines.keywords
@@ -1,9 +1,9 @@
 # ============================================================================
 # sidecars/health_check/analyzers/metrics.py
 # ============================================================================
-import re
-from .base import BaseAnalyzer
-from ..config import COMPLEXITY_KEYWORDS, MAGIC_NUMBER_PATTERN, FUNCTION_PATTERNS
+from .base import BaseAnalyzer, COST_MEDIUM
+from .keyword_scanner import scan_keywords
+from ..config import FUNCTION_PATTERNS
 import os
 import sys
 
@@ -11,6 +11,12 @@ import sys
 class MetricsAnalyzer(BaseAnalyzer):
     """基础指标分析器：行数、复杂度、函数统计等"""
 
+    name = 'metrics'
+    cost = COST_MEDIUM
+    # 2: 复杂度计入运算符关键词（&&、||、?、??、?.）
+    # 3: 每行按不同关键词/运算符的个数计算（与版本 1 相同，同一行重复出现只计一次）
+    version = 3
+
     def analyze(self, filepath, rel_path, content_lines):
         result = {
             'lines': 0,
@@ -26,6 +32,7 @@ class MetricsAnalyzer(BaseAnalyzer):
         current_function = None
         function_start = 0
         lang = self.get_language(filepath)
+        keywords = scan_keywords(content_lines)
 
         # 选择函数匹配模式
         func_pattern = None
@@ -51,8 +58,7 @@ class MetricsAnalyzer(BaseAnalyzer):
             result['code_lines'] += 1
 
             # 复杂度统计
-            words = set(re.findall(r'\w+', stripped))
-            score = len(words.intersection(COMPLEXITY_KEYWORDS))
+            score = keywords.complexity.get(i, 0)
             result['complexity'] += score
 
             # 缩进深度
@@ -81,7 +87,7 @@ class MetricsAnalyzer(BaseAnalyzer):
                 current_function['complexity'] += score
 
             # 魔法数字检测
-            magic_nums = MAGIC_NUMBER_PATTERN.findall(stripped)
+            magic_nums = keywords.numbers.get(i)
             if magic_nums:
                 # 排除常见的非魔法数字
                 filtered = [n for n in magic_nums if n not in {'10', '100', '1000', '24', '60', '256', '512', '1024'}]
@@ -1,12 +1,19 @@
 # ============================================================================
 # sidecars/health_check/analyzers/quality.py
 # ============================================================================
-from .base import BaseAnalyzer
-from ..config import THRESHOLDS, TODO_PATTERN
+import re
+from .base import BaseAnalyzer, COST_LOW
+from .keyword_scanner import scan_keywords
+from ..config import THRESHOLDS
+
+_SINGLE_LETTER_ASSIGN = re.compile(r'\b([a-z])\s*=')
 
 class QualityAnalyzer(BaseAnalyzer):
     """代码质量分析器：坏味道、TODO、命名规范等"""
 
+    name = 'quality'
+    cost = COST_LOW
+
     def analyze(self, filepath, rel_path, content_lines):
         result = {
             'issues': [],
@@ -14,15 +21,18 @@ class QualityAnalyzer(BaseAnalyzer):
             'naming_issues': [],
         }
 
+        # TODO 标记与复杂度、魔法数字共用同一次关键词扫描
+        todos = scan_keywords(content_lines).todos
+
         for i, line in enumerate(content_lines, 1):
             stripped = line.strip()
             if not stripped:
                 continue
 
             # TODO 扫描
-            match = TODO_PATTERN.search(line)
-            if match:
-                tag, content = match.groups()
+            todo = todos.get(i)
+            if todo:
+                tag, content = todo
                 result['todos'].append({
                     'line': i,
                     'tag': tag.upper(),
@@ -30,8 +40,8 @@ class QualityAnalyzer(BaseAnalyzer):
                 })
 
             # 命名检查（简单版：查找可疑的单字母变量，排除循环变量）
-            if not any(keyword in stripped for keyword in ['for', 'while']):
-                single_chars = re.findall(r'\b([a-z])\s*=', stripped)
+            if 'for' not in stripped and 'while' not in stripped:
+                single_chars = _SINGLE_LETTER_ASSIGN.findall(stripped)
                 if single_chars and len(single_chars) > 2:
                     result['naming_issues'].append({
                         'line': i,
@@ -0,0 +1,88 @@
+# ============================================================================
+# sidecars/health_check/analyzers/registry.py
+# ============================================================================
+from .base import BaseAnalyzer
+# 内置分析器模块只定义类，由本模块导入后注册（它们不反向导入注册表，避免循环导入）
+from .metrics import MetricsAnalyzer
+from .quality import QualityAnalyzer
+from .security import SecurityAnalyzer
+from .dependencies import DependencyAnalyzer
+
+# 注册名 -> 分析器类
+_ANALYZERS = {}
+
+
+def register_analyzer(cls):
+    """
+    注册分析器（可用作类装饰器）
+
+    第三方分析器只需继承 BaseAnalyzer、设置 name 并调用本函数，
+    无需修改扫描器即可参与扫描：
+
+        @register_analyzer
+        class LicenseAnalyzer(BaseAnalyzer):
+            name = 'license'
+            languages = {'Python'}
+            def analyze(self, filepath, rel_path, content_lines): ...
+    """
+    if not (isinstance(cls, type) and issubclass(cls, BaseAnalyzer)):
+        raise TypeError(f"{cls!r} is not a BaseAnalyzer subclass")
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} must define a name")
+    _ANALYZERS[cls.name] = cls
+    return cls
+
+
+def unregister_analyzer(name):
+    """移除已注册的分析器"""
+    _ANALYZERS.pop(name, None)
+
+
+def get_analyzer_classes(names=None, max_cost=None):
+    """
+    获取已注册的分析器类
+
+    Args:
+        names: 只返回指定名称的分析器（None 表示全部）
+        max_cost: 只返回开销等级不高于该值的分析器（None 表示不限制）
+
+    Returns:
+        dict: 注册名 -> 分析器类，按开销等级从低到高排序
+    """
+    if names is None:
+        selected = _ANALYZERS.items()
+    else:
+        unknown = [n for n in names if n not in _ANALYZERS]
+        if unknown:
+            raise ValueError(f"Unknown analyzers: {', '.join(unknown)}")
+        selected = [(n, _ANALYZERS[n]) for n in names]
+    if max_cost is not None:
+        selected = [(n, cls) for n, cls in selected if cls.cost <= max_cost]
+    return dict(sorted(selected, key=lambda item: item[1].cost))
+
+
+for _cls in (MetricsAnalyzer, QualityAnalyzer, SecurityAnalyzer, DependencyAnalyzer):
+    register_analyzer(_cls)
+
+
+class AnalyzerDispatcher:
+    """按扩展名分发分析器，每种扩展名只计算一次适用列表"""
+
+    def __init__(self, analyzers):
+        self.analyzers = analyzers
+        self._table = {}
+
+    def for_extension(self, ext):
+        """返回 [(name, analyzer), ...]"""
+        entry = self._table.get(ext)
+        if entry is None:
+            entry = [(name, analyzer) for name, analyzer in self.analyzers.items()
+                     if analyzer.handles(ext)]
+            self._table[ext] = entry
+        return entry
+
+    def build(self, extensions):
+        """预先为一批扩展名构建分发表"""
+        for ext in extensions:
+            self.for_extension(ext)
+        return self._table
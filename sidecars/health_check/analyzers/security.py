@@ -1,7 +1,7 @@
 # ============================================================================
 # sidecars/health_check/analyzers/security.py
 # ============================================================================
-from .base import BaseAnalyzer
+from .base import BaseAnalyzer, COST_HIGH
 from ..config import SECRET_PATTERNS, RISKY_PATTERNS
 import os
 import sys
@@ -10,6 +10,11 @@ import sys
 class SecurityAnalyzer(BaseAnalyzer):
     """安全分析器：敏感信息、危险模式"""
 
+    name = 'security'
+    cost = COST_HIGH
+    # 2: SQL 拼接只匹配完整的关键词（不再命中 updated、selection 等）
+    version = 2
+
     def analyze(self, filepath, rel_path, content_lines):
         result = {
             'secrets': [],
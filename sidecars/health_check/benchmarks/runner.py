@@ -0,0 +1,347 @@
+# ============================================================================
+# sidecars/health_check/benchmarks/runner.py
+# ============================================================================
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import tracemalloc
+
+from .. import __version__
+from ..config import IGNORE_DIRS, IGNORE_FILES, IGNORE_EXTS
+from ..core.scanner import ProjectScanner
+from ..integrations.git_analyzer import GitAnalyzer
+from ..utils.file_utils import should_ignore, get_file_hash, git_blob_id, decode_lines
+from .corpus import generate_corpus
+
+# 与基线相比变慢超过该比例视为回归
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+
+def _timed(fn, repeat):
+    """执行 repeat 次，返回 (中位数耗时, 最后一次返回值)"""
+    samples = []
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), value
+
+
+def _walk(root_path):
+    """仅遍历文件系统（与 ProjectScanner 使用相同的忽略规则）"""
+    paths = []
+    for root, dirs, files in os.walk(root_path):
+        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
+        for file in files:
+            full_path = os.path.join(root, file)
+            rel_path = os.path.relpath(full_path, root_path)
+            if not should_ignore(rel_path, IGNORE_DIRS, IGNORE_FILES, IGNORE_EXTS):
+                paths.append((full_path, rel_path))
+    return paths
+
+
+def _load(paths):
+    """预先读入所有文件，使分析器吞吐量不受 I/O 影响"""
+    loaded = []
+    for full_path, rel_path in paths:
+        try:
+            with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
+                loaded.append((full_path, rel_path, f.readlines()))
+        except OSError:
+            continue
+    return loaded
+
+
+# 打开文件次数（sys.audit 的 open 事件；审计钩子无法移除，只安装一次）
+_open_count = [0]
+_audit_installed = False
+
+
+def _count_opens(event, args):
+    if event == 'open':
+        _open_count[0] += 1
+
+
+def _io_counters():
+    """(读系统调用次数, 实际从磁盘读取的字节数)，取自 /proc/self/io；不可用时返回 None"""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ', 1) for line in f.read().splitlines())
+        return int(fields['syscr']), int(fields['read_bytes'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _drop_page_cache(paths):
+    """通过 posix_fadvise(DONTNEED) 让内核丢弃这些文件的页缓存（无需 root）；不支持时返回 False"""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    for full_path, _ in paths:
+        try:
+            fd = os.open(full_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def _read_two_pass(paths):
+    """旧流程：getsize + 头尾快速哈希（一次打开）+ 文本模式 readlines（再次打开）"""
+    for full_path, _ in paths:
+        try:
+            os.path.getsize(full_path)
+        except OSError:
+            continue
+        get_file_hash(full_path)
+        try:
+            with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
+                f.readlines()
+        except OSError:
+            continue
+
+
+def _read_single(paths):
+    """当前流程：大小取自遍历时的 stat，一次读入字节，哈希与解码共用同一份内容"""
+    for full_path, _ in paths:
+        data = ProjectScanner._read_bytes(full_path)
+        if data is not None:
+            git_blob_id(data)
+            decode_lines(data)
+
+
+def _bench_file_io(paths, repeat):
+    """
+    对比两种逐文件读取流程在冷/热页缓存下的耗时、打开次数与读系统调用次数
+
+    冷缓存每次测量前都丢弃页缓存；平台不支持 posix_fadvise 时只测热缓存
+    """
+    global _audit_installed
+    if not _audit_installed:
+        sys.addaudithook(_count_opens)
+        _audit_installed = True
+
+    results = {}
+    for name, fn in (('two_pass', _read_two_pass), ('single_read', _read_single)):
+        results[name] = {}
+        for cache_state in ('cold', 'warm'):
+            samples = []
+            opens = reads = disk_bytes = None
+            for _ in range(repeat):
+                if cache_state == 'cold':
+                    if not _drop_page_cache(paths):
+                        break
+                else:
+                    fn(paths)  # 预热
+                before_opens = _open_count[0]
+                before_io = _io_counters()
+                start = time.perf_counter()
+                fn(paths)
+                samples.append(time.perf_counter() - start)
+                after_io = _io_counters()
+                opens = _open_count[0] - before_opens
+                if before_io and after_io:
+                    reads = after_io[0] - before_io[0]
+                    disk_bytes = after_io[1] - before_io[1]
+            if samples:
+                results[name][cache_state] = {
+                    'seconds': round(statistics.median(samples), 4),
+                    'opens': opens,
+                    'read_syscalls': reads,
+                    'disk_bytes': disk_bytes,
+                }
+    return results
+
+
+def _bench_analyzers(scanner, loaded, repeat):
+    """逐个分析器测量吞吐量"""
+    total_lines = sum(len(lines) for _, _, lines in loaded)
+    total_bytes = sum(sum(len(l) for l in lines) for _, _, lines in loaded)
+    results = {}
+
+    for name, analyzer in scanner.analyzers.items():
+        def run(analyzer=analyzer):
+            for full_path, rel_path, lines in loaded:
+                try:
+                    analyzer.analyze(full_path, rel_path, lines)
+                except Exception:
+                    pass
+
+        seconds, _ = _timed(run, repeat)
+        results[name] = {
+            'seconds': round(seconds, 4),
+            'files_per_sec': round(len(loaded) / seconds, 1) if seconds else None,
+            'lines_per_sec': round(total_lines / seconds, 1) if seconds else None,
+            'mb_per_sec': round(total_bytes / 1048576 / seconds, 2) if seconds else None,
+        }
+
+    return results
+
+
+def run_benchmark(root_path, repeat=3, options=None):
+    """
+    对指定目录执行基准测试
+
+    Args:
+        root_path: 待测目录（通常由 generate_corpus 生成）
+        repeat: 每项测量的重复次数，取中位数
+        options: 透传给 ProjectScanner 的配置
+
+    Returns:
+        dict: 各阶段耗时、分析器吞吐量、峰值内存
+    """
+    options = options or {}
+    scanner = ProjectScanner(root_path, options)
+
+    walk_time, paths = _timed(lambda: _walk(root_path), repeat)
+    file_io = _bench_file_io(paths, repeat)
+    loaded = _load(paths)
+    analyzers = _bench_analyzers(scanner, loaded, repeat)
+
+    scan_time, stats = _timed(lambda: ProjectScanner(root_path, options).scan(), repeat)
+
+    git = GitAnalyzer(root_path)
+    git_time, churn_map = _timed(git.get_churn_map, repeat)
+
+    serialize_time, payload = _timed(lambda: json.dumps(stats), repeat)
+
+    # 峰值内存单独测一次，tracemalloc 本身会拖慢扫描
+    tracemalloc.start()
+    ProjectScanner(root_path, options).scan()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'files': len(paths),
+        'lines': stats['summary']['lines'],
+        'bytes': stats['summary']['size'],
+        'timings': {
+            'walk': round(walk_time, 4),
+            'scan': round(scan_time, 4),
+            'git': round(git_time, 4),
+            'serialize': round(serialize_time, 4),
+        },
+        'analyzers': analyzers,
+        'file_io': file_io,
+        'git_files': len(churn_map),
+        'result_bytes': len(payload),
+        'peak_memory_mb': round(peak / 1048576, 2),
+    }
+
+
+def build_report(metrics, corpus=None, repeat=3):
+    """附加环境信息，便于不同版本之间对比"""
+    return {
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeat': repeat,
+        'corpus': corpus,
+        'metrics': metrics,
+    }
+
+
+def compare_reports(baseline, current, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """
+    对比两份基准结果
+
+    Returns:
+        list: 每项耗时的变化，regression=True 表示超过阈值的退化
+    """
+    rows = []
+
+    def add(key, old, new):
+        if not old or new is None:
+            return
+        change = (new - old) / old
+        rows.append({
+            'metric': key,
+            'baseline': old,
+            'current': new,
+            'change': round(change, 4),
+            'regression': change > threshold,
+        })
+
+    base_m, cur_m = baseline['metrics'], current['metrics']
+    for phase, value in cur_m['timings'].items():
+        add(f"timings.{phase}", base_m['timings'].get(phase), value)
+    for name, info in cur_m['analyzers'].items():
+        add(f"analyzers.{name}", base_m['analyzers'].get(name, {}).get('seconds'), info['seconds'])
+    for state, info in cur_m.get('file_io', {}).get('single_read', {}).items():
+        add(f"file_io.{state}", base_m.get('file_io', {}).get('single_read', {}).get(state, {}).get('seconds'),
+            info['seconds'])
+    add('peak_memory_mb', base_m.get('peak_memory_mb'), cur_m.get('peak_memory_mb'))
+
+    return rows
+
+
+# ============================================================================
+# 命令行入口
+# ============================================================================
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description='代码健康检查基准测试')
+    parser.add_argument('--root', help='已有的待测目录（不指定则生成合成语料）')
+    parser.add_argument('--corpus-dir', help='合成语料输出目录（默认临时目录）')
+    parser.add_argument('--files', type=int, default=500, help='合成文件数量')
+    parser.add_argument('--languages', help='逗号分隔的扩展名，如 .py,.ts')
+    parser.add_argument('--size-profile', default='mixed', help='文件大小分布: small/mixed/large')
+    parser.add_argument('--commits', type=int, default=20, help='伪造 Git 提交数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--repeat', type=int, default=3, help='每项测量重复次数')
+    parser.add_argument('--output', help='结果 JSON 输出路径')
+    parser.add_argument('--compare', help='基线结果 JSON，用于回归对比')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='回归判定阈值（比例）')
+
+    args = parser.parse_args()
+
+    corpus = None
+    root = args.root
+    if not root:
+        root = args.corpus_dir or os.path.join(tempfile.gettempdir(), f"health_check_corpus_{args.seed}")
+        languages = args.languages.split(',') if args.languages else None
+        print(f"🧪 生成语料: {root}")
+        corpus = generate_corpus(root, files=args.files, languages=languages,
+                                 size_profile=args.size_profile, commits=args.commits,
+                                 seed=args.seed)
+
+    print(f"⏱️  基准测试: {root}")
+    report = build_report(run_benchmark(root, repeat=args.repeat), corpus, args.repeat)
+    metrics = report['metrics']
+
+    print(f"\n📊 结果（{metrics['files']} 文件, {metrics['lines']} 行）")
+    for phase, seconds in metrics['timings'].items():
+        print(f"  • {phase}: {seconds}s")
+    for name, info in metrics['analyzers'].items():
+        print(f"  • analyzer.{name}: {info['seconds']}s ({info['lines_per_sec']} 行/秒)")
+    print(f"  • 峰值内存: {metrics['peak_memory_mb']} MB")
+    for name, states in metrics['file_io'].items():
+        for state, info in states.items():
+            print(f"  • io.{name} ({state}): {info['seconds']}s, 打开 {info['opens']} 次, "
+                  f"read 调用 {info['read_syscalls']} 次, 磁盘读取 {info['disk_bytes']} 字节")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 已保存: {os.path.abspath(args.output)}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare_reports(baseline, report, args.threshold)
+        print(f"\n🔁 对比基线 {baseline.get('version')}:")
+        for row in rows:
+            flag = '❌' if row['regression'] else '✅'
+            print(f"  {flag} {row['metric']}: {row['baseline']} → {row['current']} ({row['change']*100:+.1f}%)")
+        if any(row['regression'] for row in rows):
+            sys.exit(1)
@@ -1,6 +1,7 @@
 # ============================================================================
 # sidecars/health_check/config.py
 # ============================================================================
+import os
 import re
 
 # ===== 基础配置 =====
@@ -17,6 +18,21 @@ IGNORE_FILES = {
     'tsconfig.json', 'jsconfig.json'
 }
 
+# 依赖清单与锁文件：不参与代码分析，由依赖清点阶段单独流式解析
+MANIFEST_FILES = {
+    'package.json', 'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml',
+    'requirements.txt', 'pyproject.toml', 'poetry.lock',
+    'Cargo.toml', 'Cargo.lock', 'go.mod', 'go.sum'
+}
+
+# 本地缓存目录（依赖清点结果等），可用环境变量 HEALTH_CHECK_CACHE_DIR 覆盖
+CACHE_DIR = os.environ.get('HEALTH_CHECK_CACHE_DIR') or os.path.join(
+    os.path.expanduser('~'), '.cache', 'elevim', 'health_check'
+)
+
+# 按内容寻址的分析结果缓存上限（字节，压缩后），超出时按最近最少使用淘汰
+ANALYSIS_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
 IGNORE_EXTS = {
     '.png', '.jpg', '.jpeg', '.gif', '.ico', '.svg', '.webp',
     '.woff', '.woff2', '.ttf', '.eot', '.otf',
@@ -54,6 +70,10 @@ THRESHOLDS = {
     'low_comment_ratio': 0.05,  # 注释率过低
 }
 
+# ===== 扫描调度 =====
+# 优先扫描时，该时间窗口（秒）内修改过的文件排在其余文件之前
+PRIORITY_RECENT_WINDOW = 7 * 24 * 3600
+
 # ===== 复杂度关键词 =====
 COMPLEXITY_KEYWORDS = {
     'if', 'else', 'elif', 'for', 'while', 'case', 'switch',
@@ -62,21 +82,42 @@ COMPLEXITY_KEYWORDS = {
 }
 
 # ===== 模式匹配 =====
+TODO_TAGS = ('TODO', 'FIXME', 'HACK', 'XXX', 'NOTE', 'REVIEW', 'BUG', 'DEPRECATED')
+
 TODO_PATTERN = re.compile(
-    r'(TODO|FIXME|HACK|XXX|NOTE|REVIEW|BUG|DEPRECATED)\s*:?(.*)',
+    rf'({"|".join(TODO_TAGS)})\s*:?(.*)',
     re.IGNORECASE
 )
 
+# 相邻的可选部分各自吞掉其后的空白，避免 \s*(...)?\s* 在长空白串上平方级回溯
 FUNCTION_PATTERNS = {
     'python': re.compile(r'^\s*def\s+(\w+)\s*\('),
-    'javascript': re.compile(r'^\s*(?:async\s+)?(?:function\s+)?(\w+)\s*(?:=\s*)?(?:\([^)]*\)|async)?\s*(?:=>|{)'),
-    'typescript': re.compile(r'^\s*(?:async\s+)?(?:function\s+)?(\w+)\s*(?:=\s*)?(?:<[^>]+>)?\s*\([^)]*\)\s*(?::\s*\w+)?\s*(?:=>|{)'),
+    'javascript': re.compile(r'^\s*(?:async\s+)?(?:function\s+)?(\w+)\s*(?:=\s*)?(?:(?:\([^)]*\)|async)\s*)?(?:=>|{)'),
+    'typescript': re.compile(r'^\s*(?:async\s+)?(?:function\s+)?(\w+)\s*(?:=\s*)?(?:<[^>]+>\s*)?\([^)]*\)\s*(?::\s*\w+\s*)?(?:=>|{)'),
 }
 
+# 导入语句：对整个文件文本做一次 finditer，支持跨行语句
+# 各分支均以关键字开头，便于正则引擎快速跳到候选位置；
+# 行首 / 单词边界等上下文检查由 analyzers/import_extractor.py 完成
 IMPORT_PATTERNS = {
-    'python': re.compile(r'^\s*(?:from\s+[\w.]+\s+)?import\s+([\w,\s]+)'),
-    'javascript': re.compile(r'^\s*import\s+(?:{[^}]+}|[\w*]+)\s+from\s+["\']([^"\']+)["\']'),
-    'typescript': re.compile(r'^\s*import\s+(?:type\s+)?(?:{[^}]+}|[\w*]+)\s+from\s+["\']([^"\']+)["\']'),
+    # import x / import a.b as c, d / from .x import (a, b)
+    'python': re.compile(
+        r'from[ \t]+(?P<from>[\w.]*)[ \t]+import[ \t]*(?:\((?P<paren>[^)]*)\)|(?P<names>[\w.* \t,]+))'
+        r'|import[ \t]+(?P<plain>[\w.]+(?:[ \t]+as[ \t]+\w+)?(?:[ \t]*,[ \t]*[\w.]+(?:[ \t]+as[ \t]+\w+)?)*)'
+    ),
+    # import x from 'm' / import 'm' / import type {A} from 'm' / export * from 'm' /
+    # export {a} from 'm' / require('m') / import('m')
+    # 第一个分支等价于 import[ \t]+(type[ \t]+)?(x[ \t]*,?[ \t]*)?({...}|* as y)?\s*from，
+    # 改写为每段空白只有一种划分方式，避免长空白串上的立方级回溯
+    'javascript': re.compile(
+        r'import[ \t](?:[ \t]*(?:type[ \t]+)?'
+        r'(?:[\w$]+(?:[ \t]*,)?(?:[ \t]*(?:\{[^}]*\}|\*[ \t]*as[ \t]+[\w$]+))?|\{[^}]*\}|\*[ \t]*as[ \t]+[\w$]+))?'
+        r'\s*from\s*(?P<q1>[\'"])(?P<static>[^\'"\n]+)(?P=q1)'
+        r'|import[ \t]*(?P<q2>[\'"])(?P<side>[^\'"\n]+)(?P=q2)'
+        r'|export[ \t]+(?:type[ \t]+)?(?:\*(?:[ \t]*as[ \t]+[\w$]+)?|\{[^}]*\})'
+        r'\s*from\s*(?P<q3>[\'"])(?P<reexport>[^\'"\n]+)(?P=q3)'
+        r'|(?:require|import)[ \t]*\([ \t]*(?P<q4>[\'"`])(?P<dynamic>[^\'"`\n$]+)(?P=q4)[ \t]*\)'
+    ),
 }
 
 MAGIC_NUMBER_PATTERN = re.compile(r'\b(\d{2,})\b')  # 2位以上数字
@@ -93,6 +134,103 @@ SECRET_PATTERNS = [
 RISKY_PATTERNS = [
     ("eval() usage", re.compile(r'\beval\s*\(')),
     ("innerHTML assignment", re.compile(r'\.innerHTML\s*=')),
-    ("SQL concatenation", re.compile(r'(SELECT|INSERT|UPDATE|DELETE).*\+.*', re.IGNORECASE)),
+    # 关键词（完整单词）之后同一行出现 + 即命中。等价于“行内第一个关键词之后有 +”：先行断言找到
+    # 第一个关键词，再由反向引用 \1 消耗（先行断言内不回溯，相当于原子组），之后 [^\n+]* 遇到第一个 +
+    # 即停止；未命中时不会再从后面的关键词重新扫描，加上 ^ 锚定，单行匹配为线性时间
+    ("SQL concatenation", re.compile(
+        r'^(?=([^\n]*?\b(?:SELECT|INSERT|UPDATE|DELETE)\b))\1[^\n+]*\+', re.IGNORECASE)),
     ("Sync file operations", re.compile(r'\b(readFileSync|writeFileSync|execSync)\b')),
 ]
+
+# ===== 扫描档位 =====
+# max_cost: 运行的分析器最高开销等级（见 analyzers/base.py，1=低 2=中 3=高）
+# max_file_size: 超过该字节数的文件只计数不分析（None 为不限制）
+# git_depth: 读取的最近提交数（None 为全部历史）
+# time_budget: 整体扫描的墙钟预算（秒），超时后返回已完成部分并标记 truncated
+SCAN_PROFILES = {
+    'quick': {
+        'max_cost': 2,
+        'max_file_size': 256 * 1024,
+        'git_depth': 200,
+        'time_budget': 3,
+    },
+    'standard': {
+        'max_cost': 3,
+        'max_file_size': 1024 * 1024,
+        'git_depth': 2000,
+        'time_budget': 30,
+    },
+    'deep': {
+        'max_cost': 3,
+        'max_file_size': None,
+        'git_depth': None,
+        'time_budget': None,
+    },
+}
+
+# ===== 热点复杂度历史 =====
+# files: 采样修改最频繁的前 N 个文件；revisions: 每个文件最近 K 个版本
+# time_budget: 采样的墙钟预算（秒）；workers: 并行读取与分析的线程数（各自一个 cat-file 进程）
+HOTSPOT_HISTORY = {
+    'files': 10,
+    'revisions': 10,
+    'time_budget': 5,
+    'workers': 4,
+}
+
+# 首末版本复杂度变化超过该比例时视为增长/下降，否则为稳定
+HOTSPOT_TREND_THRESHOLD = 0.1
+
+# ===== 并行扫描 =====
+# 多项目（工作区）扫描共用的进程池；workers: 工作进程数
+# window: 每个项目提交到进程池、尚未收集结果的文件数上限（限制排队结果占用的内存）
+# file_timeout: 单个文件的分析时限（秒），超时的工作进程被终止，文件记入结果的 timed_out
+# 子进程模式下进程池在就绪时预先启动；idle_timeout: 空闲多少秒后工作进程退出，
+# 只保留 min_workers 个常驻（有新任务时再启动其余进程）
+SCAN_POOL = {
+    'workers': max(1, min(8, (os.cpu_count() or 2) - 1)),
+    'window': 128,
+    'file_timeout': 10,
+    'idle_timeout': 300,
+    'min_workers': 1,
+    'dispatchers': 8,
+}
+
+# ===== 结果落盘 =====
+# result_store 模式下逐文件写入 SQLite（默认 CACHE_DIR/results/），返回结果中的各列表
+# 只保留前 list_limit 项（files_data 按复杂度、bad_smells 与 hotspots 按分数降序），完整数量见 result_store.counts
+# batch_size: 每攒够多少行提交一次写入
+RESULT_STORE = {
+    'list_limit': 1000,
+    'batch_size': 500,
+}
+
+# ===== 扫描检查点 =====
+# checkpoint / resume 模式下已完成文件的结果写入 CACHE_DIR/checkpoints/，
+# interval: 两次提交之间的最长间隔（秒），即进程被终止时最多丢失的工作量
+# auto_files: checkpoint='auto'（子进程模式的默认）时遍历到第几个文件才开始记录；检查点的读写
+# 约占缓存命中扫描的 40%，小项目被中断后直接重扫更快，不值得付出这部分开销
+CHECKPOINT = {
+    'interval': 2,
+    'auto_files': 2000,
+}
+
+# ===== 守护进程 =====
+# --mode daemon 监听的 Unix 域套接字；命令行模式下发现该套接字上有守护进程时直接交给它扫描
+# keep_results: 在内存中保留最近多少个项目的扫描结果（供 result 命令与其他客户端读取）
+DAEMON = {
+    'socket': os.path.join(CACHE_DIR, 'daemon.sock'),
+    'keep_results': 8,
+}
+
+# ===== 抽样估计 =====
+# sample 模式先分析分层随机样本（按 顶层目录 × 语言 分层），给出总量与问题密度的估计和置信区间，
+# 之后继续扫描其余文件并逐步修正估计；min_per_stratum: 每层至少抽取的文件数（不足的稀疏层逐级合并）
+# refine_every: 样本之后每完成多少个文件更新一次估计；confidence: 置信水平
+# take_all: 字节数 ≥ take_all × 剩余字节数 / 剩余样本数 的大文件全部入样（长尾的大文件不参与方差）
+SAMPLING = {
+    'min_per_stratum': 2,
+    'take_all': 0.5,
+    'refine_every': 1000,
+    'confidence': 0.95,
+}
@@ -0,0 +1,116 @@
+# ============================================================================
+# sidecars/health_check/core/analysis_cache.py
+# ============================================================================
+import os
+import json
+import time
+import zlib
+import sqlite3
+
+from ..config import CACHE_DIR, ANALYSIS_CACHE_MAX_BYTES
+
+# 淘汰时降到上限的该比例以下，避免每次写入都触发淘汰
+_EVICT_TARGET = 0.9
+
+
+class AnalysisCache:
+    """
+    按内容寻址的分析结果缓存（SQLite）
+
+    键由内容的 git blob id、扩展名与分析器签名组成，与路径、分支、工作区和仓库无关，
+    因此相同内容在任何位置只分析一次。总大小超过上限时按最近使用时间淘汰。
+    读写都先在内存中累积，flush() 时一次提交。
+    """
+
+    def __init__(self, db_path=None, max_bytes=None):
+        self.db_path = db_path or os.path.join(CACHE_DIR, 'analysis_cache.sqlite3')
+        self.max_bytes = max_bytes or ANALYSIS_CACHE_MAX_BYTES
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=5)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+            'size INTEGER NOT NULL, last_used REAL NOT NULL)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries (last_used)')
+
+        self._touched = set()
+        self._pending = {}
+        self._total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    @staticmethod
+    def make_key(blob_id, ext, signature):
+        return f"{blob_id}{ext}:{signature}"
+
+    def get(self, key):
+        """返回缓存的分析结果（dict），未命中时为 None"""
+        if key in self._pending:
+            self.hits += 1
+            return json.loads(zlib.decompress(self._pending[key]))
+
+        row = self.conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched.add(key)
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, results):
+        """结果不可 JSON 序列化时（如第三方分析器返回自定义对象）不缓存"""
+        try:
+            self._pending[key] = zlib.compress(json.dumps(results, separators=(',', ':')).encode('utf-8'), 1)
+        except (TypeError, ValueError):
+            pass
+        if len(self._pending) >= 500:
+            self.flush()
+
+    def flush(self):
+        now = time.time()
+        with self.conn:
+            if self._touched:
+                self.conn.executemany('UPDATE entries SET last_used = ? WHERE key = ?',
+                                      [(now, key) for key in self._touched])
+            if self._pending:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)',
+                    [(key, value, len(value), now) for key, value in self._pending.items()])
+        # 估算值（覆盖写入会重复计数），超出上限时再精确统计
+        self._total += sum(len(value) for value in self._pending.values())
+        self._touched.clear()
+        self._pending.clear()
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """总大小超过上限时删除最久未使用的条目"""
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        self._total = total
+        if total <= self.max_bytes:
+            return
+
+        target = total - int(self.max_bytes * _EVICT_TARGET)
+        doomed = []
+        freed = 0
+        for key, size in self.conn.execute('SELECT key, size FROM entries ORDER BY last_used'):
+            doomed.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        with self.conn:
+            self.conn.executemany('DELETE FROM entries WHERE key = ?', doomed)
+        self.evicted += len(doomed)
+        self._total -= freed
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evicted': self.evicted}
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
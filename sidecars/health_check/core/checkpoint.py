@@ -0,0 +1,123 @@
+# ============================================================================
+# sidecars/health_check/core/checkpoint.py
+# ============================================================================
+import os
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+
+from ..config import CACHE_DIR, CHECKPOINT
+
+
+def default_checkpoint_path(root_path):
+    """项目的检查点路径：CACHE_DIR/checkpoints/<根目录哈希>.sqlite3"""
+    digest = hashlib.sha1(os.path.abspath(root_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, 'checkpoints', f'{digest}.sqlite3')
+
+
+class ScanCheckpoint:
+    """
+    扫描检查点（SQLite）
+
+    扫描过程中周期性保存已完成文件的分析结果（连同 mtime、大小与内容哈希）。
+    扫描被中断（进程被终止、超出时间预算）后，下一次 resume 扫描对修改时间与大小未变的文件
+    直接使用保存的结果，不读取也不分析，只重新分析此后变化的文件。
+    扫描完整结束时清空检查点。
+    """
+
+    def __init__(self, db_path, signature, interval=None):
+        """
+        Args:
+            db_path: 检查点文件路径
+            signature: 分析器与配置的摘要，与保存时不同则丢弃旧检查点
+            interval: 两次提交之间的最长间隔（秒，默认 CHECKPOINT['interval']）
+        """
+        self.db_path = db_path
+        self.interval = CHECKPOINT['interval'] if interval is None else interval
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=5)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, '
+            'hash TEXT, results BLOB NOT NULL)'
+        )
+
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row is None or row[0] != signature:
+            with self.conn:
+                self.conn.execute('DELETE FROM files')
+                self.conn.execute('DELETE FROM meta')
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('signature', ?)", (signature,))
+
+        self.saved = self.conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self.resumed = 0
+        self.revalidated = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def get(self, rel_path, st):
+        """
+        文件自上次保存后未变化时返回 (内容哈希, 精简后的分析结果)，否则 None
+
+        Args:
+            st: 文件的 os.stat 结果（None 时视为已变化）
+        """
+        if not self.saved or st is None:
+            return None
+        row = self.conn.execute(
+            'SELECT mtime_ns, size, hash, results FROM files WHERE path = ?', (rel_path,)).fetchone()
+        if row is None:
+            return None
+        mtime_ns, size, file_hash, results = row
+        if mtime_ns != st.st_mtime_ns or size != st.st_size:
+            self.revalidated += 1
+            return None
+        self.resumed += 1
+        return file_hash, json.loads(zlib.decompress(results))
+
+    def add(self, rel_path, st, file_hash, results):
+        """保存一个已完成文件的结果（结果不可 JSON 序列化时不保存，恢复时重新分析）"""
+        if st is None:
+            return
+        try:
+            blob = zlib.compress(json.dumps(results, separators=(',', ':')).encode('utf-8'), 1)
+        except (TypeError, ValueError):
+            return
+        self._pending.append((rel_path, st.st_mtime_ns, st.st_size, file_hash, blob))
+
+    def tick(self):
+        """每处理一个文件调用一次：距上次提交超过 interval 秒时提交"""
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            with self.conn:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO files (path, mtime_ns, size, hash, results) VALUES (?, ?, ?, ?, ?)',
+                    self._pending)
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+    def clear(self):
+        """丢弃保存的结果（扫描完整结束，或不恢复的新扫描开始时）"""
+        self._pending = []
+        self.saved = 0
+        with self.conn:
+            self.conn.execute('DELETE FROM files')
+
+    def stats(self):
+        return {
+            'saved': self.saved,
+            'resumed': self.resumed,
+            'revalidated': self.revalidated,
+        }
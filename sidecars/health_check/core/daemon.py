@@ -0,0 +1,121 @@
+# ============================================================================
+# sidecars/health_check/core/daemon.py
+# ============================================================================
+import os
+import json
+import socket
+import threading
+import socketserver
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """一个客户端连接：逐行读取 JSON 请求，交给共享的 HealthCheckService 处理"""
+
+    def handle(self):
+        service = self.server.service
+        write_lock = threading.Lock()
+
+        def write(line):
+            # 工作区扫描的流式消息可能来自多个线程
+            with write_lock:
+                self.wfile.write(line.encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+        service.bind_output(write)
+        try:
+            for raw in self.rfile:
+                try:
+                    req = json.loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                service.handle_request(req)
+                if not service.running:
+                    # stop 命令：关闭整个守护进程（shutdown 会等待 serve_forever 返回，需在其他线程调用）
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            service.bind_output(None)
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def is_running(socket_path):
+    """socket_path 上是否有守护进程在监听"""
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def serve(service, socket_path):
+    """
+    在 Unix 域套接字上提供与子进程模式相同的 JSON 行协议，直到收到 stop 命令
+
+    每个连接一个线程，多个客户端（编辑器窗口、命令行）共用同一个服务实例，
+    即同一个进程池、分析缓存与内存中的扫描结果。
+
+    Raises:
+        RuntimeError: 已有守护进程在该路径上运行
+    """
+    if is_running(socket_path):
+        raise RuntimeError(f"daemon already running at {socket_path}")
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+    if os.path.exists(socket_path):
+        # 上次异常退出遗留的套接字文件
+        os.remove(socket_path)
+
+    # 在 umask 下创建套接字文件，绑定的同时即为 0600（事后 chmod 之前其他用户有机会连接）
+    umask = os.umask(0o177)
+    try:
+        server = _Server(socket_path, _RequestHandler)
+    finally:
+        os.umask(umask)
+    server.service = service
+    service.running = True
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+
+
+def request(socket_path, req, on_message=None, timeout=None):
+    """
+    向守护进程发送一个请求并等待最终响应
+
+    Args:
+        req: 请求 dict（需带 id）
+        on_message: 收到中间消息（如流式 file 消息）时回调 on_message(message)
+        timeout: 套接字超时（秒，None 为不限制）
+    Returns:
+        dict: 最终响应；守护进程不可用时为 None
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+    except OSError:
+        return None
+
+    with sock, sock.makefile('rb') as reader:
+        sock.sendall(json.dumps(req).encode('utf-8') + b'\n')
+        for raw in reader:
+            message = json.loads(raw)
+            if message.get('id') == req.get('id') and 'type' not in message:
+                return message
+            if on_message:
+                on_message(message)
+    raise ConnectionError('daemon closed the connection')
@@ -0,0 +1,76 @@
+# ============================================================================
+# sidecars/health_check/core/diff_scan.py
+# ============================================================================
+import re
+from collections import Counter
+
+# 坏味道描述中的数字（行数、复杂度）会随修改变化，比较时忽略
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+
+def _findings(record):
+    """
+    提取文件记录中的所有发现，产出 (比较键, 发现)
+
+    比较键不含行号：代码上下移动不算新问题
+    """
+    if not record:
+        return
+    for item in record['secrets']:
+        yield ('secret', item['type'], item['preview']), {**item, 'category': 'secret'}
+    for item in record['risks']:
+        yield ('risk', item['type'], item['preview']), {**item, 'category': 'risk'}
+    for item in record['todos']:
+        yield ('todo', item['tag'], item['text']), {**item, 'category': 'todo'}
+    if record['smell']:
+        for issue in record['smell']['issues']:
+            yield ('smell', _NUMBER.sub('#', issue)), {
+                'category': 'smell', 'file': record['file'], 'issue': issue
+            }
+
+
+def _subtract(findings, other_keys):
+    """findings 中多出于 other_keys 的部分（按多重集合计算）"""
+    remaining = Counter(other_keys)
+    result = []
+    for key, item in findings:
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            result.append(item)
+    return result
+
+
+def compare_records(path, status, head, base, old_path=None):
+    """
+    比较同一文件在基准版本与当前版本中的分析结果
+
+    Args:
+        head / base: 扫描器产出的文件记录（文件不存在或被忽略时为 None）
+    Returns:
+        (文件变化摘要, 新增发现列表, 已修复发现列表)
+    """
+    head_findings = list(_findings(head))
+    base_findings = list(_findings(base))
+
+    new = _subtract(head_findings, [k for k, _ in base_findings])
+    fixed = _subtract(base_findings, [k for k, _ in head_findings])
+    # 基准版本的发现统一记在当前路径下
+    for item in fixed:
+        item['file'] = path
+
+    head_metrics = head['metrics'] if head else {}
+    base_metrics = base['metrics'] if base else {}
+    change = {
+        'file': path,
+        'status': status,
+        'lines_before': base_metrics.get('lines', 0),
+        'lines_after': head_metrics.get('lines', 0),
+        'complexity_before': base_metrics.get('complexity', 0),
+        'complexity_after': head_metrics.get('complexity', 0),
+        'new_findings': len(new),
+        'fixed_findings': len(fixed),
+    }
+    if old_path and old_path != path:
+        change['old_path'] = old_path
+    return change, new, fixed
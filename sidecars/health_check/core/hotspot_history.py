@@ -0,0 +1,155 @@
+# ============================================================================
+# sidecars/health_check/core/hotspot_history.py
+# ============================================================================
+import os
+import time
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from ..config import CACHE_DIR, HOTSPOT_HISTORY, HOTSPOT_TREND_THRESHOLD
+
+
+def _cache_key(blob_id, path):
+    """同一内容在不同语言下的分析结果不同，键中包含扩展名"""
+    return f"{blob_id}{os.path.splitext(path)[1].lower()}"
+
+
+class BlobMetricsCache:
+    """
+    按 blob id（+ 扩展名）缓存历史版本的复杂度（同一内容只分析一次）
+
+    每行记录计算时所用分析器的版本（MetricsAnalyzer.version），只读取与当前版本相同的行
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(CACHE_DIR, 'blob_metrics.sqlite3')
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=5)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS blob_metrics ('
+            'cache_key TEXT NOT NULL, version INTEGER NOT NULL, '
+            'lines INTEGER NOT NULL, complexity INTEGER NOT NULL, '
+            'PRIMARY KEY (cache_key, version)) WITHOUT ROWID'
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, keys, version):
+        """{缓存键: (行数, 复杂度)}，只含以该分析器版本缓存的部分"""
+        found = {}
+        keys = list(keys)
+        # 分批查询，避免超出 SQLite 的参数个数上限
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT cache_key, lines, complexity FROM blob_metrics "
+                f"WHERE version = ? AND cache_key IN ({', '.join('?' * len(chunk))})",
+                (version, *chunk))
+            for key, lines, complexity in rows:
+                found[key] = (lines, complexity)
+        return found
+
+    def put_many(self, metrics, version):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO blob_metrics (cache_key, version, lines, complexity) VALUES (?, ?, ?, ?)",
+                [(key, version, lines, complexity) for key, (lines, complexity) in metrics.items()])
+
+
+def _analyze_shard(git, analyzer, shard, deadline):
+    """在独立的 cat-file 进程中读取并分析一组 blob，截止时间到达即停止"""
+    results = {}
+    with git.open_blob_reader() as reader:
+        for blob_id, path in shard:
+            if time.monotonic() >= deadline:
+                break
+            data = reader.read(blob_id)
+            if data is None:
+                continue
+            lines = data.decode('utf-8', errors='ignore').splitlines(keepends=True)
+            metrics = analyzer.analyze(path, path, lines)
+            results[_cache_key(blob_id, path)] = (metrics.get('lines', 0), metrics.get('complexity', 0))
+    return results
+
+
+def _classify(samples):
+    """根据最早与最新版本的复杂度判断走势"""
+    if len(samples) < 2:
+        return 'unknown'
+    first, last = samples[0]['complexity'], samples[-1]['complexity']
+    change = (last - first) / max(first, 1)
+    if change > HOTSPOT_TREND_THRESHOLD:
+        return 'growing'
+    if change < -HOTSPOT_TREND_THRESHOLD:
+        return 'shrinking'
+    return 'stable'
+
+
+def sample_hotspot_history(git, analyzer, files_data, options=None, cache=None):
+    """
+    对修改最频繁的文件，采样其最近若干版本的复杂度
+
+    Args:
+        git: GitAnalyzer
+        analyzer: 用于计算复杂度的 MetricsAnalyzer
+        files_data: 扫描结果中的 files_data（需已填充 churn）
+        options: 覆盖 config.HOTSPOT_HISTORY 中的 files / revisions / time_budget / workers
+        cache: BlobMetricsCache（None 时不缓存）
+    Returns:
+        dict: {'files': [...], 'computed', 'cached', 'truncated'}
+    """
+    settings = {**HOTSPOT_HISTORY, **(options or {})}
+    deadline = time.monotonic() + settings['time_budget']
+
+    candidates = sorted((f for f in files_data if f['churn'] > 0),
+                        key=lambda f: f['churn'], reverse=True)[:settings['files']]
+    if not candidates:
+        return {'files': [], 'computed': 0, 'cached': 0, 'truncated': False}
+
+    history = git.get_file_blob_history(
+        [f['path'] for f in candidates], settings['revisions'], timeout=settings['time_budget'])
+
+    # 去重后只分析缓存中没有的 blob
+    blobs = {}
+    for path, revisions in history.items():
+        for _, _, blob_id in revisions:
+            blobs.setdefault(_cache_key(blob_id, path), (blob_id, path))
+    metrics = cache.get_many(blobs, analyzer.version) if cache else {}
+    cached = len(metrics)
+    pending = [item for key, item in blobs.items() if key not in metrics]
+
+    # 各线程使用自己的 cat-file 进程，git 解压与读取并行进行
+    workers = max(1, min(settings['workers'], len(pending)))
+    computed = {}
+    if pending:
+        shards = [pending[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(lambda shard: _analyze_shard(git, analyzer, shard, deadline), shards):
+                computed.update(result)
+        if cache and computed:
+            cache.put_many(computed, analyzer.version)
+    metrics.update(computed)
+
+    truncated = len(metrics) < len(blobs)
+    files = []
+    for file_data in candidates:
+        path = file_data['path']
+        samples = []
+        for sha, timestamp, blob_id in reversed(history.get(path, [])):
+            key = _cache_key(blob_id, path)
+            if key in metrics:
+                lines, complexity = metrics[key]
+                samples.append({'commit': sha, 'timestamp': timestamp, 'lines': lines, 'complexity': complexity})
+        if not samples:
+            continue
+        files.append({
+            'file': file_data['path'],
+            'churn': file_data['churn'],
+            'complexity': file_data['complexity'],
+            'samples': samples,
+            'delta': samples[-1]['complexity'] - samples[0]['complexity'],
+            'trend': _classify(samples),
+        })
+
+    return {'files': files, 'computed': len(computed), 'cached': cached, 'truncated': truncated}
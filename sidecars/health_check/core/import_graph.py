@@ -0,0 +1,310 @@
+# ============================================================================
+# sidecars/health_check/core/import_graph.py
+# ============================================================================
+import os
+import re
+import json
+import posixpath
+from array import array
+
+from ..analyzers.import_extractor import top_level_package
+
+# JS/TS 相对导入时依次尝试的扩展名与目录入口
+JS_EXTENSIONS = ('.ts', '.tsx', '.d.ts', '.js', '.jsx', '.mjs', '.cjs', '.vue', '.svelte')
+JS_INDEX_FILES = tuple('index' + ext for ext in JS_EXTENSIONS)
+
+# 字符串或注释；替换时保留字符串，去掉注释（用于解析 tsconfig 的 JSONC）
+_JSONC_TOKEN = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', re.DOTALL)
+_TRAILING_COMMA = re.compile(r'("(?:\\.|[^"\\])*")|,(\s*[}\]])')
+
+
+def load_jsonc(path):
+    """读取允许注释和尾逗号的 JSON（tsconfig.json 格式）"""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        text = f.read()
+    text = _JSONC_TOKEN.sub(lambda m: m.group(1) or '', text)
+    text = _TRAILING_COMMA.sub(lambda m: m.group(1) or m.group(2), text)
+    return json.loads(text)
+
+
+class ModuleResolver:
+    """把 import 字符串解析为项目内的文件（只查内存中的文件集合，不访问文件系统）"""
+
+    def __init__(self, root_path, files):
+        # 内部统一使用 '/' 分隔的相对路径
+        self.files = set(files)
+        self.base_url = None
+        self.aliases = []  # [(前缀, 后缀, [目标模板...])]
+        self._load_ts_paths(root_path)
+
+    def _load_ts_paths(self, root_path):
+        """读取根目录 tsconfig/jsconfig 中的 baseUrl 与 paths 别名"""
+        for name in ('tsconfig.json', 'jsconfig.json'):
+            path = os.path.join(root_path, name)
+            if not os.path.isfile(path):
+                continue
+            try:
+                options = load_jsonc(path).get('compilerOptions', {})
+            except (OSError, ValueError):
+                continue
+
+            base_url = options.get('baseUrl')
+            if base_url is not None:
+                self.base_url = posixpath.normpath(base_url.replace('\\', '/'))
+            base = self.base_url or '.'
+
+            for pattern, targets in (options.get('paths') or {}).items():
+                prefix, star, suffix = pattern.partition('*')
+                templates = [posixpath.normpath(posixpath.join(base, t)) for t in targets]
+                self.aliases.append((prefix, suffix if star else None, templates))
+
+            # 最长前缀优先匹配，与 TypeScript 行为一致
+            self.aliases.sort(key=lambda a: len(a[0]), reverse=True)
+            return
+
+    def resolve(self, importer, module, lang):
+        """
+        Args:
+            importer: 发起导入的文件（'/' 分隔的相对路径）
+            module: import 字符串
+            lang: 'python' 或 'javascript'
+        Returns:
+            str | None: 被导入文件的相对路径，无法解析（外部依赖）时为 None
+        """
+        if lang == 'python':
+            return self._resolve_python(importer, module)
+        return self._resolve_js(importer, module)
+
+    def _first_file(self, base, candidates):
+        for suffix in candidates:
+            path = base + suffix
+            if path in self.files:
+                return path
+        return None
+
+    def _resolve_js_path(self, base):
+        base = posixpath.normpath(base)
+        if base.startswith('../'):
+            return None
+        return (self._first_file(base, ('',) + JS_EXTENSIONS)
+                or self._first_file(base + '/', JS_INDEX_FILES))
+
+    def _resolve_js(self, importer, module):
+        if module.startswith('.'):
+            return self._resolve_js_path(posixpath.join(posixpath.dirname(importer), module))
+
+        for prefix, suffix, templates in self.aliases:
+            if suffix is None:
+                if module != prefix:
+                    continue
+                matched = ''
+            elif module.startswith(prefix) and module.endswith(suffix) \
+                    and len(module) >= len(prefix) + len(suffix):
+                matched = module[len(prefix):len(module) - len(suffix)]
+            else:
+                continue
+            for template in templates:
+                target = self._resolve_js_path(template.replace('*', matched))
+                if target:
+                    return target
+
+        if self.base_url is not None:
+            return self._resolve_js_path(posixpath.join(self.base_url, module))
+        return None
+
+    def _resolve_python(self, importer, module):
+        if module.startswith('.'):
+            # from ..pkg.mod import x：每多一个点向上一级包
+            dots = len(module) - len(module.lstrip('.'))
+            package = posixpath.dirname(importer)
+            for _ in range(dots - 1):
+                package = posixpath.dirname(package)
+            rest = module[dots:].replace('.', '/')
+            base = posixpath.join(package, rest) if rest else package
+            target = self._first_file(base, ('.py', '/__init__.py'))
+            if target is None and rest:
+                # from . import name 中 name 不是子模块时，依赖的是包本身
+                init = posixpath.join(package, '__init__.py')
+                target = init if init in self.files else None
+            return target
+
+        # 绝对导入：依次以导入方所在的各级目录作为源码根尝试
+        rest = module.replace('.', '/')
+        directory = posixpath.dirname(importer)
+        while True:
+            base = posixpath.join(directory, rest) if directory else rest
+            target = self._first_file(base, ('.py', '/__init__.py'))
+            if target:
+                return target
+            if not directory:
+                return None
+            directory = posixpath.dirname(directory)
+
+
+class ImportGraph:
+    """
+    模块依赖图
+
+    节点为文件，邻接表以 CSR 形式存放在两个 array('i') 中：
+    targets[offsets[i]:offsets[i + 1]] 为节点 i 导入的节点
+    """
+
+    def __init__(self, nodes, offsets, targets, local_packages=None):
+        self.nodes = nodes
+        self.offsets = offsets
+        self.targets = targets
+        # 以非相对形式导入、但解析到项目内文件的顶层包：{(语言, 包名)}
+        self.local_packages = local_packages or set()
+
+    @classmethod
+    def build(cls, root_path, imports, all_files):
+        """
+        一次遍历构建依赖图
+
+        Args:
+            imports: (相对路径, [(import 字符串, 语言), ...]) 的可迭代对象（可以是只能遍历一次的迭代器）
+            all_files: 项目内全部相对路径（用于解析目标）
+        Returns:
+            (ImportGraph, 未能解析的项目内导入数)
+        """
+        posix = {path: path.replace(os.sep, '/') for path in all_files}
+        resolver = ModuleResolver(root_path, posix.values())
+
+        nodes = sorted(posix.values())
+        index = {path: i for i, path in enumerate(nodes)}
+
+        offsets = array('i', [0])
+        targets = array('i')
+        unresolved = 0
+        edges_by_src = {}
+        local_packages = set()
+
+        for path, file_imports in imports:
+            src = posix.get(path, path.replace(os.sep, '/'))
+            if src not in index:
+                continue
+            seen = set()
+            for module, lang in file_imports:
+                target = resolver.resolve(src, module, lang)
+                if target is None:
+                    # 相对导入解析失败说明文件缺失或被忽略
+                    if module.startswith('.'):
+                        unresolved += 1
+                    continue
+                if not module.startswith('.'):
+                    local_packages.add((lang, top_level_package(module, lang)))
+                seen.add(index[target])
+            if seen:
+                edges_by_src[index[src]] = sorted(seen)
+
+        for i in range(len(nodes)):
+            targets.extend(edges_by_src.get(i, ()))
+            offsets.append(len(targets))
+
+        return cls(nodes, offsets, targets, local_packages), unresolved
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def successors(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def fan_out(self):
+        offsets = self.offsets
+        return array('i', (offsets[i + 1] - offsets[i] for i in range(len(self.nodes))))
+
+    def fan_in(self):
+        counts = array('i', [0]) * len(self.nodes)
+        for t in self.targets:
+            counts[t] += 1
+        return counts
+
+    def strongly_connected_components(self):
+        """迭代版 Tarjan 算法，返回所有 SCC（节点下标列表），O(V + E)"""
+        n = len(self.nodes)
+        offsets, targets = self.offsets, self.targets
+        order = array('i', [-1]) * n      # 访问序号
+        low = array('i', [0]) * n
+        on_stack = bytearray(n)
+        stack = []
+        components = []
+        counter = 0
+
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            # 调用栈元素：(节点, 下一个待访问的邻接下标)
+            work = [(root, offsets[root])]
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+
+            while work:
+                node, pos = work[-1]
+                end = offsets[node + 1]
+                if pos < end:
+                    work[-1] = (node, pos + 1)
+                    succ = targets[pos]
+                    if order[succ] == -1:
+                        order[succ] = low[succ] = counter
+                        counter += 1
+                        stack.append(succ)
+                        on_stack[succ] = 1
+                        work.append((succ, offsets[succ]))
+                    elif on_stack[succ] and order[succ] < low[node]:
+                        low[node] = order[succ]
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+        return components
+
+    def cycles(self):
+        """返回存在循环依赖的 SCC（含自导入）"""
+        result = []
+        for component in self.strongly_connected_components():
+            if len(component) > 1:
+                result.append(component)
+            else:
+                node = component[0]
+                if node in self.successors(node):
+                    result.append(component)
+        return result
+
+    def summarize(self, top_n=10, max_cycle_members=20):
+        """生成可 JSON 序列化的依赖图摘要"""
+        nodes = self.nodes
+        fan_in = self.fan_in()
+        fan_out = self.fan_out()
+        cycles = sorted(self.cycles(), key=len, reverse=True)
+
+        def top(counts):
+            ranked = sorted(range(len(nodes)), key=lambda i: counts[i], reverse=True)[:top_n]
+            return [{'file': nodes[i], 'count': counts[i]} for i in ranked if counts[i] > 0]
+
+        return {
+            'modules': len(nodes),
+            'edges': self.edge_count,
+            'cycle_count': len(cycles),
+            'cycles': [
+                {'size': len(c), 'files': sorted(nodes[i] for i in c)[:max_cycle_members]}
+                for c in cycles[:top_n]
+            ],
+            'fan_in': top(fan_in),
+            'fan_out': top(fan_out),
+        }
@@ -0,0 +1,107 @@
+# ============================================================================
+# sidecars/health_check/core/profiler.py
+# ============================================================================
+import time
+import heapq
+from contextlib import contextmanager, nullcontext
+
+_NULL_CONTEXT = nullcontext()
+
+
+class ScanProfiler:
+    """扫描性能剖析器：按阶段、按分析器累计耗时与调用次数"""
+
+    enabled = True
+
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+        self.phases = {}
+        self.analyzers = {}
+        self.bytes_read = 0
+        self._slowest = []  # 最小堆，保留最慢的 top_n 个文件
+
+    @contextmanager
+    def phase(self, name):
+        """统计一个阶段的耗时（可多次进入，累计）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def add_phase(self, name, seconds):
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def add_analyzer(self, name, seconds):
+        entry = self.analyzers.get(name)
+        if entry is None:
+            self.analyzers[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def add_read(self, nbytes):
+        """记录实际从磁盘读取的字节数（检查点或缓存命中而未读取的文件不计）"""
+        self.bytes_read += nbytes
+
+    def add_file(self, rel_path, seconds, nbytes):
+        """记录单个文件的总处理耗时与大小"""
+        item = (seconds, rel_path, nbytes)
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, item)
+        elif item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def to_dict(self):
+        """转换为可 JSON 序列化的结果"""
+        def table(entries):
+            return {
+                name: {'seconds': round(total, 4), 'calls': calls}
+                for name, (total, calls) in sorted(entries.items(), key=lambda x: x[1][0], reverse=True)
+            }
+
+        return {
+            'phases': table(self.phases),
+            'analyzers': table(self.analyzers),
+            'slowest_files': [
+                {'file': path, 'seconds': round(seconds, 4), 'bytes': nbytes}
+                for seconds, path, nbytes in sorted(self._slowest, reverse=True)
+            ],
+            'bytes_read': self.bytes_read,
+        }
+
+
+class NullProfiler:
+    """未启用剖析时使用的空实现，所有方法均为空操作"""
+
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_CONTEXT
+
+    def add_phase(self, name, seconds):
+        pass
+
+    def add_analyzer(self, name, seconds):
+        pass
+
+    def add_read(self, nbytes):
+        pass
+
+    def add_file(self, rel_path, seconds, nbytes):
+        pass
+
+    def to_dict(self):
+        return None
+
+
+def create_profiler(options):
+    """根据扫描配置创建剖析器（profiling=True 时启用）"""
+    if options.get('profiling'):
+        return ScanProfiler(top_n=options.get('profile_top_n', 10))
+    return NullProfiler()
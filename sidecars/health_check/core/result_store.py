@@ -0,0 +1,265 @@
+# ============================================================================
+# sidecars/health_check/core/result_store.py
+# ============================================================================
+import os
+import json
+import hashlib
+import sqlite3
+
+from ..config import CACHE_DIR, RESULT_STORE
+
+# 逐文件列表类结果（findings 表的 category）
+FINDING_CATEGORIES = ('todos', 'secrets', 'risks', 'bad_smells')
+
+_SCHEMA = """
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    lines INTEGER NOT NULL,
+    code INTEGER NOT NULL,
+    complexity INTEGER NOT NULL,
+    functions INTEGER NOT NULL,
+    churn INTEGER NOT NULL DEFAULT 0,
+    issues INTEGER NOT NULL
+);
+CREATE INDEX idx_files_complexity ON files (complexity);
+CREATE TABLE findings (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    score INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX idx_findings_category ON findings (category, score);
+CREATE TABLE deps (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (kind, name)
+) WITHOUT ROWID;
+CREATE TABLE hashes (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE TABLE imports (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+_FILE_COLUMNS = ('name', 'path', 'lines', 'code', 'complexity', 'functions', 'churn')
+
+
+def default_store_path(root_path):
+    """项目的默认结果库路径：CACHE_DIR/results/<根目录哈希>.sqlite3"""
+    digest = hashlib.sha1(os.path.abspath(root_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, 'results', f'{digest}.sqlite3')
+
+
+class ResultStore:
+    """
+    扫描结果的磁盘存储（SQLite）
+
+    扫描过程中逐文件追加写入（攒批提交），查重、排序与计数在扫描结束后通过 SQL 完成，
+    内存中只保留汇总数字与各列表的前 N 项，占用与仓库规模无关。
+    结果库只对应最近一次扫描，打开时清空。
+    """
+
+    def __init__(self, db_path, batch_size=None):
+        self.db_path = db_path
+        self.batch_size = batch_size or RESULT_STORE['batch_size']
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        for suffix in ('', '-journal', '-wal', '-shm'):
+            try:
+                os.remove(db_path + suffix)
+            except FileNotFoundError:
+                pass
+        self.conn = sqlite3.connect(db_path)
+        # 结果库可随时重建：不需要日志与落盘同步
+        self.conn.execute('PRAGMA journal_mode = OFF')
+        self.conn.execute('PRAGMA synchronous = OFF')
+        self.conn.executescript(_SCHEMA)
+        self._files = []
+        self._findings = []
+        self._deps = []
+        self._hashes = []
+        self._imports = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----- 写入 -----
+
+    def add(self, record):
+        """写入单个文件的结果记录（ProjectScanner._build_file_record 的结构）"""
+        file_data = record['metrics']
+        smell = record['smell']
+        issues = len(record['secrets']) + len(record['risks']) + (len(smell['issues']) if smell else 0)
+        self._files.append((file_data['path'], file_data['name'], file_data['lines'], file_data['code'],
+                            file_data['complexity'], file_data['functions'], issues))
+
+        for category in ('todos', 'secrets', 'risks'):
+            for item in record[category]:
+                self._findings.append((category, 0, json.dumps(item, ensure_ascii=False)))
+        if smell:
+            self._findings.append(('bad_smells', smell['score'], json.dumps(smell, ensure_ascii=False)))
+        for name, result in record['custom'].items():
+            self._findings.append((f'custom:{name}', 0,
+                                   json.dumps({**result, 'file': record['file']}, ensure_ascii=False)))
+
+        if record['imports']:
+            self._imports.append((record['file'], json.dumps(record['imports'], ensure_ascii=False)))
+        self._deps.extend(('external', name) for name in record['external_deps'])
+        self._deps.extend(('internal', name) for name in record['internal_deps'])
+
+        if len(self._files) + len(self._findings) >= self.batch_size:
+            self.flush()
+
+    def add_hash(self, file_hash, rel_path):
+        """登记文件内容哈希（用于查重）"""
+        self._hashes.append((file_hash, rel_path))
+        if len(self._hashes) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """提交缓冲中的行"""
+        with self.conn:
+            if self._files:
+                self.conn.executemany(
+                    'INSERT INTO files (path, name, lines, code, complexity, functions, issues) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)', self._files)
+            if self._findings:
+                self.conn.executemany(
+                    'INSERT INTO findings (category, score, data) VALUES (?, ?, ?)', self._findings)
+            if self._deps:
+                self.conn.executemany('INSERT OR IGNORE INTO deps (kind, name) VALUES (?, ?)', self._deps)
+            if self._hashes:
+                self.conn.executemany('INSERT INTO hashes (hash, path) VALUES (?, ?)', self._hashes)
+            if self._imports:
+                self.conn.executemany('INSERT INTO imports (path, data) VALUES (?, ?)', self._imports)
+        self._files = []
+        self._findings = []
+        self._deps = []
+        self._hashes = []
+        self._imports = []
+
+    def set_churn(self, churn_map):
+        """按 Git 修改频率填充各文件的 churn（churn_map 的键为 / 分隔的相对路径）"""
+        self.flush()
+        updates = []
+        for file_id, path in self.conn.execute('SELECT id, path FROM files'):
+            churn = churn_map.get(path.replace('\\', '/'), 0)
+            if churn:
+                updates.append((churn, file_id))
+        with self.conn:
+            self.conn.executemany('UPDATE files SET churn = ? WHERE id = ?', updates)
+
+    # ----- 查询 -----
+
+    def counts(self):
+        """各列表的完整条目数"""
+        self.flush()
+        counts = {category: 0 for category in FINDING_CATEGORIES}
+        counts.update(self.conn.execute(
+            "SELECT category, COUNT(*) FROM findings WHERE category NOT LIKE 'custom:%' GROUP BY category"))
+        counts['files_data'] = self.conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+        counts['duplicates'] = self.conn.execute(
+            'SELECT COUNT(*) FROM (SELECT 1 FROM hashes GROUP BY hash HAVING COUNT(*) > 1)').fetchone()[0]
+        return counts
+
+    def files(self, limit=None):
+        """复杂度最高的前 limit 个文件的 file_data"""
+        self.flush()
+        rows = self.conn.execute(
+            f"SELECT {', '.join(_FILE_COLUMNS)} FROM files ORDER BY complexity DESC, id LIMIT ?",
+            (-1 if limit is None else limit,))
+        return [dict(zip(_FILE_COLUMNS, row)) for row in rows]
+
+    def files_by_churn(self, limit):
+        """修改最频繁的前 limit 个文件的 file_data（只含 churn > 0 的文件）"""
+        self.flush()
+        rows = self.conn.execute(
+            f"SELECT {', '.join(_FILE_COLUMNS)} FROM files WHERE churn > 0 "
+            f"ORDER BY churn DESC, id LIMIT ?", (limit,))
+        return [dict(zip(_FILE_COLUMNS, row)) for row in rows]
+
+    def iter_files(self, with_issues=False):
+        """
+        按扫描顺序逐个产出 file_data（不一次性载入内存）
+
+        Args:
+            with_issues: 同时给出各文件的问题数 issues（密钥 + 风险 + 坏味道条目）
+        """
+        self.flush()
+        columns = _FILE_COLUMNS + ('issues',) if with_issues else _FILE_COLUMNS
+        cursor = self.conn.execute(f"SELECT {', '.join(columns)} FROM files ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(columns, row))
+
+    def iter_imports(self):
+        """按扫描顺序逐个产出 (相对路径, [(import 字符串, 语言), ...])，只含有导入的文件"""
+        self.flush()
+        cursor = self.conn.execute('SELECT path, data FROM imports ORDER BY id')
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            for path, data in rows:
+                yield path, [tuple(item) for item in json.loads(data)]
+
+    def iter_paths(self):
+        """按扫描顺序产出各文件的相对路径"""
+        self.flush()
+        for (path,) in self.conn.execute('SELECT path FROM files ORDER BY id'):
+            yield path
+
+    def findings(self, category, limit=None):
+        """某类条目的前 limit 项（bad_smells 按分数降序，其余按扫描顺序）"""
+        self.flush()
+        order = 'score DESC, id' if category == 'bad_smells' else 'id'
+        rows = self.conn.execute(
+            f'SELECT data FROM findings WHERE category = ? ORDER BY {order} LIMIT ?',
+            (category, -1 if limit is None else limit))
+        return [json.loads(data) for (data,) in rows]
+
+    def custom(self, limit=None):
+        """第三方分析器的结果：{注册名: 前 limit 项}"""
+        self.flush()
+        names = [category for (category,) in self.conn.execute(
+            "SELECT DISTINCT category FROM findings WHERE category LIKE 'custom:%' ORDER BY category")]
+        return {name.split(':', 1)[1]: self.findings(name, limit) for name in names}
+
+    def deps(self, kind):
+        """某类依赖的完整有序列表"""
+        self.flush()
+        return [name for (name,) in self.conn.execute(
+            'SELECT name FROM deps WHERE kind = ? ORDER BY name', (kind,))]
+
+    def duplicates(self, limit=None):
+        """内容相同的文件组（按首次出现的顺序），最多 limit 组"""
+        self.flush()
+        rows = self.conn.execute(
+            'SELECT h.hash, h.path FROM hashes h JOIN ('
+            '  SELECT hash, MIN(id) AS first FROM hashes GROUP BY hash HAVING COUNT(*) > 1'
+            '  ORDER BY first LIMIT ?'
+            ') d ON d.hash = h.hash ORDER BY d.first, h.id', (-1 if limit is None else limit,))
+        groups = []
+        current = None
+        for file_hash, path in rows:
+            if file_hash != current:
+                groups.append([])
+                current = file_hash
+            groups[-1].append(path)
+        return groups
@@ -0,0 +1,325 @@
+# ============================================================================
+# sidecars/health_check/core/sampling.py
+# ============================================================================
+import os
+import math
+import random
+from statistics import NormalDist
+
+from ..config import LANG_MAP, SAMPLING
+
+# 估计的逐文件指标
+METRICS = ('lines', 'code', 'complexity', 'issues')
+
+
+def stratum_of(rel_path):
+    """分层键：(顶层目录, 语言)；根目录下的文件归入 '.'"""
+    parts = rel_path.split(os.sep, 1)
+    top = parts[0] if len(parts) > 1 else '.'
+    return top, LANG_MAP.get(os.path.splitext(rel_path)[1].lower(), 'Other')
+
+
+def record_values(record):
+    """从单个文件的结果记录取出各指标（issues 与 summary.issues 的口径一致：密钥 + 风险 + 坏味道文件）"""
+    metrics = record['metrics']
+    issues = len(record['secrets']) + len(record['risks']) + (1 if record['smell'] else 0)
+    return metrics['lines'], metrics['code'], metrics['complexity'], issues
+
+
+# 稀疏层逐级合并的目标：(顶层目录, 语言) -> (*, 语言) -> (*, *)
+_MERGED = '*'
+# 必然入样层（最大的文件）
+_TAKE_ALL = ('+', '+')
+
+
+class StratifiedSampler:
+    """
+    分层随机抽样调度器：先完整遍历，再按随机顺序产出文件
+
+    文件大小呈长尾分布，少数大文件占了相当比例的行数与复杂度：按大小成比例抽样时入样概率
+    不小于 SAMPLING['take_all'] 的文件（字节数 ≥ take_all × 剩余字节数 / 剩余样本数）全部入样，
+    不参与估计的方差。
+    其余文件分层为 (顶层目录, 语言)，按比例分配达不到 SAMPLING['min_per_stratum'] 个样本的
+    稀疏层先并入 (*, 语言)，仍不足的再并入 (*, *)，保证每层至少有 min_per_stratum 个样本
+    可估计层内方差。
+
+    前 sampled 个文件是样本，之后以随机顺序产出其余文件。任一时刻已完成的文件在每层内
+    都近似为随机子集，因此扫描继续进行时估计值逐步收敛到精确值。
+    """
+
+    def __init__(self, sample_size, seed=None):
+        """
+        Args:
+            sample_size: 样本文件数（int），或占全部文件的比例（0~1 之间的 float）
+            seed: 随机种子（相同种子与文件集合得到相同的顺序）
+        """
+        self.sample_size = sample_size
+        self.rng = random.Random(seed)
+        # 分层键 -> [((语言, 顶层目录, 字节数), item)]
+        self._strata = {}
+        # 原始分层键 -> 合并后的分层键、必然入样的字节数下限（产出开始时确定）
+        self._merged = {}
+        self.threshold = None
+
+    def push(self, item, rel_path, size=0):
+        """
+        Args:
+            size: 文件字节数
+        """
+        key = stratum_of(rel_path)
+        self._strata.setdefault(key, []).append(((key[1], key[0], size), item))
+
+    def population(self):
+        """{分层键: 文件数}"""
+        return {key: len(entries) for key, entries in self._strata.items()}
+
+    def stratum(self, rel_path, size=0):
+        """文件所属的（合并后的）分层键"""
+        if self.threshold is not None and size >= self.threshold:
+            return _TAKE_ALL
+        key = stratum_of(rel_path)
+        return self._merged.get(key, key)
+
+    def _size(self, total):
+        size = self.sample_size
+        if isinstance(size, float) and size < 1:
+            size = math.ceil(total * size)
+        return min(size, total)
+
+    def _plan(self):
+        """分出必然入样的大文件，再把按比例分配不足 min_per_stratum 个样本的层逐级合并"""
+        total = sum(len(entries) for entries in self._strata.values())
+        size = self._size(total)
+
+        sizes = sorted((entry[0][2] for entries in self._strata.values() for entry in entries), reverse=True)
+        remaining = sum(sizes)
+        count = 0
+        while count < size and sizes[count] and sizes[count] * (size - count) >= remaining * SAMPLING['take_all']:
+            remaining -= sizes[count]
+            count += 1
+        take_all = []
+        if count:
+            self.threshold = sizes[count - 1]
+            for key, entries in self._strata.items():
+                take_all.extend(entry for entry in entries if entry[0][2] >= self.threshold)
+                self._strata[key] = [entry for entry in entries if entry[0][2] < self.threshold]
+            self._strata = {key: entries for key, entries in self._strata.items() if entries}
+            total -= len(take_all)
+            size = max(size - len(take_all), 0)
+
+        minimum = SAMPLING['min_per_stratum']
+        mapping = {key: key for key in self._strata}
+        for coarsen in (lambda key: (_MERGED, key[1]), lambda key: (_MERGED, _MERGED)):
+            target = {
+                key: coarsen(key) if key != (_MERGED, _MERGED) and size * len(entries) < minimum * total else key
+                for key, entries in self._strata.items()
+            }
+            merged = {}
+            for key, entries in self._strata.items():
+                merged.setdefault(target[key], []).extend(entries)
+            self._strata = merged
+            mapping = {raw: target[key] for raw, key in mapping.items()}
+        self._merged = mapping
+        if take_all:
+            self._strata[_TAKE_ALL] = take_all
+
+    def allocation(self):
+        """{分层键: 样本中的文件数}（产出时在分出大文件、合并稀疏层之后计算）"""
+        strata = {key: entries for key, entries in self._strata.items() if key != _TAKE_ALL}
+        allocation = {_TAKE_ALL: len(self._strata[_TAKE_ALL])} if _TAKE_ALL in self._strata else {}
+        total = sum(len(entries) for entries in strata.values())
+        if not total:
+            return allocation
+        size = max(self._size(total + sum(allocation.values())) - sum(allocation.values()), 0)
+        # 最大余数法按比例分配，样本总数与 size 一致
+        quotas = {key: size * len(entries) / total for key, entries in strata.items()}
+        shares = {key: int(quota) for key, quota in quotas.items()}
+        remaining = size - sum(shares.values())
+        for key in sorted(quotas, key=lambda k: quotas[k] - shares[k], reverse=True)[:max(remaining, 0)]:
+            shares[key] += 1
+        # 每层至少 min_per_stratum 个（合并后只有 (*, *) 层可能因此多抽几个）
+        minimum = SAMPLING['min_per_stratum']
+        for key, entries in strata.items():
+            allocation[key] = min(len(entries), max(minimum, shares[key]))
+        return allocation
+
+    def __iter__(self):
+        self._plan()
+        allocation = self.allocation()
+        sample = []
+        rest = []
+        for key, entries in self._strata.items():
+            # 层内等距抽样（随机起点）：按 语言、顶层目录、大小 排序后，样本在合并层内的语言构成
+            # 与文件大小分布都与总体一致（隐含分层），按简单随机抽样估计的方差偏保守
+            entries.sort(key=lambda entry: entry[0])
+            count = allocation[key]
+            step = len(entries) / count if count else 0
+            start = self.rng.random() * step
+            chosen = {int(start + i * step) for i in range(count)}
+            for index, (_, item) in enumerate(entries):
+                (sample if index in chosen else rest).append(item)
+        self.rng.shuffle(sample)
+        self.rng.shuffle(rest)
+        # 产出开始后遍历已完成：各层文件数与样本大小固定下来，供估计使用
+        self.sizes = self.population()
+        self.sampled = len(sample)
+        self._strata = {}
+        yield from sample
+        yield from rest
+
+
+class _Stratum:
+    __slots__ = ('n', 'sums', 'squares', 'cross')
+
+    def __init__(self):
+        self.n = 0
+        self.sums = [0.0] * len(METRICS)
+        self.squares = [0.0] * len(METRICS)
+        # issues × code 的累计，用于问题密度（比率估计）的协方差
+        self.cross = 0.0
+
+
+def _t_quantile(p, df):
+    """Student t 分布的分位数（Cornish-Fisher 展开，df ≥ 3 时误差 < 1%；df 为 inf 时即正态分位数）"""
+    z = NormalDist().inv_cdf(p)
+    if math.isinf(df):
+        return z
+    df = max(df, 1.0)
+    return (z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+
+class StratifiedEstimator:
+    """
+    分层估计：总量 = Σ N_h · 样本均值_h，方差含有限总体校正 (1 - n_h/N_h)
+
+    样本较小时区间用 t 分位数（自由度按 Welch-Satterthwaite 合并各层）。抽样阶段完成后
+    每层至少有 2 个样本（见 StratifiedSampler）；扫描在此之前被截断、某层不足 2 个样本时，
+    该层的方差取全部样本的二阶原点矩（指标非负时不小于任何一层的方差，区间偏宽而不偏窄）。
+    已全部完成的层（包括必然入样层）直接计入精确值，所有文件完成后置信区间宽度为 0。
+    """
+
+    def __init__(self, population, confidence=None, key_of=None):
+        """
+        Args:
+            population: {分层键: 文件数}
+            confidence: 置信水平（默认 SAMPLING['confidence']）
+            key_of: (相对路径, 字节数) -> 分层键（默认按 stratum_of；抽样扫描时为 StratifiedSampler.stratum）
+        """
+        self.population = dict(population)
+        self.confidence = confidence or SAMPLING['confidence']
+        self.key_of = key_of or (lambda rel_path, size: stratum_of(rel_path))
+        self._strata = {key: _Stratum() for key in self.population}
+        self.sampled = 0
+
+    def add(self, record, rel_path=None, size=0):
+        """
+        加入一个已完成的文件
+
+        Args:
+            size: 文件字节数（决定是否属于必然入样层）
+        """
+        key = self.key_of(rel_path or record['file'], size)
+        stratum = self._strata.get(key)
+        if stratum is None:
+            stratum = self._strata[key] = _Stratum()
+        values = record_values(record)
+        stratum.n += 1
+        if stratum.n > self.population.get(key, 0):
+            # 遍历时未见过的文件：总体至少包含已完成的文件
+            self.population[key] = stratum.n
+        for i, value in enumerate(values):
+            stratum.sums[i] += value
+            stratum.squares[i] += value * value
+        stratum.cross += values[3] * values[1]
+        self.sampled += 1
+
+    def complete(self):
+        """扫描完整结束：未产生结果的文件（读取失败、超时）不再计入总体"""
+        self.population = {key: stratum.n for key, stratum in self._strata.items()}
+
+    def estimate(self):
+        """
+        Returns:
+            dict: {'sampled', 'population', 'exact', 'confidence',
+                   'totals': {指标: {'estimate', 'low', 'high', 'stderr'}},
+                   'issue_density': 每千行代码的问题数 {'estimate', 'low', 'high'}}
+        """
+        size = len(METRICS)
+        issues, code = METRICS.index('issues'), METRICS.index('code')
+
+        # 全部样本的均值与二阶原点矩，用于不足 2 个样本的层
+        n_all = sum(s.n for s in self._strata.values())
+        means = [sum(s.sums[i] for s in self._strata.values()) / n_all if n_all else 0.0 for i in range(size)]
+        moments = [sum(s.squares[i] for s in self._strata.values()) / n_all if n_all else 0.0 for i in range(size)]
+
+        totals = [0.0] * size
+        # 各层对方差的贡献 (N_h²(1-f_h)/n_h · s²_h, 自由度)，协方差另计
+        terms = [[] for _ in range(size)]
+        covariance = 0.0
+        for key, count in self.population.items():
+            stratum = self._strata[key]
+            n = stratum.n
+            if n >= count:
+                # 整层已完成：精确
+                for i in range(size):
+                    totals[i] += stratum.sums[i]
+                continue
+            weight = count * count * (1 - n / count) / max(n, 1)
+            if n < 2:
+                # 均值取已有样本（没有时取全部样本），方差取保守上界；协方差取最不利的
+                # -sqrt(m_issues · m_code)，使问题密度的区间同样偏宽
+                for i in range(size):
+                    totals[i] += count * (stratum.sums[i] / n if n else means[i])
+                    terms[i].append((weight * moments[i], 1))
+                covariance -= weight * math.sqrt(moments[issues] * moments[code])
+                continue
+            stratum_means = [total / n for total in stratum.sums]
+            for i in range(size):
+                totals[i] += count * stratum_means[i]
+                terms[i].append((weight * (stratum.squares[i] - n * stratum_means[i] ** 2) / (n - 1), n - 1))
+            covariance += weight * (stratum.cross - n * stratum_means[issues] * stratum_means[code]) / (n - 1)
+
+        p = 0.5 + self.confidence / 2
+
+        def quantile(parts):
+            # Welch-Satterthwaite 有效自由度
+            variance = sum(v for v, _ in parts)
+            spread = sum(v * v / df for v, df in parts)
+            return _t_quantile(p, variance * variance / spread if spread > 0 else math.inf)
+
+        result = {}
+        for i, name in enumerate(METRICS):
+            variance = max(sum(v for v, _ in terms[i]), 0.0)
+            stderr = math.sqrt(variance)
+            half = quantile(terms[i]) * stderr
+            result[name] = {
+                'estimate': round(totals[i]),
+                'low': round(max(totals[i] - half, 0)),
+                'high': round(totals[i] + half),
+                'stderr': round(stderr, 2),
+            }
+
+        # 问题密度 = 问题总数 / 代码行总数（比率估计，方差用 delta 方法）
+        density = {'estimate': 0.0, 'low': 0.0, 'high': 0.0}
+        if totals[code] > 0:
+            ratio = totals[issues] / totals[code]
+            var_issues = sum(v for v, _ in terms[issues])
+            var_code = sum(v for v, _ in terms[code])
+            var = (var_issues + ratio * ratio * var_code - 2 * ratio * covariance) / totals[code] ** 2
+            half = quantile(terms[issues] + terms[code]) * math.sqrt(max(var, 0.0))
+            density = {
+                'estimate': round(ratio * 1000, 3),
+                'low': round(max(ratio - half, 0) * 1000, 3),
+                'high': round((ratio + half) * 1000, 3),
+            }
+
+        population = sum(self.population.values())
+        return {
+            'sampled': self.sampled,
+            'population': population,
+            'exact': self.sampled >= population,
+            'confidence': self.confidence,
+            'totals': result,
+            'issue_density': density,
+        }
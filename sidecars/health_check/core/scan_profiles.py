@@ -0,0 +1,25 @@
+# ============================================================================
+# sidecars/health_check/core/scan_profiles.py
+# ============================================================================
+from ..config import SCAN_PROFILES
+
+
+def resolve_scan_options(options):
+    """
+    展开扫描档位
+
+    options['scan_profile'] 指定的档位（quick / standard / deep）只填充
+    未显式给出的选项，调用方传入的 max_cost、time_budget 等始终优先。
+    未指定档位时保持原有行为（不限制）。重复调用结果不变。
+    """
+    options = dict(options or {})
+    name = options.get('scan_profile')
+    if not name:
+        return options
+
+    if name not in SCAN_PROFILES:
+        raise ValueError(f"Unknown scan profile: {name}")
+
+    for key, value in SCAN_PROFILES[name].items():
+        options.setdefault(key, value)
+    return options
@@ -2,39 +2,373 @@
 # sidecars/health_check/core/scanner.py
 # ============================================================================
 import os
-from ..config import IGNORE_DIRS, IGNORE_FILES, IGNORE_EXTS, THRESHOLDS
-from ..utils.file_utils import should_ignore, get_file_hash, format_size
-from ..analyzers.metrics import MetricsAnalyzer
-from ..analyzers.quality import QualityAnalyzer
-from ..analyzers.security import SecurityAnalyzer
-from ..analyzers.dependencies import DependencyAnalyzer
+import time
+import hashlib
+import sqlite3
+import importlib
+import subprocess
+from collections import deque, OrderedDict
+from ..config import IGNORE_DIRS, IGNORE_FILES, IGNORE_EXTS, THRESHOLDS, LANG_MAP, MANIFEST_FILES, SCAN_POOL, \
+    RESULT_STORE, SAMPLING, CHECKPOINT
+from ..utils.file_utils import should_ignore, format_size, git_blob_id, decode_lines
+from ..analyzers.registry import get_analyzer_classes, register_analyzer, AnalyzerDispatcher
+from .profiler import create_profiler
+from .scan_profiles import resolve_scan_options
+from .scheduler import ScanScheduler
+from .import_graph import ImportGraph
+from .analysis_cache import AnalysisCache
+from .watchdog import FileTimeout
+from .result_store import ResultStore, default_store_path
+from .checkpoint import ScanCheckpoint, default_checkpoint_path
+from .sampling import StratifiedSampler, StratifiedEstimator
+from ..integrations.git_analyzer import GitAnalyzer
+from ..analyzers.import_extractor import top_level_package
+from ..analyzers.keyword_scanner import FileLines
+from ..integrations.manifests import build_inventory
 import sys
 
+# 结果由 _aggregate_results 专门处理的内置分析器
+BUILTIN_ANALYZERS = ('metrics', 'quality', 'security', 'dependencies')
+
 
 class ProjectScanner:
     """项目扫描器 - 协调所有分析器"""
 
-    def __init__(self, root_path, config=None):
+    def __init__(self, root_path, config=None, executor=None):
         self.root_path = root_path
-        self.config = config or {}
-
-        # 初始化分析器
-        self.analyzers = {
-            'metrics': MetricsAnalyzer(config),
-            'quality': QualityAnalyzer(config),
-            'security': SecurityAnalyzer(config),
-            'dependencies': DependencyAnalyzer(config),
-        }
+        self.config = resolve_scan_options(config)
+        # 共享的进程池（concurrent.futures.Executor）：指定时未命中缓存的文件交给工作进程分析
+        self.executor = executor
+
+        # 初始化分析器（config['analyzers'] 可指定只运行部分分析器，
+        # config['max_cost'] 可跳过开销更高的分析器）
+        classes = get_analyzer_classes(self.config.get('analyzers'), self.config.get('max_cost'))
+        if not self.config.get('enable_dependencies', True):
+            classes.pop('dependencies', None)
+        self.analyzers = {name: cls(self.config) for name, cls in classes.items()}
+
+        # 工作进程中的分析器规格；有分析器无法在工作进程中导入时本次扫描不使用进程池
+        self._worker_spec, local_only = worker_spec(classes, self.config)
+        self._pool_fallback = None
+        if local_only and executor is not None:
+            self.executor = None
+            self._pool_fallback = f"analyzers not importable in worker processes: {', '.join(local_only)}"
+
+        # 按扩展名分发：每种扩展名只运行声明适用的分析器
+        self.dispatcher = AnalyzerDispatcher(self.analyzers)
+        self.dispatcher.build(LANG_MAP.keys())
+
+        # 性能剖析（profiling=True 时启用，否则为空操作）
+        self.profiler = create_profiler(self.config)
+
+        # 遍历时发现的依赖清单/锁文件（相对路径）
+        self._manifests = []
+        # 扩展名 -> 分析器签名（缓存键）
+        self._signatures = {}
+        # 相对路径 -> Git 索引中的 blob id
+        self._index_ids = {}
+        # config['result_store'] 启用时逐文件写入的结果库（scan 结束后仍保持打开，供调用方查询，
+        # 由调用方 close）
+        self.result_store = None
+
+    def scan(self, deadline=None, on_file=None, churn_map=None, paths=None, on_estimate=None):
+        """
+        执行完整扫描
+
+        Args:
+            deadline: time.monotonic() 截止时间；未指定时由 config['time_budget'] 计算。
+                到期后停止处理新文件，对已完成部分照常后处理并标记 truncated
+            on_file: 每完成一个文件即回调 on_file(record)，用于流式输出
+            churn_map: 文件修改次数，优先扫描时作为排序依据之一
+            paths: 只扫描这些相对路径（不遍历目录），用于增量/差异扫描（不使用检查点）
+            on_estimate: 抽样模式（config['sample']）下样本完成时及之后每 SAMPLING['refine_every']
+                个文件回调 on_estimate(估计)
+        """
+        if deadline is None and self.config.get('time_budget'):
+            deadline = time.monotonic() + self.config['time_budget']
+        max_file_size = self.config.get('max_file_size')
+
+        stats = self._new_stats()
+        hash_map = {}
+        import_map = {}
+        self._manifests = []
+        store = self._open_result_store()
+        # checkpoint='auto'：遍历到 CHECKPOINT['auto_files'] 个文件后才打开检查点，小项目不读写检查点
+        auto_checkpoint = paths is None and self.config.get('checkpoint') == 'auto' and not self.config.get('resume')
+        checkpoint = self._open_checkpoint() if paths is None and not auto_checkpoint else None
+        profiler = self.profiler
+        timing = profiler.enabled
+        cache = self._open_cache()
+
+        # 抽样：按分层随机顺序扫描；优先扫描：打开的文件 > 最近修改 > 高频修改；否则按遍历顺序
+        sampler = None
+        if paths is not None:
+            files = self._iter_paths(paths)
+        elif self.config.get('sample'):
+            sampler = StratifiedSampler(self.config['sample'], self.config.get('sample_seed'))
+            files = self._iter_sampled(sampler)
+        elif self.config.get('prioritize') or self.config.get('priority_hints'):
+            files = self._iter_prioritized(churn_map)
+        else:
+            files = self._enumerate()
+
+        # 相对路径 -> 索引中的 blob id（git_index 模式下由 _iter_index 填充）
+        index_ids = self._index_ids = {}
+
+        estimator = None
+
+        def finish(rel_path, file, results, fsize):
+            nonlocal estimator
+            # 聚合结果
+            with profiler.phase('aggregate'):
+                record = self._aggregate_results(stats, rel_path, file, results)
+            # 结果库模式下导入写入结果库，构建依赖图时再逐行读取
+            if record['imports'] and store is None:
+                import_map[rel_path] = record['imports']
+            if on_file:
+                on_file(record)
+            if sampler is not None:
+                # 遍历在产出第一个抽样文件前已完成，各层文件数此时已知
+                if estimator is None:
+                    estimator = StratifiedEstimator(sampler.sizes, key_of=sampler.stratum)
+                estimator.add(record, rel_path, fsize)
+                done = estimator.sampled
+                if on_estimate and (done == sampler.sampled or
+                                    (done > sampler.sampled and (done - sampler.sampled) % SAMPLING['refine_every'] == 0)):
+                    on_estimate(estimator.estimate())
+
+        # 并行模式：在途文件按提交顺序收集结果，保证输出顺序与串行扫描一致
+        executor = self.executor
+        if self._pool_fallback:
+            stats['pool_fallback'] = self._pool_fallback
+        pending = deque()
+        window = SCAN_POOL['window']
+        # 单文件分析时限（由 WatchdogExecutor 终止超时的工作进程）
+        submit_options = {'timeout': self.config['file_timeout']} if self.config.get('file_timeout') else {}
+        spec = self._worker_spec
+
+        def collect():
+            nonlocal executor
+            future, results, full_path, rel_path, file, ext, cache_key, saving, fsize, elapsed = pending.popleft()
+            failed = False
+            if future is not None:
+                try:
+                    results, failed, profile = future.result()
+                except FileTimeout:
+                    # 超过单文件时限（如正则灾难性回溯）：不阻塞扫描，记录后跳过
+                    stats['timed_out'].append(rel_path)
+                    stats['summary']['timed_out'] += 1
+                    return
+                except Exception as e:
+                    # 工作进程无法构建分析器（如只在本进程中注册的第三方分析器）：本次扫描的
+                    # 其余文件不再提交给进程池，并在结果中说明原因
+                    if _is_setup_error(e) and 'pool_fallback' not in stats:
+                        executor = None
+                        stats['pool_fallback'] = str(e)
+                    # 进程池不可用（如工作进程崩溃）时退回本进程分析
+                    start = time.perf_counter()
+                    data = self._read_bytes(full_path)
+                    if data is not None:
+                        profiler.add_read(len(data))
+                        results, failed = self._run_analyzers(full_path, rel_path, ext, decode_lines(data))
+                    profile = {'seconds': time.perf_counter() - start, 'analyzers': {}, 'bytes_read': 0} if timing else None
+                if results is None:
+                    return
+                if profile:
+                    # 工作进程中的分析器耗时汇入本进程的剖析结果
+                    for name, seconds in profile['analyzers'].items():
+                        profiler.add_analyzer(name, seconds)
+                    profiler.add_read(profile['bytes_read'])
+                    elapsed += profile['seconds']
+                if cache_key and not failed:
+                    with profiler.phase('cache'):
+                        cache.put(cache_key, self._compact_results(results))
+            if saving and not failed:
+                checkpoint.add(rel_path, *saving, results)
+            finish(rel_path, file, results, fsize)
+            if timing:
+                # 文件耗时 = 本进程中的准备（stat、读取、哈希、查缓存）+ 工作进程中的分析（及索引模式下的读取）
+                profiler.add_file(rel_path, elapsed, fsize)
+
+        for full_path, rel_path, file, st in files:
+            # 时间预算用尽：放弃剩余文件，保证已有结果完整
+            if deadline is not None and time.monotonic() >= deadline:
+                stats['summary']['truncated'] = True
+                break
+
+            if auto_checkpoint and stats['summary']['files'] >= CHECKPOINT['auto_files']:
+                auto_checkpoint = False
+                checkpoint = self._open_checkpoint()
+
+            if timing:
+                file_start = time.perf_counter()
+
+            # 基础信息（目录遍历时已取得 stat 的直接复用）
+            try:
+                if st is None and checkpoint is not None:
+                    st = os.stat(full_path)
+                fsize = st.st_size if st is not None else os.path.getsize(full_path)
+                stats['summary']['size'] += fsize
+                stats['summary']['files'] += 1
+            except:
+                continue
+
+            # 超大文件只计数不分析
+            if max_file_size is not None and fsize > max_file_size:
+                stats['summary']['skipped_files'] += 1
+                continue
+
+            ext = os.path.splitext(file)[1].lower()
+            cache_key = None
+            results = None
+            data = None
+            # 需要写入检查点时为 (stat, 内容哈希)
+            saving = None
+
+            # 检查点中修改时间与大小未变的文件直接使用保存的结果，不读取也不分析；
+            # 索引模式下未修改的已跟踪文件直接使用索引中的 blob id，无需读取；
+            # 否则一次读取全部字节，查重、缓存键与分析都使用这一份内容
+            fhash = index_ids.get(rel_path)
+            saved = None
+            if checkpoint is not None:
+                checkpoint.tick()
+                with profiler.phase('checkpoint'):
+                    saved = checkpoint.get(rel_path, st)
+            if saved is not None:
+                fhash, results = saved
+            elif fhash is None:
+                with profiler.phase('read'):
+                    data = self._read_bytes(full_path)
+                if data is None:
+                    continue
+                profiler.add_read(len(data))
+                with profiler.phase('hash'):
+                    fhash = git_blob_id(data)
+
+            if checkpoint is not None and saved is None:
+                saving = (st, fhash)
+
+            if cache is not None and fhash and results is None:
+                cache_key = cache.make_key(fhash, ext, self._signature(ext))
+                with profiler.phase('cache'):
+                    results = cache.get(cache_key)
+
+            if fhash and store is not None:
+                store.add_hash(fhash, rel_path)
+            elif fhash:
+                if fhash in hash_map:
+                    hash_map[fhash].append(rel_path)
+                else:
+                    hash_map[fhash] = [rel_path]
+
+            if executor is not None:
+                # 本进程已读取的文件（为计算缓存键与查重）把内容随任务传给工作进程，保证分析的正是
+                # 哈希对应的内容，工作进程不再打开文件；只有索引模式下未读取的文件由工作进程读取。
+                # 已命中缓存的文件同样排队，保持顺序
+                future = None
+                if results is None:
+                    future = executor.submit(analyze_file_task, (
+                        full_path, rel_path, ext, spec, timing, data), **submit_options)
+                elapsed = time.perf_counter() - file_start if timing else 0
+                pending.append((future, results, full_path, rel_path, file, ext, cache_key, saving, fsize, elapsed))
+                while len(pending) > window:
+                    collect()
+                continue
+
+            if results is None:
+                # 读取文件内容（只有索引命中但缓存未命中的文件需要在此读取）
+                if data is None:
+                    with profiler.phase('read'):
+                        data = self._read_bytes(full_path)
+                    if data is None:
+                        continue
+                    profiler.add_read(len(data))
+                with profiler.phase('decode'):
+                    lines = decode_lines(data)
+
+                # 执行适用于该扩展名的分析器（有分析器出错时不缓存，避免固化错误结果）
+                results, failed = self._run_analyzers(full_path, rel_path, ext, lines)
+                if failed:
+                    saving = None
+                elif cache_key or saving:
+                    compact = self._compact_results(results)
+                    if cache_key:
+                        with profiler.phase('cache'):
+                            cache.put(cache_key, compact)
+                    if saving:
+                        checkpoint.add(rel_path, *saving, compact)
+                        saving = None
+
+            if saving:
+                # 缓存命中的文件同样记入检查点，恢复时无需再读取与哈希
+                checkpoint.add(rel_path, *saving, results)
+
+            finish(rel_path, file, results, fsize)
+
+            if timing:
+                profiler.add_file(rel_path, time.perf_counter() - file_start, fsize)
+
+        # 时间预算用尽后仍收集已提交的文件（它们已在工作进程中分析）
+        while pending:
+            collect()
+
+        if cache is not None:
+            with profiler.phase('cache'):
+                cache.close()
+            stats['summary']['cache'] = cache.stats()
+
+        if estimator is not None:
+            # 完整结束时估计值即精确值；被时间预算截断时为基于已完成文件的估计
+            if not stats['summary']['truncated']:
+                estimator.complete()
+            stats['estimates'] = estimator.estimate()
+
+        if checkpoint is not None:
+            # 完整结束时清空检查点；被时间预算截断时保留，下次 resume 从中继续
+            with profiler.phase('checkpoint'):
+                stats['checkpoint'] = checkpoint.stats()
+                if stats['summary']['truncated']:
+                    checkpoint.flush()
+                else:
+                    checkpoint.clear()
+                checkpoint.close()
+
+        # 后处理
+        with profiler.phase('post_process'):
+            if store is not None:
+                self._post_process_store(stats, store)
+            else:
+                self._post_process(stats, hash_map)
+
+        # 模块依赖图与依赖清点（依赖分析器启用时）
+        if 'dependencies' in self.analyzers:
+            with profiler.phase('import_graph'):
+                all_files = store.iter_paths() if store is not None else [f['path'] for f in stats['files_data']]
+                imports = store.iter_imports if store is not None else import_map.items
+                stats['import_graph'], local_packages = self._build_import_graph(all_files, imports())
+
+            if self._manifests and self.config.get('enable_inventory', True):
+                with profiler.phase('inventory'):
+                    stats['dependency_inventory'] = self._build_inventory(imports(), local_packages)
+
+        if timing:
+            stats['profile'] = profiler.to_dict()
+
+        return stats
 
-    def scan(self):
-        """执行完整扫描"""
-        stats = {
+    def _new_stats(self):
+        """空的统计结构"""
+        return {
             'summary': {
                 'files': 0,
                 'lines': 0,
                 'code_lines': 0,
                 'size': 0,
-                'issues': 0
+                'issues': 0,
+                'skipped_files': 0,
+                'timed_out': 0,
+                'truncated': False,
+                'scan_profile': self.config.get('scan_profile'),
             },
             'languages': {},
             'hotspots': [],
@@ -43,108 +377,336 @@ class ProjectScanner:
             'risks': [],
             'todos': [],
             'duplicates': [],
+            'timed_out': [],
             'dependencies': {
                 'external': set(),
                 'internal': set()
             },
-            'files_data': []
+            'files_data': [],
+            'custom': {},
+            'import_graph': None,
+            'dependency_inventory': None
         }
 
+    def scan_snapshot(self, entries, reader, deadline=None):
+        """
+        分析 Git 中某个版本的文件（通过 cat-file 读取，不检出工作区）
+
+        Args:
+            entries: [(相对路径, blob id, 大小), ...]，即 GitAnalyzer.list_tree 的结果
+            reader: BlobReader
+        Returns:
+            dict: 与 scan() 结构相同的统计（不含依赖图与依赖清点）
+        """
+        stats = self._new_stats()
+        max_file_size = self.config.get('max_file_size')
+
+        # blob id 相同即内容相同，直接用作查重的哈希
         hash_map = {}
+        selected = []
+        for rel_path, blob_id, size in entries:
+            if should_ignore(rel_path, IGNORE_DIRS, IGNORE_FILES, IGNORE_EXTS):
+                continue
+            stats['summary']['files'] += 1
+            stats['summary']['size'] += size
+            if max_file_size is not None and size > max_file_size:
+                stats['summary']['skipped_files'] += 1
+                continue
+            hash_map.setdefault(blob_id, []).append(rel_path)
+            selected.append((rel_path, blob_id))
+
+        blobs = reader.read_many(blob_id for _, blob_id in selected)
+        for (rel_path, _), (_, data) in zip(selected, blobs):
+            if deadline is not None and time.monotonic() >= deadline:
+                stats['summary']['truncated'] = True
+                break
+            if data is None:
+                continue
+            record = self.analyze_content(rel_path, data.decode('utf-8', errors='ignore').splitlines(keepends=True))
+            if record:
+                self._merge_record(stats, record)
 
-        for root, dirs, files in os.walk(self.root_path):
-            # 过滤目录
-            dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
+        self._post_process(stats, hash_map)
+        return stats
 
-            for file in files:
-                full_path = os.path.join(root, file)
+    def _iter_files(self):
+        """
+        遍历项目文件，产出 (绝对路径, 相对路径, 文件名, stat 结果)
+
+        基于 os.scandir，顺序与 os.walk 相同（先当前目录的文件，再依次进入子目录，
+        不进入指向目录的符号链接）；stat 结果供扫描时直接取大小与修改时间
+        """
+        profiler = self.profiler
+        timing = profiler.enabled
+        start = time.perf_counter() if timing else 0
+
+        stack = [self.root_path]
+        while stack:
+            root = stack.pop()
+            files = []
+            dirs = []
+            try:
+                with os.scandir(root) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if not is_dir:
+                            files.append(entry)
+                        elif entry.name not in IGNORE_DIRS and not entry.is_symlink():
+                            # 过滤目录
+                            dirs.append(entry.path)
+            except OSError:
+                continue
+            stack.extend(reversed(dirs))
+
+            for entry in files:
+                file = entry.name
+                full_path = entry.path
                 rel_path = os.path.relpath(full_path, self.root_path)
 
+                # 依赖清单/锁文件单独记录（锁文件本身通常被忽略，不参与代码分析）
+                if file in MANIFEST_FILES:
+                    self._manifests.append(rel_path)
+
                 # 检查是否忽略
                 if should_ignore(rel_path, IGNORE_DIRS, IGNORE_FILES, IGNORE_EXTS):
                     continue
 
-                # 基础信息
                 try:
-                    fsize = os.path.getsize(full_path)
-                    stats['summary']['size'] += fsize
-                    stats['summary']['files'] += 1
-                except:
-                    continue
-
-                # 查重
-                fhash = get_file_hash(full_path)
-                if fhash:
-                    if fhash in hash_map:
-                        hash_map[fhash].append(rel_path)
-                    else:
-                        hash_map[fhash] = [rel_path]
-
-                # 读取文件内容
+                    st = entry.stat()
+                except OSError:
+                    st = None
+
+                if timing:
+                    profiler.add_phase('walk', time.perf_counter() - start)
+                yield full_path, rel_path, file, st
+                if timing:
+                    start = time.perf_counter()
+
+        if timing:
+            profiler.add_phase('walk', time.perf_counter() - start)
+
+    def _open_result_store(self):
+        """config['result_store'] 为 True（默认位置）或结果库路径时打开并清空结果库"""
+        option = self.config.get('result_store')
+        if not option:
+            return None
+        if self.result_store is not None:
+            self.result_store.close()
+        path = option if isinstance(option, str) else default_store_path(self.root_path)
+        self.result_store = ResultStore(path)
+        return self.result_store
+
+    def _open_checkpoint(self):
+        """
+        config['checkpoint'] 或 config['resume'] 时打开检查点，不可用时返回 None
+
+        只有 resume 时使用上次保存的结果，否则清空后重新记录
+        """
+        if not (self.config.get('checkpoint') or self.config.get('resume')):
+            return None
+        # 与分析缓存相同：分析器版本或其读取的配置变化后，旧结果不能与新结果混用
+        analyzers = ','.join(self._analyzer_key(name, analyzer) for name, analyzer in sorted(self.analyzers.items()))
+        signature = f"{analyzers}|{self.config.get('max_file_size')}"
+        try:
+            checkpoint = ScanCheckpoint(self.config.get('checkpoint_db') or default_checkpoint_path(self.root_path),
+                                        hashlib.sha1(signature.encode('utf-8')).hexdigest())
+            if not self.config.get('resume'):
+                checkpoint.clear()
+        except (sqlite3.Error, OSError):
+            return None
+        return checkpoint
+
+    def _open_cache(self):
+        """打开按内容寻址的分析缓存（config['analysis_cache']），不可用时返回 None"""
+        if not self.config.get('analysis_cache'):
+            return None
+        try:
+            return AnalysisCache(self.config.get('analysis_cache_db'),
+                                 self.config.get('analysis_cache_max_bytes'))
+        except (sqlite3.Error, OSError):
+            return None
+
+    def _analyzer_key(self, name, analyzer):
+        """分析器的名称、版本与其声明读取的配置项（config_keys）取值，配置不同的结果不能互用"""
+        key = f"{name}@{analyzer.version}"
+        items = sorted((k, self.config.get(k)) for k in analyzer.config_keys)
+        return f"{key}{items!r}" if items else key
+
+    def _signature(self, ext):
+        """该扩展名所用分析器、版本及相关配置的摘要，作为缓存键的一部分"""
+        signature = self._signatures.get(ext)
+        if signature is None:
+            names = ','.join(self._analyzer_key(name, analyzer) for name, analyzer in self.dispatcher.for_extension(ext))
+            signature = self._signatures[ext] = hashlib.sha1(names.encode('utf-8')).hexdigest()[:12]
+        return signature
+
+    @staticmethod
+    def _read_bytes(full_path):
+        try:
+            with open(full_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+    def _iter_paths(self, paths):
+        """只产出指定的文件（已删除或被忽略的跳过）"""
+        for rel_path in paths:
+            file = os.path.basename(rel_path)
+            full_path = os.path.join(self.root_path, rel_path)
+            if file in MANIFEST_FILES:
+                self._manifests.append(rel_path)
+            if should_ignore(rel_path, IGNORE_DIRS, IGNORE_FILES, IGNORE_EXTS) or not os.path.isfile(full_path):
+                continue
+            yield full_path, rel_path, file, None
+
+    def _enumerate(self):
+        """按配置选择文件来源：Git 索引（config['git_index']）或目录遍历"""
+        if self.config.get('git_index'):
+            files = self._iter_index()
+            if files is not None:
+                return files
+        return self._iter_files()
+
+    def _iter_index(self):
+        """
+        从 Git 索引列出文件（git ls-files），不遍历目录；不是 Git 仓库时返回 None
+
+        已跟踪且未修改的文件记录其 blob id，供查重和缓存直接使用
+        """
+        try:
+            entries = GitAnalyzer(self.root_path).list_index()
+        except (ValueError, OSError, subprocess.SubprocessError):
+            return None
+
+        def generate():
+            profiler = self.profiler
+            with profiler.phase('walk'):
+                selected = []
+                for rel_path, blob_id in entries:
+                    file = os.path.basename(rel_path)
+                    if file in MANIFEST_FILES:
+                        self._manifests.append(rel_path)
+                    if should_ignore(rel_path, IGNORE_DIRS, IGNORE_FILES, IGNORE_EXTS):
+                        continue
+                    if blob_id:
+                        self._index_ids[rel_path] = blob_id
+                    selected.append((os.path.join(self.root_path, rel_path), rel_path, file, None))
+            yield from selected
+
+        return generate()
+
+    def _iter_prioritized(self, churn_map=None):
+        """先完整遍历，再按优先级产出文件"""
+        scheduler = ScanScheduler(self.root_path, self.config.get('priority_hints'), churn_map)
+
+        for item in self._enumerate():
+            st = item[3]
+            try:
+                mtime = (st or os.stat(item[0])).st_mtime
+            except OSError:
+                mtime = 0
+            scheduler.push(item, item[1], mtime)
+
+        yield from scheduler
+
+    def _iter_sampled(self, sampler):
+        """先完整遍历并按层归档（超过大小上限的文件不参与分析，也不计入总体），再按抽样顺序产出"""
+        max_file_size = self.config.get('max_file_size')
+        for item in self._enumerate():
+            try:
+                size = (item[3] or os.stat(item[0])).st_size
+            except OSError:
+                continue
+            if max_file_size is not None and size > max_file_size:
+                yield item
+                continue
+            sampler.push(item, item[1], size)
+        yield from sampler
+
+    def analyze_content(self, rel_path, lines):
+        """
+        分析不在工作区中的文件内容（如历史版本），返回结果记录，不计入全局统计
+        """
+        if should_ignore(rel_path, IGNORE_DIRS, IGNORE_FILES, IGNORE_EXTS):
+            return None
+        file = os.path.basename(rel_path)
+        ext = os.path.splitext(file)[1].lower()
+        results, _ = self._run_analyzers(os.path.join(self.root_path, rel_path), rel_path, ext, lines)
+        return self._build_file_record(rel_path, file, results)
+
+    def _run_analyzers(self, full_path, rel_path, ext, lines):
+        """
+        对单个文件执行适用的分析器，单个分析器出错不影响其他分析器
+
+        Returns:
+            (结果 dict, 是否有分析器出错)
+        """
+        results = {}
+        failed = False
+        profiler = self.profiler
+        analyzers = self.dispatcher.for_extension(ext)
+        # 同一文件的各分析器共用一次关键词扫描
+        lines = FileLines(lines)
+
+        if not profiler.enabled:
+            for name, analyzer in analyzers:
                 try:
-                    with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = f.readlines()
-                except:
-                    continue
-
-                # 执行所有分析器
-                results = {}
-                for name, analyzer in self.analyzers.items():
-                    try:
-                        results[name] = analyzer.analyze(full_path, rel_path, lines)
-                    except Exception as e:
-                        results[name] = {}
-
-                # 聚合结果
-                self._aggregate_results(stats, rel_path, file, results)
-
-        # 后处理
-        self._post_process(stats, hash_map)
-
-        return stats
+                    results[name] = analyzer.analyze(full_path, rel_path, lines)
+                except Exception as e:
+                    results[name] = {}
+                    failed = True
+            return results, failed
+
+        for name, analyzer in analyzers:
+            start = time.perf_counter()
+            try:
+                results[name] = analyzer.analyze(full_path, rel_path, lines)
+            except Exception as e:
+                results[name] = {}
+                failed = True
+            profiler.add_analyzer(name, time.perf_counter() - start)
+
+        return results, failed
+
+    @staticmethod
+    def _compact_results(results):
+        """缓存前只保留 _build_file_record 用到的字段（函数只留行数，魔法数字等不保留）"""
+        compact = dict(results)
+        metrics = results.get('metrics')
+        if metrics:
+            compact['metrics'] = {key: metrics[key] for key in
+                                  ('lines', 'code_lines', 'complexity', 'max_indent', 'comment_ratio')
+                                  if key in metrics}
+            compact['metrics']['functions'] = [{'lines': f.get('lines', 0)} for f in metrics.get('functions', [])]
+        if 'quality' in results:
+            compact['quality'] = {'todos': results['quality'].get('todos', [])}
+        deps = results.get('dependencies')
+        if deps:
+            compact['dependencies'] = {
+                'imports': [{'module': item['module'], 'kind': item['kind']} for item in deps.get('imports', [])],
+                'external_deps': deps.get('external_deps', []),
+                'internal_deps': deps.get('internal_deps', []),
+            }
+        return compact
 
     def _aggregate_results(self, stats, rel_path, filename, results):
-        """聚合分析结果"""
+        """聚合分析结果，返回该文件的结果记录（供流式输出）"""
+        record = self._build_file_record(rel_path, filename, results)
+        self._merge_record(stats, record, self.result_store)
+        return record
+
+    def _build_file_record(self, rel_path, filename, results):
+        """把各分析器的原始结果整理为单个文件的结果记录"""
         metrics = results.get('metrics', {})
         quality = results.get('quality', {})
         security = results.get('security', {})
         deps = results.get('dependencies', {})
 
-        # 语言统计
-        from ..config import LANG_MAP
         ext = os.path.splitext(filename)[1].lower()
-        lang = LANG_MAP.get(ext, 'Other')
-
-        if lang not in stats['languages']:
-            stats['languages'][lang] = {
-                'files': 0,
-                'lines': 0,
-                'code': 0,
-                'functions': 0
-            }
-
-        stats['languages'][lang]['files'] += 1
-        stats['languages'][lang]['lines'] += metrics.get('lines', 0)
-        stats['languages'][lang]['code'] += metrics.get('code_lines', 0)
-        stats['languages'][lang]['functions'] += len(metrics.get('functions', []))
-
-        stats['summary']['lines'] += metrics.get('lines', 0)
-        stats['summary']['code_lines'] += metrics.get('code_lines', 0)
-
-        # TODO 列表
-        for todo in quality.get('todos', []):
-            stats['todos'].append({**todo, 'file': rel_path})
-
-        # 安全问题
-        for secret in security.get('secrets', []):
-            stats['secrets'].append({**secret, 'file': rel_path})
-
-        for risk in security.get('risks', []):
-            stats['risks'].append({**risk, 'file': rel_path})
-
-        # 依赖
-        stats['dependencies']['external'].update(deps.get('external_deps', []))
-        stats['dependencies']['internal'].update(deps.get('internal_deps', []))
 
         # 坏味道检测
         issues = []
@@ -169,24 +731,103 @@ class ProjectScanner:
         if metrics.get('comment_ratio', 0) < THRESHOLDS['low_comment_ratio'] and metrics.get('code_lines', 0) > 50:
             issues.append(f"注释不足 ({metrics.get('comment_ratio', 0)*100:.1f}%)")
 
+        smell = None
         if issues:
-            stats['bad_smells'].append({
+            smell = {
                 'file': rel_path,
                 'issues': issues,
                 'score': complexity,
                 'lines': lines
-            })
-
-        # 元数据（供可视化）
-        stats['files_data'].append({
-            'name': filename,
-            'path': rel_path,
-            'lines': lines,
-            'code': metrics.get('code_lines', 0),
-            'complexity': complexity,
-            'functions': len(metrics.get('functions', [])),
-            'churn': 0  # 后续由 Git 填充
-        })
+            }
+
+        return {
+            'file': rel_path,
+            'language': LANG_MAP.get(ext, 'Other'),
+            # 元数据（供可视化）
+            'metrics': {
+                'name': filename,
+                'path': rel_path,
+                'lines': lines,
+                'code': metrics.get('code_lines', 0),
+                'complexity': complexity,
+                'functions': len(metrics.get('functions', [])),
+                'churn': 0  # 后续由 Git 填充
+            },
+            'todos': [{**todo, 'file': rel_path} for todo in quality.get('todos', [])],
+            'secrets': [{**secret, 'file': rel_path} for secret in security.get('secrets', [])],
+            'risks': [{**risk, 'file': rel_path} for risk in security.get('risks', [])],
+            'smell': smell,
+            'imports': [(item['module'], item['kind']) for item in deps.get('imports', [])],
+            'external_deps': deps.get('external_deps', []),
+            'internal_deps': deps.get('internal_deps', []),
+            # 第三方分析器的结果按注册名归档
+            'custom': {name: result for name, result in results.items()
+                       if name not in BUILTIN_ANALYZERS and result},
+        }
+
+    def _merge_record(self, stats, record, store=None):
+        """把单个文件的结果记录合并进全局统计（指定 store 时列表类结果写入结果库）"""
+        file_data = record['metrics']
+        lang = record['language']
+
+        # 语言统计
+        if lang not in stats['languages']:
+            stats['languages'][lang] = {
+                'files': 0,
+                'lines': 0,
+                'code': 0,
+                'functions': 0
+            }
+
+        stats['languages'][lang]['files'] += 1
+        stats['languages'][lang]['lines'] += file_data['lines']
+        stats['languages'][lang]['code'] += file_data['code']
+        stats['languages'][lang]['functions'] += file_data['functions']
+
+        stats['summary']['lines'] += file_data['lines']
+        stats['summary']['code_lines'] += file_data['code']
+
+        if store is not None:
+            store.add(record)
+            return
+
+        # TODO 列表与安全问题
+        stats['todos'].extend(record['todos'])
+        stats['secrets'].extend(record['secrets'])
+        stats['risks'].extend(record['risks'])
+
+        # 依赖
+        stats['dependencies']['external'].update(record['external_deps'])
+        stats['dependencies']['internal'].update(record['internal_deps'])
+
+        if record['smell']:
+            stats['bad_smells'].append(record['smell'])
+
+        for name, result in record['custom'].items():
+            stats['custom'].setdefault(name, []).append({**result, 'file': record['file']})
+
+        stats['files_data'].append(file_data)
+
+    def _build_import_graph(self, all_files, imports):
+        """解析各文件的导入（(相对路径, 导入列表) 的可迭代对象），生成依赖图摘要（循环依赖、扇入/扇出）"""
+        graph, unresolved = ImportGraph.build(self.root_path, imports, all_files)
+        summary = graph.summarize(top_n=self.config.get('graph_top_n', 10))
+        summary['unresolved'] = unresolved
+        return summary, graph.local_packages
+
+    def _build_inventory(self, imports, local_packages):
+        """解析清单与锁文件，与实际导入（(相对路径, 导入列表) 的可迭代对象）的第三方包交叉比对"""
+        imported = {}
+        for _, file_imports in imports:
+            for module, lang in file_imports:
+                if module.startswith('.'):
+                    continue
+                package = top_level_package(module, lang)
+                if (lang, package) not in local_packages:
+                    imported.setdefault(lang, set()).add(package)
+
+        return build_inventory(self.root_path, self._manifests, imported,
+                               use_cache=self.config.get('inventory_cache', True))
 
     def _post_process(self, stats, hash_map):
         """后处理：排序、格式化"""
@@ -212,3 +853,132 @@ class ProjectScanner:
         )
 
         stats['summary']['size_formatted'] = format_size(stats['summary']['size'])
+
+    def _post_process_store(self, stats, store):
+        """结果库模式的后处理：查重、排序与计数在 SQL 中完成，列表只取前 list_limit 项"""
+        limit = RESULT_STORE['list_limit']
+        counts = store.counts()
+
+        stats['files_data'] = store.files(limit)
+        for category in ('todos', 'secrets', 'risks', 'bad_smells'):
+            stats[category] = store.findings(category, limit)
+        stats['custom'] = store.custom(limit)
+        stats['duplicates'] = store.duplicates(limit)
+        stats['dependencies']['external'] = store.deps('external')
+        stats['dependencies']['internal'] = store.deps('internal')
+
+        stats['summary']['issues'] = counts['secrets'] + counts['risks'] + counts['bad_smells'] + len(stats['hotspots'])
+        stats['summary']['size_formatted'] = format_size(stats['summary']['size'])
+        stats['result_store'] = {'path': store.db_path, 'list_limit': limit, 'counts': counts}
+
+
+# ===== 工作进程 =====
+# 工作进程内按分析器规格缓存的分发器（最近使用的 SCAN_POOL['dispatchers'] 个）：多个项目、
+# 多次请求共用同一进程池时，分析器实例与分发表在每个进程中只构建一次，模块级预编译的正则也随进程复用
+_worker_dispatchers = OrderedDict()
+
+
+class WorkerSetupError(RuntimeError):
+    """工作进程中无法导入或构建分析器"""
+
+
+def _is_setup_error(error):
+    # WatchdogExecutor 以 "类型名: 信息" 的形式传回工作进程中的异常
+    return isinstance(error, WorkerSetupError) or str(error).startswith(WorkerSetupError.__name__)
+
+
+def worker_spec(classes, config):
+    """
+    工作进程中的分析器规格
+
+    内置分析器在工作进程中直接可用；其余分析器按模块路径在工作进程中导入并注册。
+    工作进程只收到各分析器声明读取的配置键（BaseAnalyzer.config_keys），与扫描请求中
+    其他逐次变化的选项（since、time_budget 等）无关，缓存的分发器数量因此有界。
+
+    Returns:
+        ((分析器名称元组, 配置项元组, 第三方分析器的 (名称, 模块, 限定名) 元组),
+         无法在工作进程中导入的分析器名称列表)
+    """
+    keys = sorted({key for cls in classes.values() for key in cls.config_keys})
+    items = tuple((key, config[key]) for key in keys if key in config)
+    sources = []
+    local_only = []
+    for name, cls in classes.items():
+        if cls.__module__.startswith(__package__.rsplit('.', 1)[0] + '.analyzers.'):
+            continue
+        if cls.__module__ == '__main__' or '<locals>' in cls.__qualname__:
+            local_only.append(name)
+        else:
+            sources.append((name, cls.__module__, cls.__qualname__))
+    return (tuple(classes), items, tuple(sources)), local_only
+
+
+def _worker_dispatcher(spec):
+    names, items, sources = spec
+    key = (names, repr(items), sources)
+    dispatcher = _worker_dispatchers.get(key)
+    if dispatcher is not None:
+        _worker_dispatchers.move_to_end(key)
+        return dispatcher
+    try:
+        for name, module, qualname in sources:
+            cls = importlib.import_module(module)
+            for part in qualname.split('.'):
+                cls = getattr(cls, part)
+            register_analyzer(cls)
+        classes = get_analyzer_classes(list(names))
+    except Exception as e:
+        raise WorkerSetupError(f"{type(e).__name__}: {e}")
+    config = dict(items)
+    dispatcher = _worker_dispatchers[key] = AnalyzerDispatcher(
+        {name: cls(config) for name, cls in classes.items()})
+    while len(_worker_dispatchers) > SCAN_POOL['dispatchers']:
+        _worker_dispatchers.popitem(last=False)
+    return dispatcher
+
+
+def warm_worker():
+    """预热工作进程：导入分析器模块（config.py 中的正则随之编译）并构建默认配置的分发器"""
+    config = resolve_scan_options(None)
+    spec, _ = worker_spec(get_analyzer_classes(config.get('analyzers'), config.get('max_cost')), config)
+    _worker_dispatcher(spec)
+
+
+def analyze_file_task(task):
+    """
+    在工作进程中分析单个文件（ProjectScanner 并行模式提交的任务；未随任务传入内容时先读取）
+
+    Args:
+        task: (完整路径, 相对路径, 扩展名, 分析器规格（worker_spec）, 是否计时, 已读取的字节或 None)
+    Returns:
+        (精简后的结果 dict，读取失败时为 None; 是否有分析器出错;
+         计时时为 {'seconds': 读取与分析耗时, 'analyzers': {名称: 耗时}, 'bytes_read': 读取字节数}，否则 None)
+    Raises:
+        WorkerSetupError: 无法在本进程中构建分析器
+    """
+    full_path, rel_path, ext, spec, timing, data = task
+    dispatcher = _worker_dispatcher(spec)
+    start = time.perf_counter()
+    # 本进程中读取的字节数（本进程已读取内容的文件为 0）
+    nread = 0
+    if data is None:
+        data = ProjectScanner._read_bytes(full_path)
+        if data is None:
+            return None, False, None
+        nread = len(data)
+
+    lines = FileLines(decode_lines(data))
+    results = {}
+    failed = False
+    timings = {}
+    for name, analyzer in dispatcher.for_extension(ext):
+        analyzer_start = time.perf_counter()
+        try:
+            results[name] = analyzer.analyze(full_path, rel_path, lines)
+        except Exception:
+            results[name] = {}
+            failed = True
+        if timing:
+            timings[name] = time.perf_counter() - analyzer_start
+    profile = {'seconds': time.perf_counter() - start, 'analyzers': timings, 'bytes_read': nread} if timing else None
+    return ProjectScanner._compact_results(results), failed, profile
@@ -0,0 +1,54 @@
+# ============================================================================
+# sidecars/health_check/core/scheduler.py
+# ============================================================================
+import os
+import heapq
+import time
+
+from ..config import PRIORITY_RECENT_WINDOW
+
+# 优先级分层（数值越小越先扫描）
+TIER_OPEN = 0       # 编辑器中打开的文件
+TIER_RECENT = 1     # 最近修改过的文件，按修改时间从新到旧
+TIER_OTHER = 2      # 其余文件，按修改次数从多到少
+
+
+class ScanScheduler:
+    """优先队列调度器：打开的文件 > 最近修改的文件 > 高频修改的文件"""
+
+    def __init__(self, root_path, hints=None, churn_map=None,
+                 recent_window=PRIORITY_RECENT_WINDOW, now=None):
+        self.churn_map = churn_map or {}
+        self.recent_after = (now or time.time()) - recent_window
+        self.hints = set()
+        for path in hints or []:
+            if os.path.isabs(path):
+                path = os.path.relpath(path, root_path)
+            self.hints.add(os.path.normpath(path))
+
+        self._heap = []
+        self._seq = 0  # 保证同优先级按加入顺序出队，且不比较 item 本身
+
+    def priority(self, rel_path, mtime):
+        """计算优先级元组（越小越优先）"""
+        if rel_path in self.hints:
+            return (TIER_OPEN, 0, 0)
+        churn = self.churn_map.get(rel_path, 0)
+        if mtime >= self.recent_after:
+            return (TIER_RECENT, -mtime, -churn)
+        return (TIER_OTHER, -churn, -mtime)
+
+    def push(self, item, rel_path, mtime):
+        heapq.heappush(self._heap, (self.priority(rel_path, mtime), self._seq, item))
+        self._seq += 1
+
+    def pop(self):
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __iter__(self):
+        """按优先级依次出队"""
+        while self._heap:
+            yield self.pop()
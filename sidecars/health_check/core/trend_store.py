@@ -0,0 +1,284 @@
+# ============================================================================
+# sidecars/health_check/core/trend_store.py
+# ============================================================================
+import os
+import time
+import sqlite3
+
+from ..config import CACHE_DIR
+
+# 每次扫描记录的汇总指标（scans 表的列）
+SCAN_METRICS = ('files', 'lines', 'code_lines', 'issues', 'secrets', 'risks',
+                'bad_smells', 'todos', 'hotspots', 'duplicates', 'complexity')
+
+# 每个文件记录的指标（file_metrics / file_state 表的列）
+FILE_METRICS = ('lines', 'code', 'complexity', 'functions', 'issues')
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    root TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    commit_id TEXT,
+    truncated INTEGER NOT NULL DEFAULT 0,
+    {', '.join(f'{m} INTEGER NOT NULL DEFAULT 0' for m in SCAN_METRICS)}
+);
+CREATE INDEX IF NOT EXISTS idx_scans_project ON scans (project_id, id);
+CREATE INDEX IF NOT EXISTS idx_scans_commit ON scans (project_id, commit_id);
+
+-- 只追加：每个文件仅在指标变化（或被删除）时写入一行
+CREATE TABLE IF NOT EXISTS file_metrics (
+    project_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    scan_id INTEGER NOT NULL,
+    removed INTEGER NOT NULL DEFAULT 0,
+    {', '.join(f'{m} INTEGER NOT NULL DEFAULT 0' for m in FILE_METRICS)},
+    PRIMARY KEY (project_id, path, scan_id)
+) WITHOUT ROWID;
+
+-- 每个文件的最新指标，用于快速计算增量
+CREATE TABLE IF NOT EXISTS file_state (
+    project_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    {', '.join(f'{m} INTEGER NOT NULL DEFAULT 0' for m in FILE_METRICS)},
+    PRIMARY KEY (project_id, path)
+) WITHOUT ROWID;
+"""
+
+
+def _file_issue_counts(stats):
+    """按文件统计问题数：密钥 + 风险 + 坏味道条目"""
+    counts = {}
+    for item in stats.get('secrets', []) + stats.get('risks', []):
+        counts[item['file']] = counts.get(item['file'], 0) + 1
+    for smell in stats.get('bad_smells', []):
+        counts[smell['file']] = counts.get(smell['file'], 0) + len(smell['issues'])
+    return counts
+
+
+class TrendStore:
+    """
+    扫描结果的历史趋势存储（SQLite）
+
+    scans 记录每次扫描的汇总指标；file_metrics 只追加各文件的指标变化，
+    某文件在第 N 次扫描时的指标 = scan_id <= N 的最后一行。
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(CACHE_DIR, 'trends.sqlite3')
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=5)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _project_id(self, root_path, create=False):
+        root = os.path.abspath(root_path)
+        row = self.conn.execute('SELECT id FROM projects WHERE root = ?', (root,)).fetchone()
+        if row:
+            return row[0]
+        if not create:
+            return None
+        return self.conn.execute('INSERT INTO projects (root) VALUES (?)', (root,)).lastrowid
+
+    # ===== 写入 =====
+    def record_scan(self, root_path, stats, commit_id=None, timestamp=None, files=None):
+        """
+        记录一次扫描
+
+        Args:
+            files: 逐文件的 file_data，各项带问题数 issues（结果库模式下为逐行读取的迭代器）；
+                默认为 stats['files_data']，问题数由 stats 中的列表统计
+        Returns:
+            int: 新扫描的 id
+        """
+        summary = stats['summary']
+        truncated = bool(summary.get('truncated'))
+        # 结果库模式下列表只保留前 N 项，完整数量见 result_store.counts
+        counts = stats.get('result_store', {}).get('counts', {})
+
+        def count(key):
+            return counts.get(key, len(stats.get(key, [])))
+
+        values = {
+            'files': summary.get('files', 0),
+            'lines': summary.get('lines', 0),
+            'code_lines': summary.get('code_lines', 0),
+            'issues': summary.get('issues', 0),
+            'secrets': count('secrets'),
+            'risks': count('risks'),
+            'bad_smells': count('bad_smells'),
+            'todos': count('todos'),
+            'hotspots': count('hotspots'),
+            'duplicates': count('duplicates'),
+            'complexity': 0,
+        }
+        if files is None:
+            issue_counts = _file_issue_counts(stats)
+            files = ({**file_data, 'issues': issue_counts.get(file_data['path'], 0)}
+                     for file_data in stats.get('files_data', []))
+
+        with self.conn:
+            project_id = self._project_id(root_path, create=True)
+            previous = {
+                row[0]: row[1:] for row in self.conn.execute(
+                    f"SELECT path, {', '.join(FILE_METRICS)} FROM file_state WHERE project_id = ?",
+                    (project_id,))
+            }
+
+            # 逐文件比对的同时累计总复杂度（files 可能是只能遍历一次的迭代器）
+            changed = []
+            seen = set()
+            for file_data in files:
+                path = file_data['path'].replace('\\', '/')
+                seen.add(path)
+                values['complexity'] += file_data['complexity']
+                row = (file_data['lines'], file_data['code'], file_data['complexity'],
+                       file_data['functions'], file_data['issues'])
+                if previous.get(path) != row:
+                    changed.append((path, *row))
+
+            scan_id = self.conn.execute(
+                f"INSERT INTO scans (project_id, timestamp, commit_id, truncated, {', '.join(SCAN_METRICS)}) "
+                f"VALUES (?, ?, ?, ?, {', '.join('?' * len(SCAN_METRICS))})",
+                (project_id, timestamp or time.time(), commit_id, int(truncated),
+                 *(values[m] for m in SCAN_METRICS))
+            ).lastrowid
+            changed = [(project_id, path, scan_id, 0, *row) for path, *row in changed]
+
+            # 部分扫描中没出现的文件不能视为已删除
+            removed = [] if truncated else [p for p in previous if p not in seen]
+
+            columns = ', '.join(FILE_METRICS)
+            marks = ', '.join('?' * len(FILE_METRICS))
+            self.conn.executemany(
+                f"INSERT INTO file_metrics (project_id, path, scan_id, removed, {columns}) "
+                f"VALUES (?, ?, ?, ?, {marks})", changed)
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO file_state (project_id, path, {columns}) VALUES (?, ?, {marks})",
+                [(c[0], c[1], *c[4:]) for c in changed])
+
+            if removed:
+                self.conn.executemany(
+                    "INSERT INTO file_metrics (project_id, path, scan_id, removed) VALUES (?, ?, ?, 1)",
+                    [(project_id, p, scan_id) for p in removed])
+                self.conn.executemany(
+                    "DELETE FROM file_state WHERE project_id = ? AND path = ?",
+                    [(project_id, p) for p in removed])
+
+        return scan_id
+
+    # ===== 查询 =====
+    def metric_history(self, root_path, metrics=('issues', 'complexity'), limit=50):
+        """
+        汇总指标随时间的变化（按时间升序）
+
+        Returns:
+            list: [{'scan_id', 'timestamp', 'commit', 'truncated', 指标...}, ...]
+        """
+        metrics = [m for m in metrics if m in SCAN_METRICS]
+        project_id = self._project_id(root_path)
+        if project_id is None:
+            return []
+
+        rows = self.conn.execute(
+            f"SELECT id, timestamp, commit_id, truncated{''.join(', ' + m for m in metrics)} FROM scans "
+            f"WHERE project_id = ? ORDER BY id DESC LIMIT ?", (project_id, limit)
+        ).fetchall()
+
+        history = []
+        for row in reversed(rows):
+            item = {'scan_id': row[0], 'timestamp': row[1], 'commit': row[2], 'truncated': bool(row[3])}
+            item.update(zip(metrics, row[4:]))
+            history.append(item)
+        return history
+
+    def file_history(self, root_path, path, limit=50):
+        """单个文件的指标变化记录（只含发生变化的扫描）"""
+        project_id = self._project_id(root_path)
+        if project_id is None:
+            return []
+
+        rows = self.conn.execute(
+            f"SELECT s.id, s.timestamp, s.commit_id, f.removed, {', '.join('f.' + m for m in FILE_METRICS)} "
+            f"FROM file_metrics f JOIN scans s ON s.id = f.scan_id "
+            f"WHERE f.project_id = ? AND f.path = ? ORDER BY f.scan_id DESC LIMIT ?",
+            (project_id, path.replace('\\', '/'), limit)
+        ).fetchall()
+
+        return [
+            {'scan_id': r[0], 'timestamp': r[1], 'commit': r[2], 'removed': bool(r[3]),
+             **dict(zip(FILE_METRICS, r[4:]))}
+            for r in reversed(rows)
+        ]
+
+    def find_scan(self, root_path, commit=None, before_scan=None):
+        """
+        定位基准扫描
+
+        Args:
+            commit: 提交哈希（可为前缀），取该提交上的最后一次扫描
+            before_scan: 取该扫描之前的最后一次扫描
+        """
+        project_id = self._project_id(root_path)
+        if project_id is None:
+            return None
+
+        if commit:
+            row = self.conn.execute(
+                "SELECT id FROM scans WHERE project_id = ? AND commit_id LIKE ? ORDER BY id DESC LIMIT 1",
+                (project_id, commit.replace('%', '') + '%')).fetchone()
+        elif before_scan is not None:
+            row = self.conn.execute(
+                "SELECT id FROM scans WHERE project_id = ? AND id < ? ORDER BY id DESC LIMIT 1",
+                (project_id, before_scan)).fetchone()
+        else:
+            row = None
+        return row[0] if row else None
+
+    def files_worse_since(self, root_path, commit=None, scan_id=None, metric='complexity', limit=20):
+        """
+        与基准扫描相比指标变差的文件（按增量降序）
+
+        Args:
+            commit: 基准提交；也可直接指定基准 scan_id
+            metric: FILE_METRICS 之一
+        """
+        if metric not in FILE_METRICS:
+            raise ValueError(f"Unknown file metric: {metric}")
+        project_id = self._project_id(root_path)
+        if scan_id is None:
+            scan_id = self.find_scan(root_path, commit=commit)
+        if project_id is None or scan_id is None:
+            return []
+
+        # 基准值：每个文件在基准扫描时的最后一行（依赖主键 (project_id, path, scan_id) 索引）
+        rows = self.conn.execute(
+            f"""
+            SELECT cur.path, base.{metric}, cur.{metric}
+            FROM file_state cur
+            JOIN (SELECT path, MAX(scan_id) AS sid FROM file_metrics
+                  WHERE project_id = ? AND scan_id <= ? GROUP BY path) b ON b.path = cur.path
+            JOIN file_metrics base
+                 ON base.project_id = ? AND base.path = b.path AND base.scan_id = b.sid
+            WHERE cur.project_id = ? AND base.removed = 0 AND cur.{metric} > base.{metric}
+            ORDER BY cur.{metric} - base.{metric} DESC
+            LIMIT ?
+            """,
+            (project_id, scan_id, project_id, project_id, limit)
+        ).fetchall()
+
+        return [{'file': r[0], 'metric': metric, 'before': r[1], 'after': r[2], 'delta': r[2] - r[1]}
+                for r in rows]
@@ -0,0 +1,271 @@
+# ============================================================================
+# sidecars/health_check/core/watchdog.py
+# ============================================================================
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import Future
+
+
+class FileTimeout(Exception):
+    """单个任务超过时限，执行它的工作进程已被终止"""
+
+
+class WorkerError(Exception):
+    """工作进程中的任务抛出异常，或工作进程意外退出"""
+
+
+def _worker_loop(conn):
+    """工作进程主循环：接收 (函数, 参数)，回复 (是否成功, 结果或异常描述)；收到 None 时退出"""
+    while True:
+        try:
+            item = conn.recv()
+        except (EOFError, OSError):
+            break
+        if item is None:
+            break
+        fn, args = item
+        try:
+            reply = (True, fn(*args))
+        except Exception as e:
+            reply = (False, f"{type(e).__name__}: {e}")
+        conn.send(reply)
+
+
+class _Slot:
+    """一个可被终止并重启的工作进程"""
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.process = None
+        self.conn = None
+        self.starts = 0
+        # 因空闲而正常退出（下次启动不计为重启）
+        self.idle = False
+        # prestart 时由调用线程启动进程，完成后调度线程才开始工作
+        self.ready = threading.Event()
+
+    def start(self):
+        self.starts += 1
+        parent, child = self.ctx.Pipe()
+        self.process = self.ctx.Process(target=_worker_loop, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.conn = parent
+
+    def call(self, fn, args, timeout):
+        """
+        在工作进程中执行 fn(*args)
+
+        Raises:
+            FileTimeout: 超过 timeout 秒（进程已终止，下次调用时重启）
+            WorkerError: 任务抛出异常或进程意外退出
+        """
+        try:
+            self.conn.send((fn, args))
+            if not self.conn.poll(timeout):
+                self.kill()
+                raise FileTimeout(f"exceeded {timeout}s")
+            ok, value = self.conn.recv()
+        except (EOFError, OSError, BrokenPipeError) as e:
+            self.kill()
+            raise WorkerError(f"worker exited: {e}")
+        if not ok:
+            raise WorkerError(value)
+        return value
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def kill(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def stop(self):
+        """通知工作进程正常退出，超时未退出则强制终止"""
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        self.kill()
+
+
+class WatchdogExecutor:
+    """
+    带单任务时限的进程池（submit / shutdown 接口与 concurrent.futures.Executor 相同）
+
+    每个工作进程由一个调度线程驱动：任务在进程中执行，超过时限时终止该进程
+    并以 FileTimeout 结束对应的 Future，随后重启进程继续处理后续任务。
+    正则回溯等卡在 C 代码中的计算无法在线程内中断，只能通过终止进程回收。
+
+    prestart() 预先启动全部工作进程并执行预热函数；空闲超过 idle_timeout 的进程退出，
+    只保留 min_workers 个，有新任务时再按需启动。
+    """
+
+    def __init__(self, max_workers, timeout=None, mp_context=None, idle_timeout=None, min_workers=0):
+        """
+        Args:
+            max_workers: 工作进程数
+            timeout: 默认的单任务时限（秒，None 为不限制）
+            mp_context: multiprocessing 上下文（默认平台默认方式）
+            idle_timeout: 工作进程空闲多少秒后退出（None 为一直保留）
+            min_workers: 空闲时至少保留的工作进程数
+        """
+        self._max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.min_workers = min(min_workers, self._max_workers)
+        self._ctx = mp_context or multiprocessing.get_context()
+        self._queue = queue.SimpleQueue()
+        self._threads = []
+        self._slots = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self.stats = {'tasks': 0, 'timeouts': 0, 'errors': 0, 'restarts': 0, 'starts': 0, 'idle_stops': 0}
+
+    def submit(self, fn, *args, timeout=None):
+        """
+        提交任务，返回 Future
+
+        Args:
+            fn: 可被 pickle 的模块级函数
+            timeout: 本任务的时限（默认使用构造时的 timeout）
+        """
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot submit after shutdown')
+            if len(self._threads) < self._max_workers:
+                self._start_thread()
+        self._queue.put((future, fn, args, timeout if timeout is not None else self.timeout))
+        return future
+
+    def prestart(self, warmup=None):
+        """
+        启动全部工作进程，各进程随后在后台执行一次 warmup()（不等待其完成）
+
+        进程在调用线程中创建：fork 出的子进程会关闭继承的 sys.stdin，若此时另一线程
+        （如服务的消息循环）正阻塞在 stdin 上读取，子进程会因拿不到其锁而卡住
+
+        Args:
+            warmup: 可被 pickle 的模块级函数，用于提前导入模块、编译正则等
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot prestart after shutdown')
+            slots = []
+            while len(self._threads) < self._max_workers:
+                slots.append(self._start_thread(warmup))
+        for slot in slots:
+            self._start_slot(slot)
+            slot.ready.set()
+
+    def _start_thread(self, warmup=None):
+        slot = _Slot(self._ctx)
+        if warmup is None:
+            slot.ready.set()
+        thread = threading.Thread(target=self._dispatch, args=(slot, warmup), daemon=True)
+        self._slots.append(slot)
+        self._threads.append(thread)
+        thread.start()
+        return slot
+
+    def _start_slot(self, slot):
+        if slot.starts and not slot.idle:
+            self._count('restarts')
+        slot.idle = False
+        self._count('starts')
+        slot.start()
+
+    def _retire_if_idle(self, slot):
+        """空闲超时：运行中的进程多于 min_workers 时让该进程退出"""
+        with self._lock:
+            running = sum(1 for s in self._slots if s.alive and not s.idle)
+            if not slot.alive or slot.idle or running <= self.min_workers:
+                return
+            slot.idle = True
+            self.stats['idle_stops'] += 1
+        slot.stop()
+
+    def _dispatch(self, slot, warmup=None):
+        """调度线程：逐个取出任务交给自己的工作进程"""
+        slot.ready.wait()
+        if warmup is not None:
+            try:
+                slot.call(warmup, (), self.timeout)
+            except Exception:
+                # 预热失败不影响后续任务（进程已终止时按需重启）
+                pass
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                self._retire_if_idle(slot)
+                continue
+            if item is None:
+                break
+            future, fn, args, timeout = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if not slot.alive:
+                    self._start_slot(slot)
+                self._count('tasks')
+                result = slot.call(fn, args, timeout)
+            except FileTimeout as e:
+                self._count('timeouts')
+                future.set_exception(e)
+            except Exception as e:
+                # 任务出错、进程无法启动或参数无法序列化：只影响当前任务
+                self._count('errors')
+                future.set_exception(e if isinstance(e, WorkerError) else WorkerError(str(e)))
+            else:
+                future.set_result(result)
+        slot.stop()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def info(self):
+        """进程池状态：规模、运行中的进程数、排队任务数与累计统计"""
+        with self._lock:
+            return {
+                'max_workers': self._max_workers,
+                'min_workers': self.min_workers,
+                'running': sum(1 for s in self._slots if s.alive),
+                'queued': self._queue.qsize(),
+                **self.stats,
+            }
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+        if cancel_futures:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[0].cancel()
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
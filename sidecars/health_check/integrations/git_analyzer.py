@@ -2,8 +2,87 @@
 # sidecars/health_check/integrations/git_analyzer.py
 # ============================================================================
 import subprocess
+import threading
 import os
 
+
+class BlobReader:
+    """
+    常驻的 git cat-file --batch 进程
+
+    多次读取（任意版本、任意路径或 blob id）共用同一个管道，避免每个文件启动一个子进程。
+    可在多个线程间共享，每批请求在锁内完成写入与读取。
+    """
+
+    # 每批写入的请求数：请求总长度远小于管道缓冲区，写入不会因 git 输出未被读取而阻塞
+    PIPELINE = 64
+
+    def __init__(self, root_path):
+        self.process = subprocess.Popen(
+            ['git', 'cat-file', '--batch'],
+            cwd=root_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        self.process.stdout.close()
+
+    def _read_one(self):
+        header = self.process.stdout.readline()
+        if not header:
+            raise OSError("git cat-file exited unexpectedly")
+        parts = header.split()
+        # "<名称> missing" / "<名称> ambiguous" 没有内容
+        if len(parts) != 3 or not parts[2].isdigit():
+            return None
+        data = self.process.stdout.read(int(parts[2]) + 1)[:-1]
+        return data if parts[1] == b'blob' else None
+
+    def read(self, spec):
+        """读取单个对象（"<版本>:./<路径>" 或 blob id），不存在时返回 None"""
+        for _, data in self.read_many((spec,)):
+            return data
+
+    def read_many(self, specs):
+        """
+        流式读取多个对象，按请求顺序产出 (spec, bytes | None)
+
+        请求分批经同一管道发送，内存中只保留一批内容。
+        """
+        specs = iter(specs)
+        while True:
+            chunk = [spec for _, spec in zip(range(self.PIPELINE), specs)]
+            if not chunk:
+                return
+            # 含换行的名称会破坏逐行协议，直接视为不存在
+            valid = [spec for spec in chunk if '\n' not in spec]
+            with self.lock:
+                if valid:
+                    self.process.stdin.write(''.join(spec + '\n' for spec in valid).encode('utf-8'))
+                    self.process.stdin.flush()
+                results = {}
+                for spec in valid:
+                    results[spec] = self._read_one()
+            for spec in chunk:
+                yield spec, results.get(spec)
+
+
 class GitAnalyzer:
     """Git 历史分析"""
 
@@ -11,15 +90,25 @@ class GitAnalyzer:
         self.root_path = root_path
         self.is_git_repo = os.path.exists(os.path.join(root_path, '.git'))
 
-    def get_churn_map(self):
-        """获取文件修改频率"""
+    def get_churn_map(self, max_commits=None, timeout=10):
+        """
+        获取文件修改频率
+
+        Args:
+            max_commits: 只统计最近 N 次提交（None 表示全部历史）
+            timeout: git log 超时时间（秒）
+        """
         if not self.is_git_repo:
             return {}
 
+        cmd = ['git', 'log', '--name-only', '--format=']
+        if max_commits:
+            cmd.append(f'-n{int(max_commits)}')
+
         churn_map = {}
         try:
             process = subprocess.Popen(
-                ['git', 'log', '--name-only', '--format='],
+                cmd,
                 cwd=self.root_path,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
@@ -27,7 +116,13 @@ class GitAnalyzer:
                 encoding='utf-8',
                 errors='ignore'
             )
-            stdout, _ = process.communicate(timeout=10)
+            try:
+                stdout, _ = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                # 超时后结束子进程，避免遗留僵尸 git 进程
+                process.kill()
+                process.communicate()
+                return churn_map
 
             for line in stdout.split('\n'):
                 line = line.strip()
@@ -39,6 +134,247 @@ class GitAnalyzer:
 
         return churn_map
 
+    def get_head_commit(self):
+        """当前 HEAD 的提交哈希（非 Git 仓库或出错时为 None）"""
+        if not self.is_git_repo:
+            return None
+
+        try:
+            result = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'],
+                cwd=self.root_path,
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            return result.stdout.strip() or None
+        except Exception:
+            return None
+
+    def get_changed_files(self, base, timeout=10):
+        """
+        相对基准版本发生变化的文件（一次 git diff，含未提交的修改）
+
+        Args:
+            base: 基准版本（分支、标签或提交）
+        Returns:
+            list: [(状态, 路径, 基准版本中的路径), ...]，状态为 A/M/D/R/C/T 之一，
+                新增文件的基准路径为 None；路径相对于 root_path
+        Raises:
+            ValueError: 不是 Git 仓库或版本不存在
+        """
+        if not self.is_git_repo:
+            raise ValueError("Not a git repository")
+
+        result = subprocess.run(
+            ['git', 'diff', '--name-status', '-z', '-M', '--relative', base, '--'],
+            cwd=self.root_path,
+            capture_output=True,
+            timeout=timeout
+        )
+        if result.returncode != 0:
+            raise ValueError(result.stderr.decode('utf-8', 'ignore').strip() or f"Unknown revision: {base}")
+
+        changes = []
+        parts = result.stdout.decode('utf-8', 'surrogateescape').split('\0')
+        i = 0
+        while i < len(parts) - 1:
+            status = parts[i][:1]
+            if status in ('R', 'C'):
+                old_path, path = parts[i + 1], parts[i + 2]
+                i += 3
+            else:
+                path = parts[i + 1]
+                old_path = None if status == 'A' else path
+                i += 2
+            changes.append((status, path.replace('/', os.sep), old_path))
+        return changes
+
+    def list_index(self, include_untracked=True, timeout=10):
+        """
+        从 Git 索引列出工作区文件（不遍历目录）
+
+        Args:
+            include_untracked: 是否包含未跟踪且未被 .gitignore 忽略的文件
+        Returns:
+            list: [(相对路径, blob id), ...]；工作区中已修改、有冲突或未跟踪的文件
+                blob id 为 None（索引中的值与磁盘内容不一致）
+        Raises:
+            ValueError: 不是 Git 仓库
+        """
+        if not self.is_git_repo:
+            raise ValueError("Not a git repository")
+
+        def ls_files(*args):
+            result = subprocess.run(
+                ['git', 'ls-files', '-z', *args],
+                cwd=self.root_path,
+                capture_output=True,
+                timeout=timeout
+            )
+            if result.returncode != 0:
+                raise ValueError(result.stderr.decode('utf-8', 'ignore').strip())
+            return [item for item in result.stdout.decode('utf-8', 'surrogateescape').split('\0') if item]
+
+        # -m 依据索引中的 stat 信息判断，只对可疑文件读取内容
+        modified = set(ls_files('-m'))
+
+        entries = {}
+        for item in ls_files('-s'):
+            # <模式> <blob id> <暂存编号>\t<路径>
+            meta, _, path = item.partition('\t')
+            mode, blob_id, stage = meta.split()
+            if mode == '160000':
+                continue  # 子模块
+            if stage != '0' or path in modified or path in entries:
+                blob_id = None  # 冲突中的文件有多个暂存版本
+            entries[path] = blob_id
+
+        if include_untracked:
+            for path in ls_files('--others', '--exclude-standard'):
+                entries.setdefault(path, None)
+
+        return [(path.replace('/', os.sep), blob_id) for path, blob_id in entries.items()]
+
+    def get_file_blob_history(self, paths, max_revisions, max_commits=None, timeout=10):
+        """
+        一次 git log 取得多个文件最近的版本（提交与 blob id），不读取内容
+
+        Args:
+            paths: 相对路径列表
+            max_revisions: 每个文件最多取的版本数
+            max_commits: 最多遍历的提交数
+        Returns:
+            dict: {路径: [(提交, 提交时间戳, blob id), ...]}，新版本在前
+        """
+        history = {p: [] for p in paths}
+        if not self.is_git_repo or not paths:
+            return history
+
+        wanted = {p.replace(os.sep, '/'): history[p] for p in paths}
+        remaining = len(wanted)
+
+        cmd = ['git', 'log', '--raw', '--no-abbrev', '--no-renames', '--relative', '--format=C\t%H\t%ct']
+        if max_commits:
+            cmd.append(f'-n{int(max_commits)}')
+        cmd += ['--', *wanted]
+
+        process = subprocess.Popen(
+            cmd,
+            cwd=self.root_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='ignore'
+        )
+        # 超时直接结束 git，已读到的部分照常返回
+        timer = threading.Timer(timeout, process.kill)
+        timer.start()
+        try:
+            commit = None
+            for line in process.stdout:
+                if line.startswith('C\t'):
+                    _, sha, timestamp = line.rstrip('\n').split('\t')
+                    commit = (sha, int(timestamp))
+                    continue
+                if not line.startswith(':') or commit is None:
+                    continue
+                # :<旧模式> <新模式> <旧 blob> <新 blob> <状态>\t<路径>
+                meta, _, path = line.rstrip('\n').partition('\t')
+                parts = meta.split()
+                revisions = wanted.get(path)
+                if revisions is None or len(revisions) >= max_revisions or parts[4] == 'D':
+                    continue
+                revisions.append((commit[0], commit[1], parts[3]))
+                if len(revisions) == max_revisions:
+                    remaining -= 1
+                    if not remaining:
+                        break
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            process.stdout.close()
+
+        return history
+
+    def open_blob_reader(self):
+        """启动常驻的 git cat-file 进程（用完需 close，或用 with 语句）"""
+        if not self.is_git_repo:
+            raise ValueError("Not a git repository")
+        return BlobReader(self.root_path)
+
+    def read_blobs(self, rev, paths):
+        """
+        读取某版本中的多个文件，不检出工作区
+
+        Returns:
+            dict: {路径: bytes}，该版本中不存在的文件不在结果中
+        """
+        if not self.is_git_repo or not paths:
+            return {}
+
+        # ./ 前缀使路径相对于 root_path（root_path 可以是仓库子目录）
+        specs = [f"{rev}:./{p.replace(os.sep, '/')}" for p in paths]
+        blobs = {}
+        with self.open_blob_reader() as reader:
+            for path, (_, data) in zip(paths, reader.read_many(specs)):
+                if data is not None:
+                    blobs[path] = data
+        return blobs
+
+    def list_tree(self, rev, timeout=30):
+        """
+        列出某版本中的全部文件
+
+        Returns:
+            list: [(相对路径, blob id, 大小), ...]
+        Raises:
+            ValueError: 不是 Git 仓库或版本不存在
+        """
+        if not self.is_git_repo:
+            raise ValueError("Not a git repository")
+
+        result = subprocess.run(
+            ['git', 'ls-tree', '-r', '-l', '-z', rev],
+            cwd=self.root_path,
+            capture_output=True,
+            timeout=timeout
+        )
+        if result.returncode != 0:
+            raise ValueError(result.stderr.decode('utf-8', 'ignore').strip() or f"Unknown revision: {rev}")
+
+        entries = []
+        for item in result.stdout.decode('utf-8', 'surrogateescape').split('\0'):
+            if not item:
+                continue
+            # <mode> <type> <blob id> <size>\t<path>
+            meta, _, path = item.partition('\t')
+            parts = meta.split()
+            if len(parts) == 4 and parts[1] == 'blob':
+                entries.append((path.replace('/', os.sep), parts[2], int(parts[3])))
+        return entries
+
+    def get_release_tags(self, limit=5):
+        """按创建时间排序的最近 N 个标签（旧的在前）"""
+        if not self.is_git_repo:
+            return []
+
+        try:
+            result = subprocess.run(
+                ['git', 'for-each-ref', '--sort=creatordate', '--format=%(refname:short)', 'refs/tags'],
+                cwd=self.root_path,
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            tags = [t for t in result.stdout.split('\n') if t]
+            return tags[-limit:] if limit else tags
+        except Exception:
+            return []
+
     def get_contributors(self, filepath):
         """获取文件贡献者"""
         if not self.is_git_repo:
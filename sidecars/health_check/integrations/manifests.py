@@ -0,0 +1,385 @@
+# ============================================================================
+# sidecars/health_check/integrations/manifests.py
+# ============================================================================
+import os
+import re
+import sys
+import json
+import hashlib
+
+from ..config import CACHE_DIR
+from ..utils.stream_parsers import iter_json_scalars, iter_toml
+
+# 解析逻辑变化时递增，使旧缓存失效
+PARSER_VERSION = 1
+
+# Node.js 内置模块（不需要在 package.json 中声明）
+NODE_BUILTINS = {
+    'assert', 'async_hooks', 'buffer', 'child_process', 'cluster', 'console', 'constants',
+    'crypto', 'dgram', 'diagnostics_channel', 'dns', 'domain', 'events', 'fs', 'http',
+    'http2', 'https', 'inspector', 'module', 'net', 'os', 'path', 'perf_hooks', 'process',
+    'punycode', 'querystring', 'readline', 'repl', 'stream', 'string_decoder', 'sys',
+    'timers', 'tls', 'trace_events', 'tty', 'url', 'util', 'v8', 'vm', 'wasi',
+    'worker_threads', 'zlib',
+}
+
+# 发行包名与导入名不一致的常见 Python 包（均为规范化后的小写形式）
+PYTHON_IMPORT_ALIASES = {
+    'pyyaml': 'yaml', 'beautifulsoup4': 'bs4', 'pillow': 'pil', 'scikit_learn': 'sklearn',
+    'python_dateutil': 'dateutil', 'opencv_python': 'cv2', 'protobuf': 'google',
+    'attrs': 'attr', 'pyjwt': 'jwt', 'python_dotenv': 'dotenv', 'pymysql': 'pymysql',
+    'msgpack_python': 'msgpack', 'typing_extensions': 'typing_extensions',
+}
+
+_REQUIREMENT_NAME = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._\-]*)(.*)$')
+
+
+def _normalize_python(name):
+    return re.sub(r'[-_.]+', '_', name).lower()
+
+
+def _split_requirement(text):
+    """'requests[socks]>=2.0; python_version<"3.8"' -> ('requests', '>=2.0')"""
+    match = _REQUIREMENT_NAME.match(text.split(';')[0])
+    if not match:
+        return None, None
+    spec = re.sub(r'^\[[^\]]*\]', '', match.group(2).strip()).strip()
+    return match.group(1), spec
+
+
+# ============================================================================
+# 各类清单/锁文件解析器：流式读取，产出 (包名, 版本或版本约束, 是否开发依赖)
+# ============================================================================
+def _parse_package_json(f):
+    data = json.load(f)
+    # 合法 JSON 但顶层不是对象（如 []）时按格式错误报告；不是对象的依赖段忽略
+    if not isinstance(data, dict):
+        raise ValueError("package.json top level is not an object")
+    for section, dev in (('dependencies', False), ('peerDependencies', False),
+                         ('optionalDependencies', False), ('devDependencies', True)):
+        deps = data.get(section)
+        if not isinstance(deps, dict):
+            continue
+        for name, spec in deps.items():
+            yield name, spec, dev
+
+
+def _parse_package_lock(f):
+    """package-lock.json v1（dependencies 树）与 v2/v3（packages 扁平表）"""
+    current = None     # 正在收集的包路径
+    fields = {}
+    has_packages = False
+
+    def flush():
+        if current and 'version' in fields:
+            return current.rsplit('node_modules/', 1)[-1], fields['version'], bool(fields.get('dev'))
+        return None
+
+    for path, value in iter_json_scalars(f):
+        if len(path) == 3 and path[0] == 'packages':
+            has_packages = True
+            key, field = path[1], path[2]
+        elif not has_packages and len(path) >= 3 and path[0] == 'dependencies' \
+                and len(path) % 2 == 1 and all(p == 'dependencies' for p in path[0::2][:-1]):
+            # v1: dependencies.a.dependencies.b.version
+            key, field = 'node_modules/' + path[-2], path[-1]
+        else:
+            continue
+
+        if key != current:
+            entry = flush()
+            if entry:
+                yield entry
+            current, fields = key, {}
+        if field in ('version', 'dev'):
+            fields[field] = value
+
+    entry = flush()
+    if entry:
+        yield entry
+
+
+def _parse_yarn_lock(f):
+    name = None
+    for line in f:
+        if not line.strip() or line.startswith('#'):
+            continue
+        if not line[0].isspace() and line.rstrip().endswith(':'):
+            spec = line.rstrip()[:-1].split(',')[0].strip().strip('"')
+            name = spec.rsplit('@', 1)[0] if spec.rfind('@') > 0 else spec
+            continue
+        stripped = line.strip()
+        if name and stripped.startswith('version'):
+            version = stripped[len('version'):].lstrip(':').strip().strip('"')
+            yield name, version, False
+            name = None
+
+
+def _parse_pnpm_lock(f):
+    in_packages = False
+    for line in f:
+        if not line.strip():
+            continue
+        if not line[0].isspace():
+            in_packages = line.startswith('packages:')
+            continue
+        if not in_packages or not line.startswith('  ') or line[2].isspace():
+            continue
+        key = line.strip().rstrip(':').strip('\'"').lstrip('/')
+        key = key.split('(')[0]  # 去掉 peer 依赖后缀
+        at = key.rfind('@')
+        if at > 0:
+            yield key[:at], key[at + 1:], False
+        elif '/' in key:
+            # pnpm v5：/name/1.0.0
+            name, _, version = key.rpartition('/')
+            yield name, version, False
+
+
+def _parse_requirements(f):
+    for line in f:
+        line = line.split('#')[0].strip()
+        if not line or line.startswith('-'):
+            continue
+        name, spec = _split_requirement(line)
+        if name:
+            yield name, spec, False
+
+
+def _parse_pyproject(f):
+    for table, _, key, value in iter_toml(f):
+        if key is None:
+            continue
+        name = key[-1]
+        if table == ('project',) and key == ('dependencies',):
+            for req in value:
+                yield (*_split_requirement(req), False)
+        elif table == ('project', 'optional-dependencies'):
+            for req in value or []:
+                yield (*_split_requirement(req), True)
+        elif table in (('tool', 'poetry', 'dependencies'), ('tool', 'poetry', 'dev-dependencies')) \
+                or (len(table) == 5 and table[:3] == ('tool', 'poetry', 'group') and table[4] == 'dependencies'):
+            if name == 'python':
+                continue
+            spec = value.get('version', '') if isinstance(value, dict) else value
+            yield name, spec, table != ('tool', 'poetry', 'dependencies')
+
+
+def _parse_toml_packages(f):
+    """poetry.lock / Cargo.lock：[[package]] 块中的 name 与 version"""
+    package = {}
+    for table, new_item, key, value in iter_toml(f):
+        if table != ('package',):
+            continue
+        if new_item:
+            if 'name' in package:
+                yield package['name'], package.get('version', ''), False
+            package = {}
+        elif key in (('name',), ('version',)):
+            package[key[0]] = value
+    if 'name' in package:
+        yield package['name'], package.get('version', ''), False
+
+
+def _parse_cargo_toml(f):
+    sections = {'dependencies': False, 'dev-dependencies': True, 'build-dependencies': True}
+    for table, _, key, value in iter_toml(f):
+        if key is None:
+            continue
+        if len(table) == 1 and table[0] in sections:
+            spec = value.get('version', '') if isinstance(value, dict) else value
+            yield key[0], spec, sections[table[0]]
+        elif len(table) == 2 and table[0] in sections and key == ('version',):
+            # [dependencies.serde] 表形式
+            yield table[1], value, sections[table[0]]
+
+
+def _parse_go_mod(f):
+    in_block = False
+    for line in f:
+        line = line.split('//')[0].strip()
+        if line.startswith('require ('):
+            in_block = True
+            continue
+        if in_block and line == ')':
+            in_block = False
+            continue
+        if line.startswith('require '):
+            line = line[len('require '):]
+        elif not in_block:
+            continue
+        parts = line.split()
+        if len(parts) >= 2:
+            yield parts[0], parts[1], False
+
+
+def _parse_go_sum(f):
+    last = None
+    for line in f:
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        entry = (parts[0], parts[1].split('/')[0])
+        if entry != last:
+            last = entry
+            yield entry[0], entry[1], False
+
+
+# 文件名 -> (生态, 类型, 解析器)
+MANIFEST_PARSERS = {
+    'package.json': ('javascript', 'manifest', _parse_package_json),
+    'package-lock.json': ('javascript', 'lock', _parse_package_lock),
+    'yarn.lock': ('javascript', 'lock', _parse_yarn_lock),
+    'pnpm-lock.yaml': ('javascript', 'lock', _parse_pnpm_lock),
+    'requirements.txt': ('python', 'manifest', _parse_requirements),
+    'pyproject.toml': ('python', 'manifest', _parse_pyproject),
+    'poetry.lock': ('python', 'lock', _parse_toml_packages),
+    'Cargo.toml': ('rust', 'manifest', _parse_cargo_toml),
+    'Cargo.lock': ('rust', 'lock', _parse_toml_packages),
+    'go.mod': ('go', 'manifest', _parse_go_mod),
+    'go.sum': ('go', 'lock', _parse_go_sum),
+}
+
+
+# ============================================================================
+# 缓存：以文件内容哈希为键，锁文件不变时无需重新解析
+# ============================================================================
+def _file_digest(path):
+    hasher = hashlib.sha1(f"v{PARSER_VERSION}:{os.path.basename(path)}:".encode('utf-8'))
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _cache_path(digest):
+    return os.path.join(CACHE_DIR, 'inventory', digest[:2], digest + '.json')
+
+
+def load_manifest(path, use_cache=True):
+    """
+    解析单个清单/锁文件
+
+    Returns:
+        (条目列表 [(包名, 版本, 是否开发依赖), ...], 是否命中缓存)
+    """
+    parser = MANIFEST_PARSERS[os.path.basename(path)][2]
+
+    cache_file = None
+    if use_cache:
+        cache_file = _cache_path(_file_digest(path))
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return [tuple(e) for e in json.load(f)], True
+        except (OSError, ValueError):
+            pass
+
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        entries = [e for e in parser(f) if e[0]]
+
+    if cache_file:
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            tmp = cache_file + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass
+
+    return entries, False
+
+
+# ============================================================================
+# 依赖清点：已声明 vs 实际导入
+# ============================================================================
+def _is_builtin(name, ecosystem):
+    if ecosystem == 'javascript':
+        return name.startswith('node:') or name in NODE_BUILTINS
+    stdlib = getattr(sys, 'stdlib_module_names', ())
+    return name in stdlib or name == '__future__'
+
+
+def build_inventory(root_path, manifest_paths, imported, use_cache=True):
+    """
+    汇总项目中的依赖清单与锁文件，并与导入语句交叉比对
+
+    Args:
+        manifest_paths: 扫描时发现的清单/锁文件相对路径
+        imported: {'javascript': {包名}, 'python': {顶层模块名}}（已排除项目内模块）
+
+    Returns:
+        dict: manifests / declared / locked / unused / undeclared
+    """
+    manifests = []
+    declared = {}        # (生态, 包名) -> 条目
+    locked = {}          # 生态 -> {包名: 版本}
+
+    for rel_path in sorted(manifest_paths):
+        name = os.path.basename(rel_path)
+        if name not in MANIFEST_PARSERS:
+            continue
+        ecosystem, kind, _ = MANIFEST_PARSERS[name]
+        try:
+            entries, cached = load_manifest(os.path.join(root_path, rel_path), use_cache)
+        except (OSError, ValueError) as e:
+            manifests.append({'path': rel_path, 'ecosystem': ecosystem, 'kind': kind, 'error': str(e)})
+            continue
+
+        manifests.append({'path': rel_path, 'ecosystem': ecosystem, 'kind': kind,
+                          'packages': len(entries), 'cached': cached})
+
+        if kind == 'lock':
+            versions = locked.setdefault(ecosystem, {})
+            for pkg, version, _ in entries:
+                versions.setdefault(pkg, version)
+            continue
+
+        for pkg, spec, dev in entries:
+            entry = declared.setdefault((ecosystem, pkg), {
+                'name': pkg, 'ecosystem': ecosystem, 'spec': spec, 'dev': dev, 'manifest': rel_path
+            })
+            entry['dev'] = entry['dev'] and dev
+
+    for (ecosystem, pkg), entry in declared.items():
+        entry['version'] = locked.get(ecosystem, {}).get(pkg)
+
+    # 比对：只在该生态既有清单又有导入时才有意义
+    unused = []
+    undeclared = []
+    for ecosystem in ('javascript', 'python'):
+        names = {pkg for eco, pkg in declared if eco == ecosystem}
+        used = imported.get(ecosystem) or set()
+        if not names or not used:
+            continue
+
+        if ecosystem == 'python':
+            # 发行包名 -> 导入名
+            import_names = {}
+            for pkg in names:
+                norm = _normalize_python(pkg)
+                import_names[pkg] = PYTHON_IMPORT_ALIASES.get(norm, norm)
+            used_norm = {u.lower() for u in used}
+            unused_names = [p for p in names if import_names[p] not in used_norm]
+            known = set(import_names.values())
+            missing = [u for u in used if u.lower() not in known and not _is_builtin(u, ecosystem)]
+        else:
+            unused_names = [p for p in names if p not in used and not p.startswith('@types/')]
+            missing = [u for u in used if u not in names and not _is_builtin(u, ecosystem)]
+
+        for pkg in sorted(unused_names):
+            entry = declared[(ecosystem, pkg)]
+            # 开发依赖多为构建/测试工具，不出现在导入中属正常
+            if not entry['dev']:
+                unused.append({'name': pkg, 'ecosystem': ecosystem, 'manifest': entry['manifest']})
+        if ecosystem == 'python' and not hasattr(sys, 'stdlib_module_names'):
+            continue  # 无法区分标准库时不报告未声明依赖
+        undeclared.extend({'name': u, 'ecosystem': ecosystem} for u in sorted(missing))
+
+    return {
+        'manifests': manifests,
+        'declared': sorted(declared.values(), key=lambda e: (e['ecosystem'], e['name'])),
+        'locked': {eco: len(versions) for eco, versions in locked.items()},
+        'unused': unused,
+        'undeclared': undeclared,
+    }
@@ -5,10 +5,23 @@ import sys
 import os
 import json
 import time
-
-
-from .core.scanner import ProjectScanner
+import sqlite3
+import subprocess
+import heapq
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+from .core.scanner import ProjectScanner, warm_worker
+from .core.scan_profiles import resolve_scan_options
+from .core.trend_store import TrendStore
+from .core.diff_scan import compare_records
+from .core.hotspot_history import BlobMetricsCache, sample_hotspot_history
+from .core.watchdog import WatchdogExecutor
+from .core import daemon
 from .integrations.git_analyzer import GitAnalyzer
+from .config import SCAN_POOL, HOTSPOT_HISTORY, DAEMON
 
 
 # 强制 UTF-8 输出
@@ -20,8 +33,45 @@ class HealthCheckService:
 
     def __init__(self):
         self.running = False
-
-    def scan_project(self, root_path, options=None):
+        # 分析文件的共享进程池（子进程模式下就绪时预先启动，否则首次并行扫描时创建；
+        # 跨请求与项目复用，空闲时缩减到 SCAN_POOL['min_workers'] 个进程；
+        # 单个文件超过 SCAN_POOL['file_timeout'] 时终止对应的工作进程）
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # 守护进程模式下每个连接的线程各自输出到自己的套接字（未绑定时写 stdout）
+        self._local = threading.local()
+        # 最近的扫描结果（根目录 -> 结果），守护进程模式下各客户端共享，最多 DAEMON['keep_results'] 个
+        self._results = OrderedDict()
+        # 同一项目的扫描串行进行（检查点、结果库按项目共用一个文件）
+        self._root_locks = {}
+        self._state_lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = WatchdogExecutor(SCAN_POOL['workers'], SCAN_POOL['file_timeout'],
+                                              idle_timeout=SCAN_POOL['idle_timeout'],
+                                              min_workers=SCAN_POOL['min_workers'])
+            return self._pool
+
+    def warm_pool(self):
+        """预先启动全部工作进程并导入分析器，之后的扫描不再承担进程启动与模块导入的开销"""
+        self._get_pool().prestart(warm_worker)
+
+    def pool_stats(self):
+        """共享进程池的状态（尚未创建时为 None）"""
+        with self._pool_lock:
+            pool = self._pool
+        return pool.info() if pool is not None else None
+
+    def shutdown(self):
+        """关闭共享进程池"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def scan_project(self, root_path, options=None, on_file=None, executor=None, on_estimate=None):
         """
         扫描项目
 
@@ -30,45 +80,415 @@ class HealthCheckService:
             options: 可选配置
                 - enable_git: 是否启用 Git 分析（默认 True）
                 - enable_dependencies: 是否分析依赖（默认 True）
+                - profiling: 是否记录各阶段/分析器耗时（默认 False）
+                - profile_top_n: 记录最慢文件的数量（默认 10）
+                - scan_profile: 扫描档位 quick / standard / deep（见 config.SCAN_PROFILES）
+                - max_cost / max_file_size / git_depth / time_budget: 覆盖档位中的单项设置
+                - prioritize: 按 打开的文件 > 最近修改 > 高频修改 的顺序扫描
+                - priority_hints: 编辑器中打开的文件路径列表（隐含 prioritize）
+                - record_trends: 把本次结果写入趋势库（默认 True）
+                - trend_base: 趋势对比的基准提交（默认为上一次扫描）
+                - trend_db: 趋势库路径（默认 CACHE_DIR/trends.sqlite3）
+                - since: 只分析相对该 Git 版本变化的文件，并给出新增/已修复的问题
+                - git_index: 从 Git 索引列出文件并直接使用其中的 blob id，不遍历目录
+                - analysis_cache: 按内容寻址缓存分析结果，跨分支/工作区/仓库共享（默认 False；
+                  命令行与子进程模式默认开启）
+                - hotspot_history: 采样高频修改文件最近若干版本的复杂度走势
+                  （True 或覆盖 config.HOTSPOT_HISTORY 的 dict）
+                - parallel: 在共享进程池中分析文件
+                - file_timeout: 单个文件的分析时限（秒，隐含 parallel；默认 SCAN_POOL['file_timeout']），
+                  超时的文件记入结果的 timed_out
+                - result_store: 逐文件把结果写入 SQLite（True 为 CACHE_DIR/results/ 下的默认位置，
+                  或指定路径），汇总与排序在库中完成，返回的各列表只保留前 RESULT_STORE['list_limit'] 项
+                - checkpoint: 扫描中周期性保存已完成文件的结果（CACHE_DIR/checkpoints/），
+                  完整结束时清空，被中断或截断时保留；'auto' 时遍历到 CHECKPOINT['auto_files']
+                  个文件后才开始保存
+                - resume: 从上次的检查点继续（隐含 checkpoint）：修改时间与大小未变的文件直接使用
+                  保存的结果，只重新分析此后变化的文件
+                - sample: 抽样估计：先分析分层随机样本（文件数，或 0~1 之间的比例），结果的 estimates
+                  给出行数、代码行、复杂度、问题数的估计总量与置信区间以及问题密度；之后继续扫描其余文件
+                  并逐步修正估计，完整结束时即为精确值（配合 time_budget 可只取样本阶段的估计）
+                - sample_seed: 抽样的随机种子
+            on_file: 每完成一个文件回调 on_file(record)
+            executor: 分析文件所用的进程池（默认 parallel 时使用服务的共享进程池）
+            on_estimate: 抽样模式下样本完成时及之后周期性回调 on_estimate(估计)
 
         Returns:
-            dict: 扫描结果
+            dict: 扫描结果（超出 time_budget 时 summary.truncated 为 True）
         """
-        options = options or {}
+        options = resolve_scan_options(options)
         start_time = time.time()
 
+        # 整体时间预算（包含 Git 分析）
+        deadline = None
+        if options.get('time_budget'):
+            deadline = time.monotonic() + options['time_budget']
+
         # 1. 基础扫描
-        scanner = ProjectScanner(root_path, options)
-        stats = scanner.scan()
-
-        # 2. Git 分析（可选）
-        if options.get('enable_git', True):
-            git = GitAnalyzer(root_path)
-            churn_map = git.get_churn_map()
-
-            # 填充 churn 数据
-            for file_data in stats['files_data']:
-                rel_path = file_data['path'].replace('\\', '/')
-                file_data['churn'] = churn_map.get(rel_path, 0)
-
-            # 识别热点
-            for file_data in stats['files_data']:
-                if file_data['complexity'] > 20 and file_data['churn'] > 5:
-                    stats['hotspots'].append({
-                        'file': file_data['path'],
-                        'complexity': file_data['complexity'],
-                        'churn': file_data['churn'],
-                        'score': file_data['complexity'] * file_data['churn']
-                    })
+        if executor is None and (options.get('parallel') or options.get('file_timeout')):
+            executor = self._get_pool()
+        scanner = ProjectScanner(root_path, options, executor)
+        profiler = scanner.profiler
+        enable_git = options.get('enable_git', True)
+        git = GitAnalyzer(root_path) if enable_git else None
+
+        # 差异扫描：只分析相对基准版本变化的文件，耗时与改动规模成正比
+        since = options.get('since')
+        changes = None
+        head_records = {}
+        if since:
+            # 差异扫描总是需要 Git，enable_git 只控制修改频率统计
+            git = git or GitAnalyzer(root_path)
+            with profiler.phase('git'):
+                changes = git.get_changed_files(since)
+
+            def collect(record, callback=on_file):
+                head_records[record['file']] = record
+                if callback:
+                    callback(record)
+            on_file = collect
+
+        # 优先扫描需要修改频率排序，先读取 Git 历史（后续热点计算复用）
+        churn_map = None
+        if git and not since and (options.get('prioritize') or options.get('priority_hints')):
+            with profiler.phase('git'):
+                churn_map = git.get_churn_map(options.get('git_depth'))
+
+        # 2. Git 分析（可选；差异扫描不读取完整历史）：修改频率在后台线程中与文件扫描
+        # 同时进行，总耗时接近 max(扫描, git) 而不是两者之和，计算热点前才等待结果
+        churn_future = None
+        if git and churn_map is None and not since:
+            git_timeout = 10
+            if deadline is not None:
+                git_timeout = min(git_timeout, deadline - time.monotonic())
+            if git_timeout > 0:
+                churn_future = self._start_churn(git, options.get('git_depth'), git_timeout)
+
+        paths = [path for status, path, _ in changes if status != 'D'] if since else None
+        stats = scanner.scan(deadline=deadline, on_file=on_file, churn_map=churn_map, paths=paths,
+                             on_estimate=on_estimate)
+
+        if since:
+            with profiler.phase('diff'):
+                stats['diff'] = self._compare_with_base(scanner, git, since, changes, head_records)
+
+        if churn_future is not None:
+            # git_wait 为扫描结束后仍需等待 git 的时间（完全重叠时接近 0）
+            with profiler.phase('git_wait'):
+                churn_map, git_seconds = churn_future.result()
+            profiler.add_phase('git', git_seconds)
+        elif git and churn_map is None and not since:
+            # 预算在开始扫描前已用尽
+            stats['summary']['truncated'] = True
+
+        store = scanner.result_store
+        if churn_map is not None:
+            with profiler.phase('hotspots'):
+                # 填充 churn 数据
+                for file_data in stats['files_data']:
+                    rel_path = file_data['path'].replace('\\', '/')
+                    file_data['churn'] = churn_map.get(rel_path, 0)
+                if store is not None:
+                    store.set_churn(churn_map)
+
+                # 识别热点（结果库模式下逐行读取全部文件，只保留分数最高的 list_limit 个）
+                if store is None:
+                    stats['hotspots'], _ = self._find_hotspots(stats['files_data'])
+                else:
+                    stats['hotspots'], stats['result_store']['counts']['hotspots'] = self._find_hotspots(
+                        store.iter_files(), stats['result_store']['list_limit'])
+
+        # 热点复杂度走势（受整体时间预算约束）
+        if churn_map and options.get('hotspot_history') and 'metrics' in scanner.analyzers:
+            settings = options['hotspot_history'] if isinstance(options['hotspot_history'], dict) else {}
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                settings = {**settings, 'time_budget': min(settings.get('time_budget', remaining), remaining)}
+            if settings.get('time_budget', 1) > 0:
+                with profiler.phase('hotspot_history'):
+                    stats['hotspot_trends'] = self._sample_hotspot_history(
+                        git, scanner.analyzers['metrics'], stats, settings, store)
+
+        # 3. 历史趋势（只记录完整扫描）
+        if options.get('record_trends', True) and not since:
+            with profiler.phase('trends'):
+                stats['trends'] = self._record_trends(root_path, stats, options, git, store)
+
+        if store is not None:
+            store.close()
+
+        if profiler.enabled:
+            stats['profile'] = profiler.to_dict()
 
         stats['summary']['scan_time'] = round(time.time() - start_time, 2)
 
         return stats
 
+    def scan_workspace(self, roots, options=None, on_file=None):
+        """
+        同时扫描多个项目根目录（多根工作区）
+
+        各项目在独立线程中遍历、查缓存与汇总，文件分析统一提交到同一个共享进程池，
+        分析器与预编译的正则在每个工作进程中只构建一次。
+
+        Args:
+            roots: 项目根目录列表
+            options: 同 scan_project，对每个项目生效
+            on_file: 每完成一个文件回调 on_file(root, record)
+        Returns:
+            dict: {'roots': {根目录: 扫描结果或 {'error': ...}}, 'summary': 合并后的汇总}
+        """
+        start_time = time.time()
+        roots = list(dict.fromkeys(roots))
+        pool = self._get_pool()
+        callback_lock = threading.Lock()
+
+        def scan_root(root):
+            callback = None
+            if on_file:
+                def callback(record):
+                    with callback_lock:
+                        on_file(root, record)
+            with self._root_lock(root):
+                result = self.scan_project(root, options, callback, executor=pool)
+            if not (options or {}).get('since'):
+                self._remember(root, result)
+            return result
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, len(roots))) as threads:
+            futures = {root: threads.submit(scan_root, root) for root in roots}
+            for root, future in futures.items():
+                try:
+                    results[root] = future.result()
+                except Exception as e:
+                    results[root] = {'error': str(e)}
+
+        summary = self._merge_summaries([r for r in results.values() if 'summary' in r])
+        summary['roots'] = len(roots)
+        summary['failed_roots'] = sum(1 for r in results.values() if 'error' in r)
+        summary['scan_time'] = round(time.time() - start_time, 2)
+        return {'roots': results, 'summary': summary}
+
+    @staticmethod
+    def _merge_summaries(results):
+        """合并多个项目的汇总与语言统计"""
+        summary = {'files': 0, 'lines': 0, 'code_lines': 0, 'size': 0, 'issues': 0, 'timed_out': 0,
+                   'skipped_files': 0, 'truncated': False, 'languages': {}}
+        for stats in results:
+            for key in ('files', 'lines', 'code_lines', 'size', 'issues', 'skipped_files', 'timed_out'):
+                summary[key] += stats['summary'].get(key, 0)
+            summary['truncated'] = summary['truncated'] or stats['summary'].get('truncated', False)
+            for lang, info in stats['languages'].items():
+                merged = summary['languages'].setdefault(lang, {'files': 0, 'lines': 0, 'code': 0, 'functions': 0})
+                for key in merged:
+                    merged[key] += info.get(key, 0)
+        return summary
+
+    @staticmethod
+    def _find_hotspots(files, limit=None):
+        """
+        找出复杂且频繁修改的文件
+
+        Args:
+            files: file_data 的可迭代对象（可以是只能遍历一次的迭代器）
+            limit: 只保留分数最高的前 limit 个（按分数降序，内存占用与文件数无关）；
+                None 时按 files 的顺序全部返回
+        Returns:
+            (热点列表, 热点总数)
+        """
+        hotspots = []
+        found = 0
+        for file_data in files:
+            if file_data['complexity'] > 20 and file_data['churn'] > 5:
+                hotspot = {
+                    'file': file_data['path'],
+                    'complexity': file_data['complexity'],
+                    'churn': file_data['churn'],
+                    'score': file_data['complexity'] * file_data['churn']
+                }
+                if limit is None:
+                    hotspots.append(hotspot)
+                else:
+                    # 同分时先出现的文件优先
+                    item = (hotspot['score'], -found, hotspot)
+                    if len(hotspots) < limit:
+                        heapq.heappush(hotspots, item)
+                    elif item > hotspots[0]:
+                        heapq.heapreplace(hotspots, item)
+                found += 1
+        if limit is not None:
+            hotspots = [hotspot for _, _, hotspot in sorted(hotspots, reverse=True)]
+        return hotspots, found
+
+    @staticmethod
+    def _start_churn(git, depth, timeout):
+        """
+        在后台线程中读取修改频率
+
+        Returns:
+            Future: 结果为 (churn_map, git 耗时秒数)
+        """
+        def run():
+            start = time.perf_counter()
+            churn_map = git.get_churn_map(depth, timeout)
+            return churn_map, time.perf_counter() - start
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(run)
+        executor.shutdown(wait=False)
+        return future
+
+    def _compare_with_base(self, scanner, git, base, changes, head_records):
+        """用 git cat-file 读取基准版本的文件内容并分析，对比新增/已修复的问题"""
+        max_file_size = scanner.config.get('max_file_size')
+        blobs = git.read_blobs(base, [old_path for _, _, old_path in changes if old_path])
+
+        files = []
+        new_findings = []
+        fixed_findings = []
+        for status, path, old_path in changes:
+            head = head_records.get(path)
+            # 当前版本被忽略或跳过（超大文件）时无法比较
+            if head is None and status != 'D':
+                continue
+
+            base_record = None
+            blob = blobs.get(old_path)
+            if blob is not None and (max_file_size is None or len(blob) <= max_file_size):
+                lines = blob.decode('utf-8', errors='ignore').splitlines(keepends=True)
+                base_record = scanner.analyze_content(path, lines)
+            if head is None and base_record is None:
+                continue
+
+            change, new, fixed = compare_records(path, status, head, base_record, old_path)
+            files.append(change)
+            new_findings.extend(new)
+            fixed_findings.extend(fixed)
+
+        return {
+            'base': base,
+            'changed_files': len(changes),
+            'files': files,
+            'new_findings': new_findings,
+            'fixed_findings': fixed_findings,
+            'summary': {'new': len(new_findings), 'fixed': len(fixed_findings)},
+        }
+
+    def _sample_hotspot_history(self, git, analyzer, stats, settings, store=None):
+        """采样热点文件的复杂度历史（blob 缓存不可用时照常计算）"""
+        files_data = stats['files_data']
+        if store is not None:
+            files_data = store.files_by_churn(settings.get('files', HOTSPOT_HISTORY['files']))
+        try:
+            cache = BlobMetricsCache()
+        except (sqlite3.Error, OSError):
+            cache = None
+        try:
+            return sample_hotspot_history(git, analyzer, files_data, settings, cache)
+        finally:
+            if cache:
+                cache.close()
+
+    def _record_trends(self, root_path, stats, options, git=None, results=None):
+        """记录本次扫描并返回趋势摘要（写入失败不影响扫描结果）"""
+        commit_id = git.get_head_commit() if git else None
+        try:
+            with TrendStore(options.get('trend_db')) as store:
+                if results is not None:
+                    # 结果库模式：返回结果中的列表不完整，逐文件指标与问题数从结果库读取
+                    scan_id = store.record_scan(root_path, stats, commit_id,
+                                                files=results.iter_files(with_issues=True))
+                else:
+                    scan_id = store.record_scan(root_path, stats, commit_id)
+                if options.get('trend_base'):
+                    base_id = store.find_scan(root_path, commit=options['trend_base'])
+                else:
+                    base_id = store.find_scan(root_path, before_scan=scan_id)
+                return {
+                    'scan_id': scan_id,
+                    'commit': commit_id,
+                    'base_scan_id': base_id,
+                    'history': store.metric_history(root_path, ('issues', 'complexity', 'code_lines', 'bad_smells')),
+                    'worse': store.files_worse_since(root_path, scan_id=base_id) if base_id else [],
+                }
+        except (sqlite3.Error, OSError) as e:
+            return {'error': str(e)}
+
+    def scan_history(self, root_path, revisions=None, options=None):
+        """
+        分析历史版本快照（不检出工作区，所有文件内容经同一个 git cat-file 进程读取）
+
+        Args:
+            revisions: 版本列表；未指定时取最近 options['history_tags'] 个标签（默认 5）
+            options: 同 scan_project（scan_profile / max_file_size / analyzers 等）
+        Returns:
+            dict: {'snapshots': [{'revision', 'summary', 'languages', 'complexity', ...}, ...]}
+        """
+        options = resolve_scan_options(options)
+        git = GitAnalyzer(root_path)
+        if not git.is_git_repo:
+            raise ValueError("Not a git repository")
+        if not revisions:
+            revisions = git.get_release_tags(options.get('history_tags', 5))
+
+        deadline = None
+        if options.get('time_budget'):
+            deadline = time.monotonic() + options['time_budget']
+
+        scanner = ProjectScanner(root_path, options)
+        snapshots = []
+        with git.open_blob_reader() as reader:
+            for rev in revisions:
+                stats = scanner.scan_snapshot(git.list_tree(rev), reader, deadline)
+                snapshots.append({
+                    'revision': rev,
+                    'summary': stats['summary'],
+                    'languages': stats['languages'],
+                    'complexity': sum(f['complexity'] for f in stats['files_data']),
+                    'secrets': len(stats['secrets']),
+                    'risks': len(stats['risks']),
+                    'bad_smells': len(stats['bad_smells']),
+                    'todos': len(stats['todos']),
+                })
+                if stats['summary']['truncated']:
+                    break
+
+        return {'snapshots': snapshots}
+
+    def query_trends(self, root_path, options=None):
+        """
+        查询趋势库（不扫描）
+
+        Args:
+            options:
+                - metrics: 汇总指标列表（见 trend_store.SCAN_METRICS）
+                - file: 查询单个文件的指标变化
+                - since: 基准提交，列出此后变差的文件
+                - metric: 变差判定所用的文件指标（默认 complexity）
+                - limit: 返回条数
+        """
+        options = options or {}
+        limit = options.get('limit', 50)
+        with TrendStore(options.get('trend_db')) as store:
+            result = {
+                'history': store.metric_history(
+                    root_path, options.get('metrics', ('issues', 'complexity')), limit)
+            }
+            if options.get('file'):
+                result['file_history'] = store.file_history(root_path, options['file'], limit)
+            if options.get('since'):
+                result['worse'] = store.files_worse_since(
+                    root_path, commit=options['since'], metric=options.get('metric', 'complexity'), limit=limit)
+        return result
+
     def run_as_service(self):
         """作为子进程服务运行（Electron 集成模式）"""
         self.running = True
 
+        # 预热进程池（后台启动，不阻塞就绪信号）
+        self.warm_pool()
+
         # 发送就绪信号
         print(json.dumps({"type": "status", "msg": "ready"}), flush=True)
 
@@ -84,20 +504,66 @@ class HealthCheckService:
                 except json.JSONDecodeError:
                     continue
 
-                req_id = req.get("id")
-                cmd = req.get("command", "scan")
-
-                if cmd == "scan":
-                    self._handle_scan(req_id, req)
-                elif cmd == "stop":
-                    self.running = False
-                    self._send_response(req_id, {"status": "stopped"})
-                else:
-                    self._send_error(req_id, f"Unknown command: {cmd}")
+                self.handle_request(req)
 
             except Exception as e:
                 self._send_error(None, str(e))
 
+        self.shutdown()
+
+    def run_as_daemon(self, socket_path=None):
+        """作为守护进程运行：在 Unix 域套接字上同时服务多个客户端（编辑器窗口与命令行）"""
+        socket_path = socket_path or DAEMON['socket']
+        self.warm_pool()
+        print(json.dumps({"type": "status", "msg": "ready", "socket": socket_path}), flush=True)
+        try:
+            daemon.serve(self, socket_path)
+        finally:
+            self.shutdown()
+
+    def bind_output(self, write):
+        """把当前线程的响应输出到 write(line)（None 时恢复为 stdout）"""
+        self._local.write = write
+
+    def handle_request(self, req):
+        """处理一条 JSON 请求（子进程与守护进程模式共用）"""
+        req_id = req.get("id")
+        cmd = req.get("command", "scan")
+
+        try:
+            if cmd == "scan":
+                self._handle_scan(req_id, req)
+            elif cmd == "scan_workspace":
+                self._handle_scan_workspace(req_id, req)
+            elif cmd == "result":
+                self._handle_result(req_id, req)
+            elif cmd == "trends":
+                self._handle_trends(req_id, req)
+            elif cmd == "history":
+                self._handle_history(req_id, req)
+            elif cmd == "status":
+                self._send_response(req_id, {"success": True, "data": {"pool": self.pool_stats()}})
+            elif cmd == "stop":
+                self.running = False
+                self._send_response(req_id, {"status": "stopped"})
+            else:
+                self._send_error(req_id, f"Unknown command: {cmd}")
+        except Exception as e:
+            self._send_error(req_id, str(e))
+
+    def _root_lock(self, root):
+        with self._state_lock:
+            return self._root_locks.setdefault(os.path.abspath(root), threading.Lock())
+
+    def _remember(self, root, result):
+        """保存最近的扫描结果，超出上限时丢弃最早的"""
+        with self._state_lock:
+            key = os.path.abspath(root)
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > DAEMON['keep_results']:
+                self._results.popitem(last=False)
+
     def _handle_scan(self, req_id, req):
         """处理扫描请求"""
         target_path = req.get("path")
@@ -106,57 +572,414 @@ class HealthCheckService:
             self._send_error(req_id, "Path not found")
             return
 
+        options = req.get("options", {})
+        # 服务常驻，进程池在请求之间复用；单个文件卡住时只终止对应的工作进程
+        options.setdefault('parallel', True)
+        # 编辑器反复扫描同一批文件，分析结果按内容缓存（CACHE_DIR/analysis_cache.sqlite3）
+        options.setdefault('analysis_cache', True)
+        # 大项目的扫描在应用关闭或子进程被终止时保留已完成的部分，下次请求可带 resume 继续；
+        # 不足 CHECKPOINT['auto_files'] 个文件的项目不记录（重扫比读写检查点更快）
+        options.setdefault('checkpoint', 'auto')
+
+        # 流式模式：每完成一个文件先推送一条 file 消息，最后再发送完整结果
+        on_file = None
+        if options.get('stream'):
+            def on_file(record):
+                self._emit(json.dumps({"id": req_id, "type": "file", "data": record}))
+
+        # 抽样模式：样本完成时及之后周期性推送 estimate 消息
+        on_estimate = None
+        if options.get('sample'):
+            def on_estimate(estimate):
+                self._emit(json.dumps({"id": req_id, "type": "estimate", "data": estimate}))
+
         try:
-            options = req.get("options", {})
-            result = self.scan_project(target_path, options)
+            with self._root_lock(target_path):
+                result = self.scan_project(target_path, options, on_file, on_estimate=on_estimate)
+        except Exception as e:
+            self._send_error(req_id, str(e))
+            return
+        if not options.get('since'):
+            self._remember(target_path, result)
+
+        if not options.get('profiling'):
             self._send_response(req_id, {"success": True, "data": result})
+            return
+
+        # 剖析模式：单独计时结果序列化，再拼接响应，避免重复序列化
+        start = time.perf_counter()
+        data_json = json.dumps(result)
+        serialize_time = round(time.perf_counter() - start, 4)
+        profile_json = json.dumps({**result.get('profile', {}), 'serialize': serialize_time})
+        self._emit(f'{{"id": {json.dumps(req_id)}, "success": true, "profile": {profile_json}, "data": {data_json}}}')
+
+    def _handle_scan_workspace(self, req_id, req):
+        """处理多根工作区扫描请求：{"paths": [...], "options": {...}}"""
+        roots = req.get("paths") or []
+        missing = [p for p in roots if not os.path.exists(p)]
+        if not roots or missing:
+            self._send_error(req_id, f"Path not found: {', '.join(missing)}" if missing else "Path not found")
+            return
+
+        options = req.get("options", {})
+        options.setdefault('analysis_cache', True)
+
+        # 流式模式：file 消息额外带上所属的根目录（回调在各项目的扫描线程中执行）
+        on_file = None
+        if options.get('stream'):
+            emit = self._output()
+
+            def on_file(root, record):
+                emit(json.dumps({"id": req_id, "type": "file", "root": root, "data": record}))
+
+        try:
+            result = self.scan_workspace(roots, options, on_file)
         except Exception as e:
             self._send_error(req_id, str(e))
+            return
+        self._send_response(req_id, {"success": True, "data": result})
+
+    def _handle_result(self, req_id, req):
+        """返回某个项目最近一次扫描的结果（不重新扫描；可能来自其他客户端的请求）"""
+        target_path = req.get("path")
+        with self._state_lock:
+            result = self._results.get(os.path.abspath(target_path)) if target_path else None
+        if result is None:
+            self._send_error(req_id, "No scan result")
+            return
+        self._send_response(req_id, {"success": True, "data": result})
+
+    def _handle_trends(self, req_id, req):
+        """处理趋势查询请求"""
+        target_path = req.get("path")
+        if not target_path:
+            self._send_error(req_id, "Path not found")
+            return
+
+        try:
+            result = self.query_trends(target_path, req.get("options", {}))
+        except (sqlite3.Error, OSError, ValueError) as e:
+            self._send_error(req_id, str(e))
+            return
+        self._send_response(req_id, {"success": True, "data": result})
+
+    def _handle_history(self, req_id, req):
+        """处理历史快照分析请求"""
+        target_path = req.get("path")
+        if not target_path or not os.path.exists(target_path):
+            self._send_error(req_id, "Path not found")
+            return
+
+        options = req.get("options", {})
+        try:
+            result = self.scan_history(target_path, options.get("revisions"), options)
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            self._send_error(req_id, str(e))
+            return
+        self._send_response(req_id, {"success": True, "data": result})
+
+    def _output(self):
+        """当前线程的输出函数：守护进程模式下写入当前连接，否则写 stdout"""
+        return getattr(self._local, 'write', None) or (lambda line: print(line, flush=True))
+
+    def _emit(self, line):
+        """输出一行消息"""
+        self._output()(line)
 
     def _send_response(self, req_id, data):
         """发送响应"""
         response = {"id": req_id, **data}
-        print(json.dumps(response), flush=True)
+        self._emit(json.dumps(response))
 
     def _send_error(self, req_id, error):
         """发送错误"""
         response = {"id": req_id, "success": False, "error": error}
-        print(json.dumps(response), flush=True)
+        self._emit(json.dumps(response))
 
 # ============================================================================
 # 命令行入口
 # ============================================================================
+def _sample_size(value):
+    """--sample 的取值：正整数为文件数，0~1 之间的小数为比例"""
+    import argparse
+    try:
+        size = int(value)
+    except ValueError:
+        try:
+            size = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid sample size: {value}")
+        if not 0 < size < 1:
+            raise argparse.ArgumentTypeError(f"sample fraction must be between 0 and 1: {value}")
+        return size
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"sample size must be positive: {value}")
+    return size
+
+
+def _print_estimate(estimate):
+    """打印抽样估计（估计值与置信区间）"""
+    totals = estimate['totals']
+    level = round(estimate['confidence'] * 100)
+    title = '精确值' if estimate['exact'] else f"估计（{level}% 置信区间）"
+    print(f"\n🎲 已分析 {estimate['sampled']}/{estimate['population']} 个文件，{title}:")
+    for name, label in (('lines', '总行数'), ('code', '代码行'), ('complexity', '复杂度'), ('issues', '问题')):
+        item = totals[name]
+        interval = '' if estimate['exact'] else f"  [{item['low']}, {item['high']}]"
+        print(f"  • {label}: {item['estimate']}{interval}")
+    density = estimate['issue_density']
+    interval = '' if estimate['exact'] else f"  [{density['low']}, {density['high']}]"
+    print(f"  • 问题密度: {density['estimate']} / 千行代码{interval}", flush=True)
+
+
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description='代码健康检查工具')
-    parser.add_argument('path', help='项目路径')
-    parser.add_argument('--mode', choices=['service', 'cli'], default='cli',
-                        help='运行模式: service=子进程模式, cli=命令行模式')
+    parser.add_argument('path', nargs='*', help='项目路径；指定多个时作为多根工作区并行扫描')
+    parser.add_argument('--mode', choices=['service', 'daemon', 'cli'], default='cli',
+                        help='运行模式: service=子进程模式, daemon=Unix 套接字守护进程, cli=命令行模式')
+    parser.add_argument('--socket', metavar='PATH',
+                        help='守护进程的套接字路径（默认 CACHE_DIR/daemon.sock）')
+    parser.add_argument('--no-daemon', action='store_true',
+                        help='即使守护进程在运行也在本进程中扫描')
     parser.add_argument('--report', action='store_true',
                         help='生成HTML报告')
     parser.add_argument('--no-git', action='store_true',
                         help='禁用Git分析')
+    parser.add_argument('--profiling', action='store_true',
+                        help='输出各阶段/分析器耗时')
+    parser.add_argument('--scan-profile', choices=['quick', 'standard', 'deep'],
+                        help='扫描档位: quick=快速概览, standard=常规, deep=完整分析')
+    parser.add_argument('--time-budget', type=float,
+                        help='扫描时间预算（秒），超时返回部分结果')
+    parser.add_argument('--since', metavar='REV',
+                        help='只分析相对该 Git 版本变化的文件，报告新增/已修复的问题')
+    parser.add_argument('--history', metavar='REV', nargs='*',
+                        help='分析历史版本快照（不检出）；不指定版本时取最近 5 个标签')
+    parser.add_argument('--hotspot-trends', action='store_true',
+                        help='采样高频修改文件最近若干版本的复杂度，区分增长中与稳定的热点')
+    parser.add_argument('--git-index', action='store_true',
+                        help='从 Git 索引列出文件（git ls-files），跳过目录遍历与哈希计算')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不使用分析结果缓存，所有文件重新分析')
+    parser.add_argument('--no-trends', action='store_true',
+                        help='不把本次结果写入历史趋势库')
+    parser.add_argument('--trend-base', metavar='REV',
+                        help='趋势对比的基准提交（默认为上一次扫描）')
+    parser.add_argument('--parallel', action='store_true',
+                        help='在进程池中并行分析文件（多个项目路径时总是并行）')
+    parser.add_argument('--file-timeout', type=float, metavar='SECONDS',
+                        help='单个文件的分析时限，超时的文件跳过并列出（隐含 --parallel）')
+    parser.add_argument('--sarif', metavar='PATH',
+                        help='随扫描把问题流式写入 SARIF 2.1.0 文件（供 CI 上传）')
+    parser.add_argument('--jsonl', metavar='PATH',
+                        help='随扫描把各文件指标流式写入 JSON Lines 文件')
+    parser.add_argument('--resume', action='store_true',
+                        help='从上次被中断的扫描的检查点继续，只重新分析此后变化的文件')
+    parser.add_argument('--result-store', nargs='?', const=True, metavar='PATH',
+                        help='逐文件把结果写入 SQLite（默认 CACHE_DIR/results/），内存占用与仓库规模无关')
+    parser.add_argument('--sample', type=_sample_size, metavar='N',
+                        help='先分析 N 个（或 0~1 之间比例的）分层随机样本文件并给出带置信区间的估计，'
+                             '再继续扫描逐步修正（配合 --time-budget 只取估计）')
 
     args = parser.parse_args()
+    roots = args.path
+    if not roots and args.mode != 'daemon':
+        parser.error('the following arguments are required: path')
+    args.path = roots[0] if roots else None
+    socket_path = args.socket or DAEMON['socket']
 
     service = HealthCheckService()
 
     if args.mode == 'service':
         # 子进程模式（供 Electron 调用）
         service.run_as_service()
+    elif args.mode == 'daemon':
+        # 守护进程模式（多个编辑器窗口与命令行共用）
+        try:
+            service.run_as_daemon(socket_path)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    elif args.history is not None:
+        print(f"🕰️  分析历史版本: {args.path}")
+        options = {'scan_profile': args.scan_profile}
+        if args.time_budget is not None:
+            options['time_budget'] = args.time_budget
+        history = service.scan_history(args.path, args.history, options)
+        for snap in history['snapshots']:
+            summary = snap['summary']
+            print(f"  • {snap['revision']}: 文件 {summary['files']}, 代码行 {summary['code_lines']}, "
+                  f"复杂度 {snap['complexity']}, 问题 {summary['issues']}")
+        if not history['snapshots']:
+            print("  （没有可分析的版本）")
     else:
         # CLI 模式
-        print(f"🔍 扫描项目: {args.path}")
-        result = service.scan_project(args.path, {
-            'enable_git': not args.no_git
-        })
+        print(f"🔍 扫描项目: {', '.join(roots)}")
+        options = {
+            'enable_git': not args.no_git,
+            'profiling': args.profiling,
+            'scan_profile': args.scan_profile,
+            'record_trends': not args.no_trends,
+            'trend_base': args.trend_base,
+            'since': args.since,
+            'hotspot_history': args.hotspot_trends,
+            'analysis_cache': not args.no_cache,
+            'git_index': args.git_index,
+        }
+        if args.time_budget is not None:
+            options['time_budget'] = args.time_budget
+        options['parallel'] = args.parallel
+        if args.file_timeout is not None:
+            options['file_timeout'] = args.file_timeout
+        if args.result_store:
+            options['result_store'] = args.result_store
+        if args.resume:
+            options['resume'] = True
+        if args.sample:
+            options['sample'] = args.sample
+
+        # 流式导出：每完成一个文件即写出，不等待完整结果
+        from .reporters.stream_exporters import SarifExporter, JsonlExporter
+        exporters = []
+        if args.sarif:
+            exporters.append(SarifExporter(args.sarif, args.path if len(roots) == 1 else None))
+        if args.jsonl:
+            exporters.append(JsonlExporter(args.jsonl))
+
+        def export(record, root=None):
+            for exporter in exporters:
+                exporter.add(record, root)
+
+        # 有守护进程在运行时交给它扫描：复用其预热的进程池与内存中的状态
+        response = None
+        if not args.no_daemon and daemon.is_running(socket_path):
+            daemon_options = {key: value for key, value in options.items() if value is not None}
+            if not args.parallel:
+                daemon_options.pop('parallel')
+            if exporters:
+                daemon_options['stream'] = True
+            if len(roots) > 1:
+                req = {'id': 'cli', 'command': 'scan_workspace',
+                       'paths': [os.path.abspath(root) for root in roots], 'options': daemon_options}
+            else:
+                req = {'id': 'cli', 'command': 'scan', 'path': os.path.abspath(args.path), 'options': daemon_options}
+            def on_message(message):
+                if message.get('type') == 'file':
+                    export(message['data'], message.get('root'))
+                elif message.get('type') == 'estimate':
+                    _print_estimate(message['data'])
+
+            try:
+                response = daemon.request(socket_path, req, on_message)
+            except (OSError, ValueError):
+                response = None
+            if response is not None and not response.get('success'):
+                print(f"❌ {response.get('error')}")
+                sys.exit(1)
+            if response is not None:
+                print(f"  （由守护进程 {socket_path} 完成）")
+
+        if len(roots) > 1:
+            if response is not None:
+                workspace = response['data']
+            else:
+                workspace = service.scan_workspace(
+                    roots, options, (lambda root, record: export(record, root)) if exporters else None)
+                service.shutdown()
+            for exporter in exporters:
+                exporter.close(workspace)
+                print(f"  • 已导出: {exporter.path}")
+            for root, stats in workspace['roots'].items():
+                if 'error' in stats:
+                    print(f"  ❌ {root}: {stats['error']}")
+                else:
+                    print(f"  • {root}: 文件 {stats['summary']['files']}, "
+                          f"代码行 {stats['summary']['code_lines']}, 问题 {stats['summary']['issues']}")
+            summary = workspace['summary']
+            print(f"\n📊 工作区扫描完成（{summary['roots']} 个项目）！")
+            print(f"  • 文件: {summary['files']}")
+            print(f"  • 代码行: {summary['code_lines']}")
+            print(f"  • 问题: {summary['issues']}")
+            print(f"  • 耗时: {summary['scan_time']}s")
+            sys.exit(0)
+        if response is not None:
+            result = response['data']
+        else:
+            result = service.scan_project(args.path, options, export if exporters else None,
+                                          on_estimate=_print_estimate if args.sample else None)
+            service.shutdown()
+        for exporter in exporters:
+            exporter.close(result)
 
         print(f"\n📊 扫描完成！")
         print(f"  • 文件: {result['summary']['files']}")
         print(f"  • 代码行: {result['summary']['code_lines']}")
         print(f"  • 问题: {result['summary']['issues']}")
         print(f"  • 耗时: {result['summary']['scan_time']}s")
+        if result['summary']['skipped_files']:
+            print(f"  • 跳过超大文件: {result['summary']['skipped_files']}")
+        if result['summary']['truncated']:
+            print(f"  ⚠️ 已达到时间预算，结果不完整")
+        if result.get('pool_fallback'):
+            print(f"  ⚠️ 未使用进程池: {result['pool_fallback']}")
+        if result['timed_out']:
+            print(f"  ⚠️ 分析超时的文件: {len(result['timed_out'])}")
+            for path in result['timed_out'][:10]:
+                print(f"    • {path}")
+        checkpoint = result.get('checkpoint')
+        if checkpoint and checkpoint['resumed']:
+            print(f"  • 从检查点恢复: {checkpoint['resumed']} 个文件（{checkpoint['revalidated']} 个已变化，重新分析）")
+        if result.get('result_store'):
+            print(f"  • 完整结果: {result['result_store']['path']}")
+        if result.get('estimates') and not result['estimates']['exact']:
+            # 被时间预算截断：汇总只含已完成的文件，估计值给出全仓库的推算
+            _print_estimate(result['estimates'])
+        for exporter in exporters:
+            print(f"  • 已导出: {exporter.path}")
+
+        inventory = result.get('dependency_inventory')
+        if inventory:
+            print(f"\n📦 依赖清单: {len(inventory['manifests'])} 个文件, "
+                  f"声明 {len(inventory['declared'])} 个依赖")
+            for item in inventory['unused']:
+                print(f"  • 未使用: {item['name']} ({item['manifest']})")
+            for item in inventory['undeclared']:
+                print(f"  • 未声明: {item['name']} ({item['ecosystem']})")
+
+        diff = result.get('diff')
+        if diff:
+            print(f"\n🔀 相对 {diff['base']}: {diff['changed_files']} 个文件变化, "
+                  f"新增问题 {diff['summary']['new']}, 已修复 {diff['summary']['fixed']}")
+            for item in diff['new_findings'][:10]:
+                detail = item.get('type') or item.get('tag') or item.get('issue')
+                print(f"  + [{item['category']}] {item['file']}: {detail}")
+
+        hotspot_trends = result.get('hotspot_trends')
+        if hotspot_trends:
+            print(f"\n🔥 热点复杂度走势（新计算 {hotspot_trends['computed']}, 缓存 {hotspot_trends['cached']}）:")
+            labels = {'growing': '↗ 增长', 'shrinking': '↘ 下降', 'stable': '→ 稳定', 'unknown': '? 未知'}
+            for item in hotspot_trends['files']:
+                series = ' → '.join(str(s['complexity']) for s in item['samples'])
+                print(f"  • {labels[item['trend']]} {item['file']} (修改 {item['churn']} 次): {series}")
+
+        trends = result.get('trends') or {}
+        if trends.get('worse'):
+            print(f"\n📈 复杂度上升的文件（对比扫描 #{trends['base_scan_id']}）:")
+            for item in trends['worse'][:10]:
+                print(f"  • {item['file']}: {item['before']} → {item['after']}")
+
+        if args.profiling:
+            profile = result['profile']
+            print(f"\n⏱️  阶段耗时（读取 {profile['bytes_read']} 字节）:")
+            for name, info in profile['phases'].items():
+                print(f"  • {name}: {info['seconds']}s ({info['calls']} 次)")
+            for name, info in profile['analyzers'].items():
+                print(f"  • analyzer.{name}: {info['seconds']}s ({info['calls']} 次)")
+            print(f"\n🐢 最慢的文件:")
+            for item in profile['slowest_files']:
+                print(f"  • {item['file']}: {item['seconds']}s")
 
         if args.report:
             # 注意：这里的导入路径需要根据运行方式适配
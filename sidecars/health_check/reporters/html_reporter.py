@@ -203,6 +203,19 @@ TEMPLATE = """<!DOCTYPE html>
                 <div id="scatterChart" style="height: 500px;"></div>
             </div>
             
+            <div class="card full-width">
+                <h3>📈 历史趋势</h3>
+                <div id="trendChart" class="chart"></div>
+                <div class="table-container">
+                    <table>
+                        <thead>
+                            <tr><th>变差的文件（{trend_base}）</th><th>复杂度变化</th></tr>
+                        </thead>
+                        <tbody>{trend_rows}</tbody>
+                    </table>
+                </div>
+            </div>
+            
             <div class="card">
                 <h3>📦 外部依赖</h3>
                 <div class="table-container">
@@ -313,9 +326,31 @@ TEMPLATE = """<!DOCTYPE html>
             }}]
         }});
         
+        // 趋势折线图
+        const trendChart = echarts.init(document.getElementById('trendChart'));
+        const history = (data.trends && data.trends.history) || [];
+        const trendLabels = history.map(h => new Date(h.timestamp * 1000).toLocaleString() +
+            (h.commit ? ` (${{h.commit.slice(0, 7)}})` : ''));
+        
+        trendChart.setOption({{
+            tooltip: {{ trigger: 'axis' }},
+            legend: {{ data: ['问题数', '总复杂度'] }},
+            grid: {{ left: 60, right: 60, top: 40, bottom: 40 }},
+            xAxis: {{ type: 'category', data: trendLabels, axisLabel: {{ show: false }} }},
+            yAxis: [
+                {{ type: 'value', name: '问题数' }},
+                {{ type: 'value', name: '复杂度', splitLine: {{ show: false }} }}
+            ],
+            series: [
+                {{ name: '问题数', type: 'line', data: history.map(h => h.issues) }},
+                {{ name: '总复杂度', type: 'line', yAxisIndex: 1, data: history.map(h => h.complexity) }}
+            ]
+        }});
+        
         window.addEventListener('resize', () => {{
             langChart.resize();
             scatterChart.resize();
+            trendChart.resize();
         }});
     </script>
 </body>
@@ -378,6 +413,20 @@ def generate_html_report(data, output_path="health_report.html"):
     if not todos_rows:
         todos_rows = '<tr><td colspan="3" class="empty">无待办事项</td></tr>'
 
+    # 历史趋势
+    trends = data.get('trends') or {}
+    trend_rows = ""
+    for item in trends.get('worse', [])[:20]:
+        trend_rows += f"""
+            <tr>
+                <td><code style="font-size:11px">{item['file']}</code></td>
+                <td><span class="badge badge-danger">{item['before']} → {item['after']} (+{item['delta']})</span></td>
+            </tr>
+        """
+    if not trend_rows:
+        trend_rows = '<tr><td colspan="2" class="empty">无变差的文件</td></tr>'
+    trend_base = f"对比扫描 #{trends['base_scan_id']}" if trends.get('base_scan_id') else "暂无历史记录"
+
     # 问题等级
     total_issues = data['summary']['issues']
     if total_issues == 0:
@@ -401,6 +450,8 @@ def generate_html_report(data, output_path="health_report.html"):
         bad_smells_rows=bad_smells_rows,
         dependencies_content=dependencies_content,
         todos_rows=todos_rows,
+        trend_rows=trend_rows,
+        trend_base=trend_base,
         data_json=json.dumps(data)
     )
 
@@ -0,0 +1,181 @@
+# ============================================================================
+# sidecars/health_check/reporters/stream_exporters.py
+# ============================================================================
+import os
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from urllib.parse import quote
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+
+# 规则 id -> (说明, SARIF 级别)
+SARIF_RULES = {
+    'secret': ('Possible hard-coded secret', 'error'),
+    'security-risk': ('Risky code pattern', 'warning'),
+    'code-smell': ('Code smell', 'warning'),
+    'hotspot': ('Complex and frequently changed file', 'warning'),
+    'todo': ('TODO marker', 'note'),
+}
+
+
+def _iter_hotspots(result):
+    """产出 (热点, 根目录)：单项目结果的根目录为 None，多根工作区结果逐个项目展开"""
+    for hotspot in result.get('hotspots', []):
+        yield hotspot, None
+    for root, stats in result.get('roots', {}).items():
+        for hotspot in stats.get('hotspots', []):
+            yield hotspot, root
+
+
+class _StreamExporter(ABC):
+    """逐文件写出结果的导出器基类：add(record) 随扫描调用，close(result) 写入结尾"""
+
+    def __init__(self, output):
+        """
+        Args:
+            output: 输出文件路径
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        self.path = output
+        self.file = open(output, 'w', encoding='utf-8')
+        self.closed = False
+
+    @abstractmethod
+    def add(self, record, root=None):
+        """写入一个文件的结果记录（ProjectScanner._build_file_record 的结构）"""
+        pass
+
+    def close(self, result=None):
+        """
+        写入结尾并关闭
+
+        Args:
+            result: 完整的扫描结果（可选，用于写入汇总与扫描结束后才确定的热点）
+        """
+        self.closed = True
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if not self.closed:
+            self.close()
+
+
+class SarifExporter(_StreamExporter):
+    """
+    SARIF 2.1.0 导出（供 CI 上传代码扫描结果）
+
+    文件头在创建时写出，每条问题随扫描写出一条 result，内存占用与仓库规模无关。
+    密钥只给出类型与位置，不写出命中的内容。
+    """
+
+    def __init__(self, output, root_path=None):
+        """
+        Args:
+            output: 输出文件路径
+            root_path: 项目根目录（单项目时路径相对于它；多根工作区时 add 传入各自的 root，写绝对 URI）
+        """
+        super().__init__(output)
+        self.root_path = root_path
+        self.count = 0
+        run = {
+            'tool': {'driver': {
+                'name': 'health_check',
+                'rules': [
+                    {'id': rule_id, 'shortDescription': {'text': text}, 'defaultConfiguration': {'level': level}}
+                    for rule_id, (text, level) in SARIF_RULES.items()
+                ],
+            }},
+            'columnKind': 'unicodeCodePoints',
+        }
+        if root_path:
+            run['originalUriBaseIds'] = {'SRCROOT': {'uri': Path(os.path.abspath(root_path)).as_uri() + '/'}}
+        # 先写出 run 的其余字段，results 数组保持打开，逐条追加
+        head = json.dumps(run, ensure_ascii=False)[:-1]
+        self.file.write(f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", "runs": [{head}, "results": [\n')
+
+    def _location(self, path, root, line=None):
+        if root is None:
+            artifact = {'uri': quote(path.replace(os.sep, '/')), 'uriBaseId': 'SRCROOT'}
+        else:
+            artifact = {'uri': Path(os.path.abspath(os.path.join(root, path))).as_uri()}
+        location = {'physicalLocation': {'artifactLocation': artifact}}
+        if line:
+            location['physicalLocation']['region'] = {'startLine': line}
+        return [location]
+
+    def _write(self, rule_id, message, path, root, line=None, properties=None):
+        result = {
+            'ruleId': rule_id,
+            'level': SARIF_RULES[rule_id][1],
+            'message': {'text': message},
+            'locations': self._location(path, root, line),
+        }
+        if properties:
+            result['properties'] = properties
+        self.file.write(('' if not self.count else ',\n') + json.dumps(result, ensure_ascii=False))
+        self.count += 1
+
+    def add(self, record, root=None):
+        path = record['file']
+        for secret in record['secrets']:
+            self._write('secret', f"Possible {secret['type']}", path, root, secret['line'],
+                        {'type': secret['type']})
+        for risk in record['risks']:
+            self._write('security-risk', f"{risk['type']}: {risk.get('preview', '')}", path, root, risk['line'],
+                        {'type': risk['type']})
+        smell = record['smell']
+        if smell:
+            self._write('code-smell', '; '.join(smell['issues']), path, root,
+                        properties={'score': smell['score'], 'lines': smell['lines']})
+        for todo in record['todos']:
+            self._write('todo', f"{todo['tag']}: {todo['text']}", path, root, todo['line'])
+
+    def close(self, result=None):
+        properties = {}
+        if result is not None:
+            # 热点依赖 Git 修改频率，扫描结束后才确定
+            for hotspot, root in _iter_hotspots(result):
+                self._write('hotspot', f"complexity {hotspot['complexity']}, changed {hotspot['churn']} times",
+                            hotspot['file'], root, properties={'score': hotspot['score']})
+            properties['summary'] = result.get('summary', {})
+        self.file.write(f'\n], "properties": {json.dumps(properties, ensure_ascii=False)}}}]}}\n')
+        super().close()
+
+
+class JsonlExporter(_StreamExporter):
+    """
+    JSON Lines 导出：每个文件一行 {"type": "file", ...指标与问题数}，
+    扫描结束后每个热点一行 {"type": "hotspot", ...}，最后一行 {"type": "summary", ...}
+    """
+
+    def add(self, record, root=None):
+        line = {
+            'type': 'file',
+            'file': record['file'],
+            'language': record['language'],
+            **{key: value for key, value in record['metrics'].items() if key not in ('name', 'path', 'churn')},
+            'todos': len(record['todos']),
+            'secrets': len(record['secrets']),
+            'risks': len(record['risks']),
+            'smells': record['smell']['issues'] if record['smell'] else [],
+        }
+        if root is not None:
+            line['root'] = root
+        self.file.write(json.dumps(line, ensure_ascii=False) + '\n')
+
+    def close(self, result=None):
+        if result is not None:
+            for hotspot, root in _iter_hotspots(result):
+                line = {'type': 'hotspot', **hotspot}
+                if root is not None:
+                    line['root'] = root
+                self.file.write(json.dumps(line, ensure_ascii=False) + '\n')
+            summary = {'type': 'summary', 'summary': result.get('summary', {})}
+            if 'languages' in result:
+                summary['languages'] = result['languages']
+            self.file.write(json.dumps(summary, ensure_ascii=False) + '\n')
+        super().close()
@@ -0,0 +1,102 @@
+# ============================================================================
+# sidecars/health_check/tests/test_sampling.py
+# ============================================================================
+# 在 sidecars 目录下运行：python -m pytest health_check/tests
+import os
+import tempfile
+import unittest
+
+from health_check.benchmarks.corpus import generate_corpus
+from health_check.core.scanner import ProjectScanner
+from health_check.core.sampling import (
+    METRICS, StratifiedSampler, StratifiedEstimator, record_values, _TAKE_ALL,
+)
+
+# 固定种子的合成语料：302 个文件、约 160 个 (顶层目录, 语言) 层，层数多于小样本的文件数
+CORPUS_FILES = 302
+SEEDS = 60
+
+
+class StratifiedSamplingTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        root = os.path.join(cls.tmp.name, 'corpus')
+        generate_corpus(root, files=CORPUS_FILES, commits=0, seed=42)
+        records = []
+        ProjectScanner(root, {'analysis_cache': False}).scan(on_file=records.append)
+        cls.files = [(record, os.path.getsize(os.path.join(root, record['file']))) for record in records]
+        cls.truth = [sum(record_values(record)[i] for record, _ in cls.files) for i in range(len(METRICS))]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _sample(self, size, seed):
+        sampler = StratifiedSampler(size, seed)
+        for record, fsize in self.files:
+            sampler.push((record, fsize), record['file'], fsize)
+        order = list(sampler)
+        return sampler, order
+
+    def _estimate(self, sampler, done):
+        estimator = StratifiedEstimator(sampler.sizes, key_of=sampler.stratum)
+        for record, fsize in done:
+            estimator.add(record, record['file'], fsize)
+        return estimator
+
+    def test_every_stratum_has_two_samples(self):
+        for size in (20, 60, 150):
+            sampler, order = self._sample(size, 0)
+            self.assertEqual(sampler.sampled, size)
+            counts = {}
+            for record, fsize in order[:sampler.sampled]:
+                key = sampler.stratum(record['file'], fsize)
+                counts[key] = counts.get(key, 0) + 1
+            self.assertEqual(set(counts), set(sampler.sizes))
+            for key, count in counts.items():
+                self.assertGreaterEqual(count, min(2, sampler.sizes[key]), key)
+                if key == _TAKE_ALL:
+                    self.assertEqual(count, sampler.sizes[key])
+
+    def test_interval_coverage(self):
+        # 名义 95% 的区间在各样本量下对真实总量的覆盖率；估计偏差（平均 z 值）接近 0
+        for size in (20, 60, 150):
+            covered = [0] * len(METRICS)
+            z_scores = [[] for _ in METRICS]
+            for seed in range(SEEDS):
+                sampler, order = self._sample(size, seed)
+                totals = self._estimate(sampler, order[:sampler.sampled]).estimate()['totals']
+                for i, name in enumerate(METRICS):
+                    item = totals[name]
+                    covered[i] += item['low'] <= self.truth[i] <= item['high']
+                    if item['stderr']:
+                        z_scores[i].append((item['estimate'] - self.truth[i]) / item['stderr'])
+            for i, name in enumerate(METRICS):
+                with self.subTest(size=size, metric=name):
+                    self.assertGreaterEqual(covered[i] / SEEDS, 0.85)
+                    self.assertLess(abs(sum(z_scores[i]) / len(z_scores[i])), 0.6)
+
+    def test_complete_scan_is_exact(self):
+        sampler, order = self._sample(30, 1)
+        estimator = self._estimate(sampler, order)
+        estimator.complete()
+        estimate = estimator.estimate()
+        self.assertTrue(estimate['exact'])
+        for i, name in enumerate(METRICS):
+            item = estimate['totals'][name]
+            self.assertEqual((item['estimate'], item['low'], item['high']), (self.truth[i],) * 3)
+
+    def test_truncated_before_sample_is_conservative(self):
+        # 样本阶段中途截断（部分层不足 2 个样本）时区间仍覆盖真实值
+        covered = 0
+        for seed in range(SEEDS):
+            sampler, order = self._sample(150, seed)
+            totals = self._estimate(sampler, order[:40]).estimate()['totals']
+            covered += totals['lines']['low'] <= self.truth[0] <= totals['lines']['high']
+        self.assertGreaterEqual(covered / SEEDS, 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 # sidecars/health_check/utils/file_utils.py
 # ============================================================================
 import os
+import io
 import hashlib
 
 def get_file_hash(filepath, full_hash=False, block_size=4096):
@@ -60,3 +61,15 @@ def should_ignore(path, ignore_dirs, ignore_files, ignore_exts):
 
     return False
 
+
+
+def git_blob_id(data):
+    """按 Git 的方式计算内容的 blob id（与 git hash-object 结果一致）"""
+    hasher = hashlib.sha1(b'blob %d\0' % len(data))
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def decode_lines(data):
+    """把文件字节解码为行列表，与文本模式 readlines() 的结果一致（通用换行）"""
+    return io.StringIO(data.decode('utf-8', errors='ignore'), newline=None).readlines()
@@ -0,0 +1,232 @@
+# ============================================================================
+# sidecars/health_check/utils/stream_parsers.py
+# ============================================================================
+import re
+import json
+
+# ===== JSON =====
+# 一个 JSON 记号：结构符号 / 字符串 / 数字与字面量（前导空白一并吞掉）
+_JSON_TOKEN = re.compile(
+    r'\s*(?:([{}\[\]:,])|"((?:[^"\\]|\\.)*)"|(-?[0-9][0-9.eE+\-]*|true|false|null))'
+)
+_JSON_LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+def _json_string(raw):
+    return json.loads('"' + raw + '"') if '\\' in raw else raw
+
+
+def iter_json_scalars(f, chunk_size=1 << 16):
+    """
+    增量解析 JSON，逐个产出 (路径, 标量值)
+
+    路径为键组成的元组，数组元素的位置记为 None。
+    只在内存中保留当前路径和一个读缓冲区，适合几十 MB 的 package-lock.json。
+    """
+    buf = ''
+    pos = 0
+    eof = False
+    kinds = []      # 容器类型栈：'o' 对象 / 'a' 数组
+    path = []       # 与 kinds 对应的当前键
+    expect_key = False
+
+    while True:
+        match = _JSON_TOKEN.match(buf, pos)
+        # 记号可能被缓冲区截断（数字、空白），不到文件尾时先补充数据
+        if match is None or (match.end() == len(buf) and not eof):
+            if eof:
+                if buf[pos:].strip():
+                    raise ValueError(f"Invalid JSON near: {buf[pos:pos + 40]!r}")
+                return
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+
+        pos = match.end()
+        symbol, string, literal = match.groups()
+
+        if symbol is not None:
+            if symbol == '{':
+                kinds.append('o')
+                path.append(None)
+                expect_key = True
+            elif symbol == '[':
+                kinds.append('a')
+                path.append(None)
+            elif symbol in '}]':
+                kinds.pop()
+                path.pop()
+                expect_key = False
+            elif symbol == ',':
+                expect_key = bool(kinds) and kinds[-1] == 'o'
+            continue
+
+        if string is not None:
+            value = _json_string(string)
+            if expect_key:
+                path[-1] = value
+                expect_key = False
+                continue
+        elif literal in _JSON_LITERALS:
+            value = _JSON_LITERALS[literal]
+        else:
+            value = literal
+
+        yield tuple(path), value
+
+
+# ===== TOML（子集） =====
+# 支持：[table]、[[array.table]]、key = 标量 / 数组（可跨行）/ 内联表，以及注释
+_TOML_HEADER = re.compile(r'^\[(\[)?\s*([^\]]+?)\s*\]\]?\s*(?:#.*)?$')
+_TOML_KEY = re.compile(r'^("(?:[^"\\]|\\.)*"|\'[^\']*\'|[\w.\-]+)\s*=\s*(.*)$')
+_TOML_INLINE_KEY = re.compile(r'("(?:[^"\\]|\\.)*"|\'[^\']*\'|[\w.\-]+)\s*=')
+_TOML_BASIC_STRING = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_TOML_BARE_VALUE = re.compile(r'[^\s,\]}#]+')
+
+
+def _toml_key_path(raw):
+    parts = []
+    for part in re.findall(r'"(?:[^"\\]|\\.)*"|\'[^\']*\'|[^.\s]+', raw):
+        parts.append(part[1:-1] if part[0] in '"\'' else part)
+    return tuple(parts)
+
+
+def _bracket_depth(text):
+    """统计字符串与注释之外未闭合的括号数"""
+    depth = 0
+    quote = None
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == '\\' and quote == '"':
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '#':
+            # 注释到行尾
+            newline = text.find('\n', i)
+            if newline == -1:
+                break
+            i = newline
+        elif ch in '[{':
+            depth += 1
+        elif ch in ']}':
+            depth -= 1
+        i += 1
+    return depth
+
+
+def _incomplete(text):
+    """值是否还需要后续行（未闭合的三引号字符串或括号）"""
+    if text.count('"""') % 2 or text.count("'''") % 2:
+        return True
+    return _bracket_depth(text) > 0
+
+
+def _parse_toml_value(text, i=0):
+    """解析一个 TOML 值，返回 (值, 结束位置)"""
+    while i < len(text) and text[i] in ' \t\r\n':
+        i += 1
+    ch = text[i:i + 1]
+
+    if ch == '"':
+        if text.startswith('"""', i):
+            end = text.index('"""', i + 3)
+            return text[i + 3:end], end + 3
+        match = _TOML_BASIC_STRING.match(text, i)
+        if match is None:
+            raise ValueError(f"Unterminated string near: {text[i:i + 40]!r}")
+        return _json_string(match.group(1)), match.end()
+    if ch == "'":
+        if text.startswith("'''", i):
+            end = text.index("'''", i + 3)
+            return text[i + 3:end], end + 3
+        end = text.index("'", i + 1)
+        return text[i + 1:end], end + 1
+
+    if ch in '[{':
+        closing = ']' if ch == '[' else '}'
+        items = [] if ch == '[' else {}
+        i += 1
+        while True:
+            # 跳过空白、逗号与注释
+            while i < len(text) and (text[i] in ' \t\r\n,' or text[i] == '#'):
+                if text[i] == '#':
+                    newline = text.find('\n', i)
+                    i = len(text) if newline == -1 else newline
+                else:
+                    i += 1
+            if i >= len(text) or text[i] == closing:
+                return items, i + 1
+            if closing == ']':
+                value, i = _parse_toml_value(text, i)
+                items.append(value)
+            else:
+                match = _TOML_INLINE_KEY.match(text, i)
+                if match is None:
+                    raise ValueError(f"Invalid inline table near: {text[i:i + 40]!r}")
+                key = _toml_key_path(match.group(1))[-1]
+                items[key], i = _parse_toml_value(text, match.end())
+
+    # 数字、布尔、日期等：原样保留字符串
+    match = _TOML_BARE_VALUE.match(text, i)
+    raw = match.group(0) if match else ''
+    if raw in ('true', 'false'):
+        return raw == 'true', match.end()
+    return raw, (match.end() if match else i)
+
+
+def iter_toml(f):
+    """
+    逐行增量解析 TOML，产出 (表路径, 是否为数组表的新元素, 键, 值)
+
+    数组表（[[package]]）每出现一次新元素，会先产出一次 (表路径, True, None, None)，
+    便于调用方按块收集字段；多行数组会累积到括号闭合后再解析。
+    """
+    table = ()
+    pending = None  # 跨行值：[键, 已累积文本]
+
+    for raw_line in f:
+        line = raw_line.strip()
+
+        if pending is not None:
+            pending[1] += raw_line
+            if not _incomplete(pending[1]):
+                key, text = pending
+                pending = None
+                try:
+                    value, _ = _parse_toml_value(text)
+                except ValueError:
+                    continue
+                yield table, False, key, value
+            continue
+
+        if not line or line.startswith('#'):
+            continue
+
+        header = _TOML_HEADER.match(line)
+        if header and not _TOML_KEY.match(line):
+            table = _toml_key_path(header.group(2))
+            if header.group(1):
+                yield table, True, None, None
+            continue
+
+        match = _TOML_KEY.match(line)
+        if not match:
+            continue
+        key = _toml_key_path(match.group(1))
+        rest = match.group(2)
+        if _incomplete(rest):
+            pending = [key, rest + '\n']
+            continue
+        try:
+            value, _ = _parse_toml_value(rest)
+        except ValueError:
+            continue
+        yield table, False, key, value